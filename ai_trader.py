@@ -1,28 +1,107 @@
+import os
+import pickle
+import threading
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
 import logging
+from core.bar_buffer import TIMEFRAME_SECONDS
+from core.bar_store import BarStore
+from core.feature_store import AITRADER_FEATURES
+
+FEATURES = ['returns', 'sma_20', 'rsi']
 
 class AITrader:
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=200)
-
-    def train(self, data_path):
-        df = pd.read_csv(data_path)
-        df['returns'] = df['close'].pct_change()
-        df['sma_20'] = df['close'].rolling(20).mean()
-        df['rsi'] = self._calculate_rsi(df['close'])
-        df.dropna(inplace=True)
-
-        X = df[['returns', 'sma_20', 'rsi']]
-        y = np.where(df['returns'].shift(-1) > 0, 1, 0)
-        
-        X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2)
-        self.model.fit(X_train, y_train)
-        logging.info(f"Trained model with {len(X_train)} samples")
-
-    def _calculate_rsi(self, series, period=14):
+    def __init__(self, model_path=None, feature_store=None):
+        # Single-threaded: a one-row predict through joblib's pool is slower than without it
+        self.model = RandomForestClassifier(n_estimators=200, n_jobs=1)
+        self.model_path = model_path
+        self.feature_store = feature_store
+        self._model_mtime = None
+        self._reloading = None
+
+    def train(self, data_path, symbol=None, timeframe=None):
+        # Bar store files are named SYMBOL_TIMEFRAME.bars, CSV exports SYMBOL_historical.csv
+        name = os.path.splitext(os.path.basename(str(data_path)))[0].split('_')
+        history = self.load_history(data_path)
+        if timeframe is None:
+            timeframe = name[-1] if str(data_path).endswith('.bars') else self.infer_timeframe(history)
+        df = self.build_features(history, self.feature_store, symbol or name[0], timeframe)
+
+        # Time-ordered split: the holdout is strictly after the training bars
+        split = int(len(df) * 0.8)
+        train, holdout = df.iloc[:split], df.iloc[split:]
+        self.model.fit(train[FEATURES], train['target'])
+        accuracy = self.model.score(holdout[FEATURES], holdout['target']) if len(holdout) else float('nan')
+        logging.info(f"Trained model with {len(train)} samples ({accuracy:.2%} holdout accuracy)")
+
+    @classmethod
+    def build_features(cls, df, feature_store=None, symbol='', timeframe=''):
+        """Feature rows with next-bar direction targets; the newest bar has no target yet.
+
+        With a FeatureStore the columns come from its cache (identical
+        values, computed by the streaming indicators) instead of pandas.
+        """
+        df = df.copy()
+        if feature_store is not None:
+            for name, column in feature_store.features(symbol, timeframe, df, AITRADER_FEATURES).items():
+                df[name] = np.asarray(column)
+        else:
+            df['returns'] = df['close'].pct_change()
+            df['sma_20'] = df['close'].rolling(20).mean()
+            df['rsi'] = cls._calculate_rsi(df['close'])
+        df['target'] = np.where(df['returns'].shift(-1) > 0, 1, 0)
+        return df.iloc[:-1].dropna(subset=FEATURES)
+
+    def start_background_training(self, store_path, **kwargs):
+        """Run RetrainService in a child process publishing to ``self.model_path``"""
+        from core.retrain_service import RetrainService
+        service = RetrainService(store_path, self.model_path, **kwargs)
+        service.start()
+        return service
+
+    def reload_if_updated(self):
+        """Pick up a newly published model; loading happens off the calling thread"""
+        if not self.model_path or (self._reloading and self._reloading.is_alive()):
+            return
+        try:
+            mtime = os.stat(self.model_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._model_mtime:
+            return
+
+        def reload():
+            try:
+                with open(self.model_path, 'rb') as f:
+                    state = pickle.load(f)
+                self.model = state['model']
+                self._model_mtime = mtime
+                logging.info(f"Loaded retrained model ({state['trees']} trees, {state['samples']} samples)")
+            except Exception as e:
+                logging.error(f"Reloading {self.model_path} failed: {str(e)}")
+
+        self._reloading = threading.Thread(target=reload, name="model-reload", daemon=True)
+        self._reloading.start()
+
+    @staticmethod
+    def load_history(data_path):
+        """Read bar history from a bar store file or a legacy CSV export"""
+        if str(data_path).endswith('.csv'):
+            return pd.read_csv(data_path)
+        return BarStore(data_path).to_frame()
+
+    @staticmethod
+    def infer_timeframe(df):
+        """Timeframe name ('H1') from the typical spacing of the bars' times"""
+        step = pd.to_datetime(df['time']).diff().median().total_seconds()
+        for timeframe, seconds in TIMEFRAME_SECONDS.items():
+            if seconds == step:
+                return timeframe
+        raise ValueError(f"Bars are {step:.0f}s apart, which is no known timeframe; pass timeframe explicitly")
+
+    @staticmethod
+    def _calculate_rsi(series, period=14):
         delta = series.diff()
         gain = delta.where(delta > 0, 0)
         loss = -delta.where(delta < 0, 0)
@@ -31,9 +110,10 @@ class AITrader:
         return 100 - (100 / (1 + (avg_gain / avg_loss)))
 
     def predict(self, data, sentiment=0):
+        self.reload_if_updated()
         prediction = self.model.predict(data)
         if sentiment > 0.2:
             return "buy"
         elif sentiment < -0.2:
             return "sell"
-        return "buy" if prediction == 1 else "sell"
\ No newline at end of file
+        return "buy" if prediction == 1 else "sell"
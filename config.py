@@ -18,10 +18,21 @@ class Config:
     # Trading Parameters
     RISK_PER_TRADE = 0.02  # 2% of account balance
     MAX_LOT_SIZE = 10.0
+    MAX_DAILY_LOSS = 0.05  # Stop opening trades after losing 5% of the day's starting balance
+    STOP_LOSS_PCT = 0.01  # SL distance as a fraction of the entry price
+    TAKE_PROFIT_PCT = 0.02  # TP distance as a fraction of the entry price
+    RISK_SYNC_SECONDS = 60  # How often risk state is reconciled with the terminal's positions and account
+    TRADE_MODE = os.getenv('TRADE_MODE', 'PAPER')  # 'REAL' or 'PAPER' for the legacy trade_executor
     SLIPPAGE_PIPS = 3
     MAGIC_NUMBER = 20240801  # Unique bot identifier
     SYMBOLS = ['EURUSD', 'GBPUSD', 'XAUUSD']
     TIMEFRAME = 'M15'
+    BAR_BUFFER_SIZE = 500  # Bars kept in memory per symbol
+    CYCLE_MODE = 'rotate'  # 'rotate' evaluates one symbol per cycle, 'all' every symbol
+    ORDER_WORKERS = 4  # Order pipeline threads (closes on shutdown go out in parallel)
+    ORDER_RETRIES = 3  # Re-sends after a requote or price change, each at a fresh tick
+    PREDICTION_CACHE_SIZE = 1024  # (symbol, timeframe, bar time, model version) entries
+    QUANT_ERROR_BUDGET = 0.05  # Max mean |quantized - fp32| score error, relative to the fp32 score spread
     
     # Path Configuration
     MODEL_DIR = Path('models')
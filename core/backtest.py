@@ -0,0 +1,204 @@
+# core/backtest.py
+
+import logging
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TRADE_DTYPE = np.dtype([
+    ('entry_index', 'i8'),
+    ('exit_index', 'i8'),
+    ('entry_price', 'f8'),
+    ('exit_price', 'f8'),
+    ('pnl', 'f8'),
+    ('reason', 'U6'),  # 'signal', 'sl', 'tp' or 'open' (still held on the last bar)
+])
+
+
+def default_slippage_pips() -> float:
+    from config import Config
+    return Config.SLIPPAGE_PIPS
+
+
+class BacktestResult(NamedTuple):
+    equity: np.ndarray      # balance plus open PnL at each bar close
+    position: np.ndarray    # 1 while long, 0 while flat, per bar (after that bar's fills)
+    drawdown: np.ndarray    # equity / running peak - 1
+    trades: np.ndarray      # TRADE_DTYPE records, in entry order
+
+    def summary(self) -> dict:
+        closed = self.trades[self.trades['reason'] != 'open']
+        return {
+            'trades': len(closed),
+            'net_pnl': float(closed['pnl'].sum()),
+            'win_rate': float(np.mean(closed['pnl'] > 0)) if len(closed) else float('nan'),
+            'max_drawdown': float(self.drawdown.min()) if len(self.drawdown) else 0.0,
+            'final_equity': float(self.equity[-1]) if len(self.equity) else float('nan'),
+        }
+
+
+def _signal_codes(signals) -> np.ndarray:
+    signals = np.asarray(signals)
+    if signals.dtype.kind in 'US':
+        return np.where(signals == 'buy', 1, np.where(signals == 'sell', -1, 0)).astype(np.int8)
+    return np.sign(signals).astype(np.int8)
+
+
+def _next_index(mask: np.ndarray) -> np.ndarray:
+    """``out[i]`` = first ``j >= i`` with ``mask[j]``, or ``len(mask)``"""
+    n = len(mask)
+    index = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(index[::-1])[::-1]
+
+
+def _first_at_or_below(values: np.ndarray, starts: np.ndarray, levels: np.ndarray, span: int) -> np.ndarray:
+    """``out[k]`` = first ``j`` in ``[starts[k], starts[k] + span)`` with ``values[j] <= levels[k]``.
+
+    Queries with no such ``j`` get an index past that range. Binary
+    lifting over a sparse table of range minimums: each level skips a
+    power-of-two block that stays above the threshold, for all queries
+    at once, so the cost is ``log2(span)`` gathers.
+    """
+    n = len(values)
+    tables = [values]
+    while (1 << len(tables)) <= min(span, n):
+        previous, width = tables[-1], 1 << (len(tables) - 1)
+        tables.append(np.minimum(previous[:-width], previous[width:]))
+    position = starts.copy()
+    for k in range(len(tables) - 1, -1, -1):
+        table, width = tables[k], 1 << k
+        skip = (position + width <= n) & (table[np.minimum(position, len(table) - 1)] > levels)
+        position[skip] += width
+    return position
+
+
+def backtest(bars: np.ndarray, signals, volume: float = 1.0, balance: float = 10000.0,
+             stop_loss: Optional[float] = None, take_profit: Optional[float] = None,
+             slippage_pips: Optional[float] = None, point: float = 1e-5, use_spread: bool = True) -> BacktestResult:
+    """Long-only backtest of per-bar ``buy``/``sell``/``hold`` signals, PaperTrade style.
+
+    A buy while flat opens ``volume`` at the bar's close; a sell while
+    long closes it; other signals are ignored (PaperTrade would replace
+    an open position on a second buy). PnL is ``(exit - entry) * volume``
+    as in PaperTrade.execute_trade.
+
+    ``bars`` is a BAR_DTYPE array with bid prices. Buys fill at the ask
+    (close + spread points) and every fill is moved ``slippage_pips``
+    against the trade (default ``Config.SLIPPAGE_PIPS``, 1 pip = 10
+    points). ``stop_loss``/``take_profit`` are fractions of the entry
+    price; they are checked on later bars' low/high, the stop first when
+    both are touched, and gaps fill at the open.
+    """
+    close = np.asarray(bars['close'], dtype=np.float64)
+    n = len(close)
+    codes = _signal_codes(signals)
+    if len(codes) != n:
+        raise ValueError(f"{len(codes)} signals for {n} bars")
+    if n == 0:
+        return BacktestResult(np.zeros(0), np.zeros(0, dtype=np.int8), np.zeros(0), np.zeros(0, dtype=TRADE_DTYPE))
+    slippage = (default_slippage_pips() if slippage_pips is None else slippage_pips) * 10 * point
+    spread = np.asarray(bars['spread'], dtype=np.float64) * point if use_spread else np.zeros(n)
+    ask_fill = close + spread + slippage
+
+    if stop_loss is None and take_profit is None:
+        # Entries and exits alternate, so both follow from the position state in one pass
+        state = np.where(codes == 1, 1.0, np.where(codes == -1, 0.0, np.nan))
+        filled = np.where(np.isnan(state), 0, np.arange(n))
+        np.maximum.accumulate(filled, out=filled)
+        position = np.nan_to_num(state[filled], nan=0.0).astype(np.int8)
+        changes = np.diff(position, prepend=np.int8(0))
+        entries = np.flatnonzero(changes == 1)
+        exits = np.flatnonzero(changes == -1)
+        exit_index = np.full(len(entries), n - 1)
+        exit_index[:len(exits)] = exits
+        exit_price = close[exit_index] - slippage
+        reasons = np.full(len(entries), 'signal', dtype='U6')
+    else:
+        low, high, open_ = (np.asarray(bars[f], dtype=np.float64) for f in ('low', 'high', 'open'))
+        next_sell = np.append(_next_index(codes == -1), n)
+        # Exit of a trade opened on every buy bar, found in one vectorized pass
+        candidates = np.flatnonzero(codes == 1)
+        starts = candidates + 1
+        end = np.minimum(next_sell[starts], n - 1)
+        stop_at = ask_fill[candidates] * (1 - stop_loss) if stop_loss is not None else np.full(len(candidates), -np.inf)
+        target_at = ask_fill[candidates] * (1 + take_profit) if take_profit is not None else np.full(len(candidates), np.inf)
+        # No search has to look past the next sell
+        span = int((end - starts).max(initial=0)) + 1
+        no_hit = np.full(len(candidates), n)
+        first_stop = _first_at_or_below(low, starts, stop_at, span) if stop_loss is not None else no_hit
+        first_target = _first_at_or_below(-high, starts, -target_at, span) if take_profit is not None else no_hit
+        hit = np.minimum(first_stop, first_target)
+        stopped = hit <= end
+        exits = np.where(stopped, hit, end)
+        is_sl = stopped & (first_stop == hit)
+        is_tp = stopped & ~is_sl
+        hit_bar = np.minimum(hit, n - 1)
+        prices = np.where(is_sl, np.minimum(open_[hit_bar], stop_at),
+                          np.where(is_tp, np.maximum(open_[hit_bar], target_at), close[exits])) - slippage
+        codes_of = np.where(is_sl, 1, np.where(is_tp, 2, 0))
+
+        # Trades never overlap: follow exit -> next buy to pick the candidates actually taken
+        following = np.searchsorted(candidates, exits + 1)
+        taken = []
+        c, count = 0, len(candidates)
+        while c < count:
+            taken.append(c)
+            c = following[c]
+        taken = np.asarray(taken, dtype=np.int64)
+        entries = candidates[taken]
+        exit_index = exits[taken]
+        exit_price = prices[taken]
+        reasons = np.array(['signal', 'sl', 'tp'], dtype='U6')[codes_of[taken]]
+
+    trades = np.zeros(len(entries), dtype=TRADE_DTYPE)
+    trades['entry_index'] = entries
+    trades['exit_index'] = exit_index
+    trades['entry_price'] = ask_fill[entries]
+    trades['exit_price'] = exit_price
+    trades['reason'] = reasons
+    # Still long on the last bar without an exit: marked to market, not realized
+    still_open = (exit_index == n - 1) & (reasons == 'signal') & (codes[exit_index] != -1)
+    trades['reason'][still_open] = 'open'
+    trades['exit_price'][still_open] = close[n - 1]
+    trades['pnl'] = (trades['exit_price'] - trades['entry_price']) * volume
+
+    # Per-bar accounting: realized PnL lands on exit bars, open PnL is marked at the close
+    # (entry and exit bars are all distinct, so plain fancy assignment is safe)
+    realized = np.zeros(n)
+    closed = trades[~still_open]
+    realized[closed['exit_index']] = closed['pnl']
+    marks = np.zeros(n + 1, dtype=np.int8)
+    marks[entries] = 1
+    marks[np.where(still_open, n, exit_index)] = -1
+    position = np.cumsum(marks[:n], dtype=np.int8)
+    is_entry = np.zeros(n, dtype=np.int64)
+    is_entry[entries] = 1
+    trade_of_bar = np.cumsum(is_entry) - 1
+    equity = np.cumsum(realized)
+    equity += balance
+    if len(trades):
+        open_pnl = close - trades['entry_price'][np.maximum(trade_of_bar, 0)]
+        open_pnl *= volume
+        equity += np.where(position == 1, open_pnl, 0.0)
+    peak = np.maximum.accumulate(equity)
+    return BacktestResult(equity, position, equity / peak - 1.0, trades)
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    from core.bar_store import BarStore
+
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 2:
+        print("Usage: python -m core.backtest <store.bars>  (SMA-20 crossover demo strategy)")
+        sys.exit(1)
+    bars = np.asarray(BarStore(sys.argv[1]).bars)
+    close = bars['close']
+    sma = np.convolve(close, np.ones(20) / 20, mode='full')[:len(close)]
+    signals = np.where(close > sma, 1, -1)
+    started = time.perf_counter()
+    result = backtest(bars, signals, stop_loss=0.01, take_profit=0.02, slippage_pips=0)
+    print(f"{len(bars)} bars in {(time.perf_counter() - started) * 1000:.1f} ms: {result.summary()}")
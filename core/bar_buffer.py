@@ -0,0 +1,213 @@
+# core/bar_buffer.py
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Record layout of the arrays returned by mt5.copy_rates_*
+BAR_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<u8'),
+    ('spread', '<i4'),
+    ('real_volume', '<u8'),
+])
+VALUE_FIELDS = ('open', 'high', 'low', 'close', 'tick_volume', 'spread', 'real_volume')
+OHLCV_FIELDS = VALUE_FIELDS[:5]
+
+TIMEFRAME_SECONDS = {
+    'M1': 60, 'M2': 120, 'M3': 180, 'M4': 240, 'M5': 300, 'M6': 360,
+    'M10': 600, 'M12': 720, 'M15': 900, 'M20': 1200, 'M30': 1800,
+    'H1': 3600, 'H2': 7200, 'H3': 10800, 'H4': 14400, 'H6': 21600,
+    'H8': 28800, 'H12': 43200, 'D1': 86400, 'W1': 604800, 'MN1': 2592000,
+}
+
+
+def timeframe_seconds(timeframe) -> int:
+    """Bar length in seconds for a timeframe name ('M15') or an MT5 TIMEFRAME_* constant"""
+    if isinstance(timeframe, str):
+        return TIMEFRAME_SECONDS[timeframe.upper()]
+    # MT5 encodes minutes as-is, hours as 0x4000|n, weeks as 0x8000|n, months as 0xC000|n
+    unit = {0: 60, 0x4000: 3600, 0x8000: 604800, 0xC000: 2592000}[timeframe & 0xC000]
+    return (timeframe & 0x3FFF) * unit
+
+
+class BarRingBuffer:
+    """Fixed-capacity bar history that hands out zero-copy views.
+
+    Each bar is written twice, at slot ``i`` and ``i + capacity``, so the
+    most recent ``n`` bars are always one contiguous slice of the backing
+    arrays. Views are read-only and alias the buffer: they see later
+    updates, so copy them if they have to outlive the next ``extend``.
+    """
+
+    def __init__(self, capacity: int = 500):
+        if capacity <= 0:
+            raise ValueError("Capacity must be > 0.")
+        self.capacity = capacity
+        self._time = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((2 * capacity, len(VALUE_FIELDS)), dtype=np.float64)
+        self._head = 0  # slot receiving the next bar
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_time(self) -> Optional[int]:
+        """Open time (epoch seconds) of the newest stored bar"""
+        if not self._size:
+            return None
+        return int(self._time[self._head + self.capacity - 1])
+
+    def clear(self):
+        self._head = 0
+        self._size = 0
+
+    def extend(self, rates: np.ndarray) -> int:
+        """Merge bars from mt5.copy_rates_* (oldest first) and return the number of new bars.
+
+        Bars older than the newest stored bar are ignored. A bar with the
+        same open time overwrites it, since the forming bar keeps changing
+        until it closes.
+        """
+        if rates is None or len(rates) == 0:
+            return 0
+        times = np.asarray(rates['time'], dtype=np.int64)
+
+        start = self._head
+        last = self.last_time
+        if last is not None:
+            first = int(np.searchsorted(times, last, side='right'))
+            if first and times[first - 1] == last:
+                first -= 1  # rewrite the forming bar in place, then append after it
+                start -= 1
+            rates, times = rates[first:], times[first:]
+        if not len(rates):
+            return 0
+        n = len(rates) - (start != self._head)
+        if len(rates) > self.capacity:
+            start += len(rates) - self.capacity
+            rates, times = rates[-self.capacity:], times[-self.capacity:]
+
+        self._write(start % self.capacity, times, rates)
+        self._head = (start + len(rates)) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+        return n
+
+    def _write(self, slot: int, times: np.ndarray, rates: np.ndarray):
+        values = np.empty((len(rates), len(VALUE_FIELDS)))
+        for column, field in enumerate(VALUE_FIELDS):
+            values[:, column] = rates[field]
+        # One contiguous run from ``slot`` (it may spill past ``capacity``), then its mirror
+        end = slot + len(rates)
+        self._time[slot:end] = times
+        self._values[slot:end] = values
+        if end <= self.capacity:
+            self._time[slot + self.capacity:end + self.capacity] = times
+            self._values[slot + self.capacity:end + self.capacity] = values
+        else:
+            split = self.capacity - slot
+            self._time[slot + self.capacity:] = times[:split]
+            self._values[slot + self.capacity:] = values[:split]
+            self._time[:end - self.capacity] = times[split:]
+            self._values[:end - self.capacity] = values[split:]
+
+    def _window(self, n: Optional[int]) -> slice:
+        n = self._size if n is None else min(n, self._size)
+        end = self._head + self.capacity
+        return slice(end - n, end)
+
+    @staticmethod
+    def _readonly(view: np.ndarray) -> np.ndarray:
+        view.flags.writeable = False
+        return view
+
+    def times(self, n: Optional[int] = None) -> np.ndarray:
+        """Open times of the last ``n`` bars (all stored bars by default)"""
+        return self._readonly(self._time[self._window(n)])
+
+    def values(self, n: Optional[int] = None) -> np.ndarray:
+        """``(n, 7)`` view ordered as VALUE_FIELDS"""
+        return self._readonly(self._values[self._window(n)])
+
+    def ohlcv(self, n: Optional[int] = None) -> np.ndarray:
+        """``(n, 5)`` open/high/low/close/tick_volume view, as fed to the model"""
+        return self._readonly(self._values[self._window(n), :len(OHLCV_FIELDS)])
+
+    def column(self, field: str, n: Optional[int] = None) -> np.ndarray:
+        return self._readonly(self._values[self._window(n), VALUE_FIELDS.index(field)])
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.column('close')
+
+
+class MT5BarFeed:
+    """Per-symbol ring buffers kept in sync with the terminal incrementally.
+
+    The first refresh of a symbol seeds its buffer with
+    ``copy_rates_from_pos``. Later refreshes only ask ``copy_rates_from``
+    for the newest couple of bars, widening the request until it overlaps
+    the stored history, and fall back to a full reseed after long gaps.
+    The next request for a symbol starts at the number of bars the last
+    one brought in, so a symbol refreshed every few bars (a rotation)
+    costs one round trip rather than two.
+    """
+
+    def __init__(self, timeframe, capacity: int = 500, terminal=None):
+        if terminal is None:
+            import MetaTrader5 as terminal
+        self.terminal = terminal
+        self.timeframe = timeframe
+        self.capacity = capacity
+        self._buffers: Dict[str, BarRingBuffer] = {}
+        self._request: Dict[str, int] = {}  # symbol -> bars to ask for on its next refresh
+
+    def __getitem__(self, symbol: str) -> BarRingBuffer:
+        return self._buffers[symbol]
+
+    def refresh(self, symbol: str) -> BarRingBuffer:
+        """Bring ``symbol``'s buffer up to date and return it"""
+        buffer = self._buffers.get(symbol)
+        if buffer is None:
+            buffer = self._buffers[symbol] = BarRingBuffer(self.capacity)
+
+        if not len(buffer):
+            self._seed(symbol, buffer)
+            return buffer
+
+        last_time = buffer.last_time
+        # Anything past the newest bar works as date_from; the terminal clamps it
+        date_from = datetime.now(timezone.utc) + timedelta(days=1)
+        count = self._request.get(symbol, 2)
+        while True:
+            rates = self.terminal.copy_rates_from(symbol, self.timeframe, date_from, count)
+            if rates is None or len(rates) == 0:
+                logger.warning(f"No new rates for {symbol}: {self.terminal.last_error()}")
+                return buffer
+            if rates['time'][0] <= last_time:
+                # As many new bars again, plus the forming bar and one to overlap
+                self._request[symbol] = min(buffer.extend(rates) + 2, self.capacity)
+                return buffer
+            if count >= self.capacity:
+                break
+            count = min(count * 4, self.capacity)
+
+        logger.info(f"{symbol} history gap exceeds buffer, reseeding")
+        buffer.clear()
+        buffer.extend(rates)
+        return buffer
+
+    def _seed(self, symbol: str, buffer: BarRingBuffer):
+        rates = self.terminal.copy_rates_from_pos(symbol, self.timeframe, 0, self.capacity)
+        if rates is None or len(rates) == 0:
+            raise ValueError(f"No rates received for {symbol}: {self.terminal.last_error()}")
+        buffer.extend(rates)
@@ -0,0 +1,147 @@
+# core/bar_store.py
+
+import os
+import sys
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from core.bar_buffer import BAR_DTYPE
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'AITBARS1'
+HEADER_SIZE = 64
+
+
+def default_root() -> Path:
+    from config import Config
+    return Config.DATA_DIR / 'bars'
+
+
+def to_bar_records(rates) -> np.ndarray:
+    """Coerce mt5 rates (or any array with matching fields) to BAR_DTYPE"""
+    records = np.zeros(len(rates), dtype=BAR_DTYPE)
+    for field in BAR_DTYPE.names:
+        if field in rates.dtype.names:
+            records[field] = rates[field]
+    return records
+
+
+class BarStore:
+    """Append-only bar history for one symbol and timeframe.
+
+    The file is a 64 byte header followed by fixed-size BAR_DTYPE records
+    and is read through ``np.memmap``. Columns come back as strided views
+    of the mapping and time ranges are located by ``np.searchsorted`` on
+    the time column, so nothing is parsed or loaded up front.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._map: Optional[np.memmap] = None
+        self._times = np.zeros(0, dtype=np.int64)
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'wb') as f:
+                f.write(MAGIC.ljust(HEADER_SIZE, b'\0'))
+        else:
+            with open(self.path, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f"{self.path} is not a bar store file")
+
+    @classmethod
+    def open(cls, symbol: str, timeframe: str, root: Optional[Path] = None) -> 'BarStore':
+        root = default_root() if root is None else Path(root)
+        return cls(root / f"{symbol}_{timeframe}.bars")
+
+    def __len__(self) -> int:
+        return (os.path.getsize(self.path) - HEADER_SIZE) // BAR_DTYPE.itemsize
+
+    @property
+    def bars(self) -> np.ndarray:
+        """Read-only mapping of every stored bar, remapped after appends"""
+        n = len(self)
+        if self._map is None or len(self._map) != n:
+            if n == 0:
+                return np.zeros(0, dtype=BAR_DTYPE)
+            self._map = np.memmap(self.path, dtype=BAR_DTYPE, mode='r',
+                                  offset=HEADER_SIZE, shape=(n,))
+        return self._map
+
+    @property
+    def last_time(self) -> Optional[int]:
+        bars = self.bars
+        return int(bars['time'][-1]) if len(bars) else None
+
+    def append(self, rates) -> int:
+        """Append bars newer than the last stored one and return how many were written"""
+        if rates is None or len(rates) == 0:
+            return 0
+        records = to_bar_records(rates)
+        last = self.last_time
+        if last is not None:
+            records = records[records['time'] > last]
+        if len(records) and np.any(np.diff(records['time']) <= 0):
+            raise ValueError("Bars must be strictly increasing in time.")
+        if len(records):
+            with open(self.path, 'ab') as f:
+                f.write(records.tobytes())
+        return len(records)
+
+    def _index(self, t: Optional[int], default: int) -> int:
+        if t is None:
+            return default
+        return int(np.searchsorted(self._time_column(), int(t), side='left'))
+
+    def _time_column(self) -> np.ndarray:
+        # searchsorted on the strided field view would copy the column on every call,
+        # so keep a contiguous copy and only extend it with appended bars
+        bars = self.bars
+        if len(self._times) != len(bars):
+            self._times = np.concatenate([self._times, bars['time'][len(self._times):]])
+        return self._times
+
+    def slice(self, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """Bars with ``start <= time < end`` (epoch seconds) as a view of the mapping"""
+        bars = self.bars
+        return bars[self._index(start, 0):self._index(end, len(bars))]
+
+    def column(self, field: str, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        return self.slice(start, end)[field]
+
+    def to_frame(self, start: Optional[int] = None, end: Optional[int] = None) -> pd.DataFrame:
+        """Materialize a time range as a DataFrame shaped like the old CSV files"""
+        df = pd.DataFrame(np.asarray(self.slice(start, end)))
+        df['time'] = pd.to_datetime(df['time'], unit='s')
+        return df
+
+
+def import_csv(csv_path: Union[str, Path], symbol: str, timeframe: str,
+               root: Optional[Path] = None) -> BarStore:
+    """One-shot conversion of a *_historical.csv file into a bar store"""
+    df = pd.read_csv(csv_path)
+    if 'tick_volume' not in df.columns and 'volume' in df.columns:
+        df = df.rename(columns={'volume': 'tick_volume'})
+
+    records = np.zeros(len(df), dtype=BAR_DTYPE)
+    records['time'] = pd.to_datetime(df['time']).astype('datetime64[s]').astype(np.int64)
+    for field in BAR_DTYPE.names[1:]:
+        if field in df.columns:
+            records[field] = df[field].to_numpy()
+
+    store = BarStore.open(symbol, timeframe, root)
+    written = store.append(records)
+    logger.info(f"Imported {written} bars from {csv_path} into {store.path}")
+    return store
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4:
+        print("Usage: python -m core.bar_store <csv_path> <symbol> <timeframe>")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO)
+    import_csv(*sys.argv[1:])
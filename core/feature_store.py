@@ -0,0 +1,184 @@
+# core/feature_store.py
+
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from core import indicators
+from core.model_registry import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# name -> streaming indicator, its keyword arguments and the bar columns it consumes
+FeatureSpec = Dict[str, dict]
+
+AITRADER_FEATURES: FeatureSpec = {
+    'returns': {'indicator': 'PctChange', 'params': {}, 'inputs': ['close']},
+    'sma_20': {'indicator': 'SMA', 'params': {'length': 20}, 'inputs': ['close']},
+    'rsi': {'indicator': 'RSI', 'params': {'length': 14, 'method': 'sma'}, 'inputs': ['close']},
+}
+
+
+def spec_hash(spec: FeatureSpec) -> str:
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _inputs(spec: FeatureSpec):
+    return sorted({field for feature in spec.values() for field in feature['inputs']})
+
+
+def range_hash(bars, spec: FeatureSpec, rows: Optional[int] = None) -> str:
+    """Hash of the input columns the spec reads, over the first ``rows`` bars"""
+    digest = hashlib.sha256()
+    for field in _inputs(spec):
+        digest.update(np.ascontiguousarray(np.asarray(bars[field], dtype=np.float64)[:rows]).data)
+    return digest.hexdigest()[:16]
+
+
+class FeatureStore:
+    """Disk cache of indicator features keyed by (symbol, timeframe, spec, data-range hash).
+
+    Each entry is a directory with a unique id holding one raw float64
+    file per feature column and per input column, and a ``meta.json``
+    with the row count and every indicator's ``state_dict``. A request
+    for bars that extend a cached range (same first ``rows`` bars)
+    replays only the new bars through the restored indicators and
+    appends to the files; committed rows are never rewritten. A request
+    for a prefix of a cached range is read from the entry's first rows,
+    checked against its stored inputs.
+    Columns are returned as copies, so an append or eviction never
+    touches memory a caller holds. Entries are evicted least recently
+    used first once the store exceeds ``max_bytes``.
+    """
+
+    def __init__(self, root: str = os.path.join('data', 'features'), max_bytes: int = 2 << 30):
+        self.root = str(root)
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(self.root, 'index.json')
+        self._lock = threading.Lock()
+        self.hits = self.extensions = self.misses = 0
+        try:
+            with open(self.index_path) as f:
+                self._index = json.load(f)
+        except FileNotFoundError:
+            self._index = {}
+
+    def _save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        atomic_write(self.index_path, json.dumps(self._index, indent=1).encode())
+
+    def _find(self, symbol: str, timeframe: str, spec: FeatureSpec, bars) -> Tuple[Optional[str], Optional[str]]:
+        """A cached entry for ``bars``, and the hash of all of ``bars``.
+
+        An entry whose bars start with all of ``bars`` wins; otherwise the
+        longest entry whose bars are a prefix of ``bars`` is returned for
+        extending.
+        """
+        n, key_spec = len(bars), spec_hash(spec)
+        full_hash = range_hash(bars, spec)
+        best = None
+        for name, entry in self._index.items():
+            if (entry['symbol'], entry['timeframe'], entry['spec']) != (symbol, timeframe, key_spec):
+                continue
+            if entry['rows'] > n:
+                if self._stored_hash(name, spec, n) == full_hash:
+                    return name, full_hash
+                continue
+            if best and entry['rows'] <= self._index[best]['rows']:
+                continue
+            if range_hash(bars, spec, entry['rows']) == entry['range']:
+                best = name
+        return best, full_hash
+
+    def _stored_hash(self, name: str, spec: FeatureSpec, rows: int) -> Optional[str]:
+        """range_hash of an entry's first ``rows`` stored input bars; None if it kept no inputs"""
+        digest = hashlib.sha256()
+        for field in _inputs(spec):
+            path = os.path.join(self.root, name, f'input_{field}.f8')
+            if not os.path.exists(path):
+                return None
+            digest.update(np.fromfile(path, dtype=np.float64, count=rows).data)
+        return digest.hexdigest()[:16]
+
+    def _columns(self, name: str, spec: FeatureSpec, rows: int) -> Dict[str, np.ndarray]:
+        directory = os.path.join(self.root, name)
+        return {feature: np.fromfile(os.path.join(directory, f'{feature}.f8'), dtype=np.float64, count=rows)
+                for feature in spec}
+
+    def features(self, symbol: str, timeframe: str, bars, spec: FeatureSpec = AITRADER_FEATURES) -> Dict[str, np.ndarray]:
+        """Feature columns for every bar in ``bars`` (a DataFrame or BAR_DTYPE array), computed at most once"""
+        with self._lock:
+            name, full_hash = self._find(symbol, timeframe, spec, bars)
+            n = len(bars)
+            if name is not None and self._index[name]['rows'] >= n:
+                self.hits += 1
+            else:
+                name = self._extend(name, symbol, timeframe, spec, bars, full_hash)
+            self._index[name]['last_used'] = time.time()
+            self._evict(keep=name)
+            self._save_index()
+            return self._columns(name, spec, n)
+
+    def _extend(self, name: Optional[str], symbol: str, timeframe: str, spec: FeatureSpec, bars, full_hash: str) -> str:
+        if name is None:
+            self.misses += 1
+            name = f"{symbol}_{timeframe}_{spec_hash(spec)}_{uuid.uuid4().hex[:16]}"
+            os.makedirs(os.path.join(self.root, name))
+            start, states = 0, {}
+        else:
+            self.extensions += 1
+            with open(os.path.join(self.root, name, 'meta.json')) as f:
+                meta = json.load(f)
+            start, states = meta['rows'], meta['states']
+
+        directory = os.path.join(self.root, name)
+        columns = {field: np.asarray(bars[field], dtype=np.float64)[start:] for field in _inputs(spec)}
+        outputs = {f'input_{field}': values for field, values in columns.items()}
+        for feature, definition in spec.items():
+            indicator = getattr(indicators, definition['indicator'])(**definition['params'])
+            if feature in states:
+                indicator.load_state_dict(states[feature])
+            values = indicator.update_many(*(columns[field] for field in definition['inputs']))
+            if values.ndim > 1:
+                values = values[:, definition.get('output', 0)]
+            outputs[feature] = values
+            states[feature] = indicator.state_dict()
+
+        for column, values in outputs.items():
+            path = os.path.join(directory, f'{column}.f8')
+            # Write right after the committed rows; a tail left by an interrupted write is overwritten
+            with open(path, 'r+b' if os.path.exists(path) else 'wb') as f:
+                f.seek(start * 8)
+                f.write(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+
+        atomic_write(os.path.join(directory, 'meta.json'),
+                     json.dumps({'rows': len(bars), 'states': states}).encode())
+        self._index[name] = {
+            'symbol': symbol, 'timeframe': timeframe, 'spec': spec_hash(spec), 'range': full_hash,
+            'rows': len(bars), 'bytes': 8 * len(bars) * len(outputs), 'last_used': time.time(),
+        }
+        logger.info(f"Computed {len(bars) - start} feature rows for {symbol} {timeframe} ({name})")
+        return name
+
+    def _evict(self, keep: str):
+        total = sum(entry['bytes'] for entry in self._index.values())
+        for name in sorted(self._index, key=lambda n: self._index[n]['last_used']):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            total -= self._index.pop(name)['bytes']
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            logger.info(f"Evicted feature cache entry {name}")
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'extensions': self.extensions, 'misses': self.misses,
+                'entries': len(self._index), 'bytes': sum(entry['bytes'] for entry in self._index.values())}
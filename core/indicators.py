@@ -0,0 +1,428 @@
+# core/indicators.py
+
+import math
+from collections import deque
+from typing import Iterable, Tuple
+
+import numpy as np
+
+NAN = float('nan')
+
+
+class StreamingIndicator:
+    """Base class for indicators that update in O(1) per bar.
+
+    Warm-up bars return NaN, matching the leading NaNs of the pandas_ta
+    reference in MarketAnalyzer. ``state_dict``/``load_state_dict``
+    checkpoint the full internal state as plain Python values, so a
+    restored indicator continues exactly where the saved one stopped.
+    """
+
+    def update(self, *values):
+        raise NotImplementedError
+
+    def update_many(self, *columns: Iterable[float]) -> np.ndarray:
+        """Feed whole columns bar by bar and return every output"""
+        return np.array([self.update(*row) for row in zip(*columns)], dtype=np.float64)
+
+    def state_dict(self) -> dict:
+        state = {}
+        for key, value in vars(self).items():
+            if isinstance(value, StreamingIndicator):
+                state[key] = value.state_dict()
+            elif isinstance(value, (deque, list)):
+                state[key] = list(value)
+            else:
+                state[key] = value
+        return state
+
+    def load_state_dict(self, state: dict):
+        for key, value in state.items():
+            current = getattr(self, key)
+            if isinstance(current, StreamingIndicator):
+                current.load_state_dict(value)
+            elif isinstance(current, deque):
+                setattr(self, key, deque(value, maxlen=current.maxlen))
+            elif isinstance(current, list):
+                setattr(self, key, list(value))
+            else:
+                setattr(self, key, value)
+        return self
+
+
+class EWM(StreamingIndicator):
+    """Exponentially weighted mean following pandas' ``Series.ewm(...).mean()`` recurrence"""
+
+    def __init__(self, alpha: float, adjust: bool = True, min_periods: int = 0):
+        self.factor = 1.0 - alpha
+        self.new_wt = 1.0 if adjust else alpha
+        self.adjust = adjust
+        self.min_periods = max(min_periods, 1)
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    def update(self, x: float) -> float:
+        observed = x == x
+        self.nobs += observed
+        if self.weighted == self.weighted:
+            self.old_wt *= self.factor
+            if observed:
+                if self.weighted != x:
+                    self.weighted = self.old_wt * self.weighted + self.new_wt * x
+                    self.weighted /= self.old_wt + self.new_wt
+                self.old_wt = self.old_wt + self.new_wt if self.adjust else 1.0
+        elif observed:
+            self.weighted = x
+        return self.weighted if self.nobs >= self.min_periods else NAN
+
+
+class PctChange(StreamingIndicator):
+    """One-bar percentage change, ``Series.pct_change()``"""
+
+    def __init__(self):
+        self.prev = NAN
+
+    def update(self, x: float) -> float:
+        if self.prev == 0:
+            value = NAN if x == 0 or x != x else math.copysign(math.inf, x)
+        else:
+            value = x / self.prev - 1.0
+        self.prev = x
+        return value
+
+
+class RMA(EWM):
+    """Wilder's moving average as pandas_ta.rma computes it"""
+
+    def __init__(self, length: int):
+        super().__init__(alpha=1.0 / length, adjust=True, min_periods=length)
+
+
+class EMA(StreamingIndicator):
+    """pandas_ta.ema: SMA of the first ``length`` bars as seed, then ewm(span=length, adjust=False)"""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.seed = []
+        self.ewm = EWM(alpha=2.0 / (length + 1), adjust=False)
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if len(self.seed) < self.length:
+            self.seed.append(x)
+            if len(self.seed) < self.length:
+                return NAN
+            x = float(np.sum(self.seed)) / self.length
+        self.value = self.ewm.update(x)
+        return self.value
+
+
+class SMA(StreamingIndicator):
+    """Rolling mean following pandas' compensated ``rolling(length).mean()`` add/remove updates"""
+
+    def __init__(self, length: int):
+        self.length = length
+        self.window = deque(maxlen=length)
+        self.total = 0.0
+        self.add_compensation = 0.0
+        self.remove_compensation = 0.0
+        self.neg_ct = 0
+        self.same_ct = 0
+        self.prev_value = NAN
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if len(self.window) == self.length:
+            old = self.window[0]
+            y = -old - self.remove_compensation
+            t = self.total + y
+            self.remove_compensation = t - self.total - y
+            self.total = t
+            self.neg_ct -= math.copysign(1.0, old) < 0
+        self.window.append(x)
+        y = x - self.add_compensation
+        t = self.total + y
+        self.add_compensation = t - self.total - y
+        self.total = t
+        self.neg_ct += math.copysign(1.0, x) < 0
+        self.same_ct = self.same_ct + 1 if x == self.prev_value else 1
+        self.prev_value = x
+
+        if len(self.window) < self.length:
+            self.value = NAN
+        elif self.same_ct >= self.length:
+            self.value = x
+        else:
+            self.value = self.total / self.length
+            if (self.neg_ct == 0 and self.value < 0) or (self.neg_ct == self.length and self.value > 0):
+                self.value = 0.0
+        return self.value
+
+
+class RollingStd(StreamingIndicator):
+    """Rolling standard deviation following pandas' compensated Welford ``rolling(length).std(ddof)``"""
+
+    def __init__(self, length: int, ddof: int = 1):
+        self.length = length
+        self.ddof = ddof
+        self.window = deque(maxlen=length)
+        self.mean = 0.0
+        self.ssqdm = 0.0
+        self.add_compensation = 0.0
+        self.remove_compensation = 0.0
+        self.same_ct = 0
+        self.prev_value = NAN
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        if len(self.window) == self.length:
+            old = self.window[0]
+            nobs = self.length - 1
+            if nobs:
+                prev_mean = self.mean - self.remove_compensation
+                y = old - self.remove_compensation
+                t = y - self.mean
+                self.remove_compensation = t + self.mean - y
+                self.mean -= t / nobs
+                self.ssqdm -= (old - prev_mean) * (old - self.mean)
+            else:
+                self.mean = self.ssqdm = 0.0
+        self.window.append(x)
+        nobs = len(self.window)
+        self.same_ct = self.same_ct + 1 if x == self.prev_value else 1
+        self.prev_value = x
+        prev_mean = self.mean - self.add_compensation
+        y = x - self.add_compensation
+        t = y - self.mean
+        self.add_compensation = t + self.mean - y
+        self.mean += t / nobs
+        self.ssqdm += (x - prev_mean) * (x - self.mean)
+
+        if nobs < self.length or nobs <= self.ddof:
+            self.value = NAN
+        elif nobs == 1 or self.same_ct >= nobs:
+            self.value = 0.0
+        else:
+            self.value = math.sqrt(max(self.ssqdm / (nobs - self.ddof), 0.0))
+        return self.value
+
+
+class RSI(StreamingIndicator):
+    """Relative Strength Index.
+
+    ``method='wilder'`` matches MarketAnalyzer.calculate_rsi (pandas_ta,
+    RMA smoothing); ``method='sma'`` matches AITrader._calculate_rsi
+    (rolling means, with the first bar counted as a zero move).
+    """
+
+    def __init__(self, length: int = 14, method: str = 'wilder'):
+        if method not in ('wilder', 'sma'):
+            raise ValueError("RSI method must be 'wilder' or 'sma'.")
+        self.length = length
+        self.method = method
+        if method == 'wilder':
+            self.gain, self.loss = RMA(length), RMA(length)
+        else:
+            self.gain, self.loss = SMA(length), SMA(length)
+        self.prev = NAN
+        self.value = NAN
+
+    def update(self, x: float) -> float:
+        delta = x - self.prev
+        self.prev = x
+        if self.method == 'wilder':
+            if delta != delta:
+                gain = loss = NAN
+            else:
+                gain, loss = max(delta, 0.0), min(delta, 0.0)
+            avg_gain = self.gain.update(gain)
+            avg_loss = abs(self.loss.update(loss))
+            total = avg_gain + avg_loss
+            self.value = 100.0 * avg_gain / total if total else NAN
+        else:
+            gain = delta if delta > 0 else 0.0
+            loss = -delta if delta < 0 else 0.0
+            avg_gain = self.gain.update(gain)
+            avg_loss = self.loss.update(loss)
+            if avg_loss == 0:
+                self.value = 100.0 if avg_gain else NAN
+            else:
+                self.value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        return self.value
+
+
+class MACD(StreamingIndicator):
+    """pandas_ta.macd; ``update`` returns ``(macd, histogram, signal)`` like its column order"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        if slow < fast:
+            fast, slow = slow, fast
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, x: float) -> Tuple[float, float, float]:
+        macd = self.fast.update(x) - self.slow.update(x)
+        if macd != macd:
+            return self.value
+        signal = self.signal.update(macd)
+        self.value = (macd, macd - signal, signal)
+        return self.value
+
+    def update_many(self, closes: Iterable[float]) -> np.ndarray:
+        return np.array([self.update(x) for x in closes], dtype=np.float64).reshape(-1, 3)
+
+
+class ATR(StreamingIndicator):
+    """pandas_ta.atr with the default RMA smoothing of the true range"""
+
+    def __init__(self, length: int = 14):
+        self.rma = RMA(length)
+        self.prev_close = NAN
+        self.value = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close != self.prev_close:
+            true_range = NAN
+        else:
+            true_range = max(high - low, abs(high - self.prev_close), abs(self.prev_close - low))
+        self.prev_close = close
+        self.value = self.rma.update(true_range)
+        return self.value
+
+
+class BollingerBands(StreamingIndicator):
+    """pandas_ta.bbands (population std); ``update`` returns ``(lower, mid, upper, bandwidth, percent)``"""
+
+    def __init__(self, length: int = 5, std: float = 2.0):
+        self.std = std
+        self.mid = SMA(length)
+        self.deviation = RollingStd(length, ddof=0)
+        self.value = (NAN,) * 5
+
+    def update(self, x: float) -> Tuple[float, ...]:
+        mid = self.mid.update(x)
+        deviation = self.deviation.update(x) * self.std
+        if mid != mid:
+            return self.value
+        lower, upper = mid - deviation, mid + deviation
+        width = upper - lower
+        self.value = (
+            lower, mid, upper,
+            100.0 * width / mid if mid else NAN,
+            (x - lower) / width if width else NAN,
+        )
+        return self.value
+
+    def update_many(self, closes: Iterable[float]) -> np.ndarray:
+        return np.array([self.update(x) for x in closes], dtype=np.float64).reshape(-1, 5)
+
+
+# Vectorized batch kernels: one pass over time, every (parameter, symbol)
+# lane updated at once. Prices come in as a (symbols, time) matrix.
+
+def _as_time_major(prices: np.ndarray) -> np.ndarray:
+    prices = np.asarray(prices, dtype=np.float64)
+    if prices.ndim == 1:
+        prices = prices[np.newaxis]
+    if prices.ndim != 2:
+        raise ValueError("Prices must be a (symbols, time) matrix.")
+    return np.ascontiguousarray(prices.T)
+
+
+def _seeded_ema(x: np.ndarray, length: np.ndarray, start: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """pandas_ta.ema over time-major ``x`` of shape ``(time, lanes, symbols)``.
+
+    ``length`` and ``start`` (first valid input) are ``(lanes, 1)``; a
+    single-lane ``x`` is shared by every lane.
+    """
+    seed_idx = start + length - 1
+    lanes = (len(length), x.shape[2])
+    seeds = np.empty(lanes)
+    for i in range(len(length)):
+        column = x[:, i if x.shape[1] > 1 else 0]
+        seeds[i] = column[start[i, 0]:seed_idx[i, 0] + 1].mean(axis=0)
+
+    alpha = 2.0 / (length + 1)
+    factor = 1.0 - alpha
+    denom = factor + alpha
+    weighted = np.full(lanes, np.nan)
+    updated = np.empty(lanes)
+    out[:] = np.nan
+    seed_steps = set(np.unique(seed_idx).tolist())
+    for t in range(int(seed_idx.min()), len(x)):
+        xt = x[t]
+        np.multiply(factor, weighted, out=updated)
+        updated += alpha * xt
+        updated /= denom
+        np.copyto(weighted, updated, where=(t > seed_idx) & (weighted != xt))
+        if t in seed_steps:
+            np.copyto(weighted, seeds, where=t == seed_idx)
+        out[t] = weighted
+    return out
+
+
+def batch_rsi(prices: np.ndarray, periods, method: str = 'wilder') -> np.ndarray:
+    """RSI for every symbol and period at once, shaped ``(periods, symbols, time)``"""
+    x = _as_time_major(prices)
+    periods = np.asarray(periods, dtype=np.int64).reshape(-1)
+    n_time, n_symbols = x.shape
+    out = np.full((n_time, len(periods), n_symbols), np.nan)
+    delta = np.diff(x, axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if method == 'wilder':
+            gain, loss = np.maximum(delta, 0.0), np.minimum(delta, 0.0)
+            factor = (1.0 - 1.0 / periods)[:, np.newaxis]
+            avg_gain = np.broadcast_to(gain[0], out.shape[1:]).copy()
+            avg_loss = np.broadcast_to(loss[0], out.shape[1:]).copy()
+            old_wt = np.ones_like(factor)
+            out[1] = 100.0 * avg_gain / (avg_gain + np.abs(avg_loss))
+            for t in range(1, len(delta)):
+                old_wt *= factor
+                for avg, xt in ((avg_gain, gain[t]), (avg_loss, loss[t])):
+                    updated = (old_wt * avg + xt) / (old_wt + 1.0)
+                    np.copyto(avg, updated, where=avg != xt)
+                old_wt += 1.0
+                out[t + 1] = 100.0 * avg_gain / (avg_gain + np.abs(avg_loss))
+        elif method == 'sma':
+            moves = np.concatenate([np.zeros((1, n_symbols)), delta])
+            cumulative = np.zeros((2, n_time + 1, n_symbols))
+            np.cumsum(np.maximum(moves, 0.0), axis=0, out=cumulative[0, 1:])
+            np.cumsum(np.maximum(-moves, 0.0), axis=0, out=cumulative[1, 1:])
+            for i, period in enumerate(periods):
+                sums = cumulative[:, period:] - cumulative[:, :-period]
+                out[period - 1:, i] = 100.0 - 100.0 / (1.0 + sums[0] / sums[1])
+        else:
+            raise ValueError("RSI method must be 'wilder' or 'sma'.")
+
+    if method == 'wilder':
+        warmup = np.arange(n_time)[:, np.newaxis] < periods
+        out[warmup] = np.nan
+    return np.moveaxis(out, 0, -1)
+
+
+def batch_macd(prices: np.ndarray, params) -> np.ndarray:
+    """MACD for every symbol and ``(fast, slow, signal)`` set, shaped ``(3, params, symbols, time)``.
+
+    The leading axis holds macd, histogram and signal, matching the column
+    order of pandas_ta.macd.
+    """
+    x = _as_time_major(prices)
+    grid = np.asarray(params, dtype=np.int64).reshape(-1, 3)
+    fast_slow = np.sort(grid[:, :2], axis=1)
+    signal = grid[:, 2]
+    lengths, index = np.unique(fast_slow, return_inverse=True)
+    index = index.reshape(fast_slow.shape)
+
+    emas = np.empty((len(x), len(lengths), x.shape[1]))
+    _seeded_ema(x[:, np.newaxis, :], lengths[:, np.newaxis], np.zeros((len(lengths), 1), dtype=np.int64), emas)
+
+    out = np.empty((3, len(x), len(signal), x.shape[1]))
+    for i, (fast, slow) in enumerate(index):
+        np.subtract(emas[:, fast], emas[:, slow], out=out[0, :, i])
+    _seeded_ema(out[0], signal[:, np.newaxis], fast_slow[:, 1:] - 1, out[2])
+    np.subtract(out[0], out[2], out=out[1])
+    return np.moveaxis(out, 1, -1)
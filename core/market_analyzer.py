@@ -2,11 +2,30 @@
 
 import pandas as pd
 import pandas_ta as ta
+from core import indicators
 
 class MarketAnalyzer:
     def __init__(self, data):
         self.data = data
 
+    @staticmethod
+    def batch_rsi(prices, periods=(14,), method='wilder'):
+        """RSI for a (symbols, time) price matrix and many periods in one NumPy pass.
+
+        Returns a ``(periods, symbols, time)`` array matching calculate_rsi
+        (``method='wilder'``) or AITrader's rolling-mean RSI (``'sma'``).
+        """
+        return indicators.batch_rsi(prices, periods, method)
+
+    @staticmethod
+    def batch_macd(prices, params=((12, 26, 9),)):
+        """MACD for a (symbols, time) price matrix and a (fast, slow, signal) grid.
+
+        Returns a ``(3, params, symbols, time)`` array holding macd, histogram
+        and signal, matching calculate_macd.
+        """
+        return indicators.batch_macd(prices, params)
+
     def calculate_rsi(self, period=14):
         try:
             if 'close' not in self.data.columns:
@@ -24,4 +43,23 @@ class MarketAnalyzer:
             return macd
         except Exception as e:
             print(f"MACD Error: {e}")
+            return None
+
+    def calculate_atr(self, length=14):
+        try:
+            missing = {'high', 'low', 'close'} - set(self.data.columns)
+            if missing:
+                raise ValueError(f"Missing {sorted(missing)} columns.")
+            return ta.atr(self.data['high'], self.data['low'], self.data['close'], length=length)
+        except Exception as e:
+            print(f"ATR Error: {e}")
+            return None
+
+    def calculate_bbands(self, length=5, std=2.0):
+        try:
+            if 'close' not in self.data.columns:
+                raise ValueError("Missing 'close' column.")
+            return ta.bbands(self.data['close'], length=length, std=std)
+        except Exception as e:
+            print(f"Bollinger Error: {e}")
             return None
\ No newline at end of file
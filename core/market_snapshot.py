@@ -0,0 +1,94 @@
+# core/market_snapshot.py
+
+import time
+import logging
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MarketSnapshot:
+    """Read-through cache of terminal state for the order path.
+
+    Ticks are fetched at most once per symbol per cycle (``new_cycle``)
+    and never served older than ``tick_max_age`` seconds. Account info
+    lives for ``account_max_age`` seconds or until ``invalidate_account``
+    after a fill; symbol metadata such as contract size for
+    ``symbol_max_age``. A failed fetch (``None``) is not cached, and
+    neither is an account fetch that an invalidation overtook.
+    """
+
+    def __init__(self, terminal=None, tick_max_age: float = 1.0, account_max_age: float = 5.0,
+                 symbol_max_age: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        if terminal is None:
+            import MetaTrader5 as terminal
+        self.terminal = terminal
+        self.tick_max_age = tick_max_age
+        self.account_max_age = account_max_age
+        self.symbol_max_age = symbol_max_age
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._cycle = 0
+        self._ticks: Dict[str, Tuple[float, int, object]] = {}
+        self._symbols: Dict[str, Tuple[float, object]] = {}
+        self._account: Optional[Tuple[float, object]] = None
+        self._account_generation = 0  # bumped by invalidate_account
+        self.fetches = {'tick': 0, 'symbol': 0, 'account': 0}
+        self.hits = {'tick': 0, 'symbol': 0, 'account': 0}
+
+    def new_cycle(self):
+        """Start a trading cycle: every tick is refetched on its next read"""
+        with self._lock:
+            self._cycle += 1
+
+    def invalidate_account(self):
+        """Drop the cached account after anything that moves balance or margin"""
+        with self._lock:
+            self._account = None
+            self._account_generation += 1
+
+    def tick(self, symbol: str):
+        now = self.clock()
+        cached = self._ticks.get(symbol)
+        if cached is not None and cached[1] == self._cycle and now - cached[0] <= self.tick_max_age:
+            self.hits['tick'] += 1
+            return cached[2]
+        tick = self.terminal.symbol_info_tick(symbol)
+        self.fetches['tick'] += 1
+        if tick is not None:
+            with self._lock:
+                self._ticks[symbol] = (now, self._cycle, tick)
+        return tick
+
+    def symbol_info(self, symbol: str):
+        now = self.clock()
+        cached = self._symbols.get(symbol)
+        if cached is not None and now - cached[0] <= self.symbol_max_age:
+            self.hits['symbol'] += 1
+            return cached[1]
+        info = self.terminal.symbol_info(symbol)
+        self.fetches['symbol'] += 1
+        if info is not None:
+            with self._lock:
+                self._symbols[symbol] = (now, info)
+        return info
+
+    def account(self):
+        now = self.clock()
+        cached = self._account
+        if cached is not None and now - cached[0] <= self.account_max_age:
+            self.hits['account'] += 1
+            return cached[1]
+        generation = self._account_generation
+        info = self.terminal.account_info()
+        self.fetches['account'] += 1
+        if info is not None:
+            with self._lock:
+                # A fill that invalidated the account mid-fetch may postdate what we read
+                if generation == self._account_generation:
+                    self._account = (now, info)
+        return info
+
+    def stats(self) -> dict:
+        return {kind: {'fetches': self.fetches[kind], 'hits': self.hits[kind]} for kind in self.fetches}
@@ -1,48 +1,234 @@
+# core/ml_models.py
 import os
+import queue
 import logging
+import threading
 import numpy as np
-import tensorflow as tf
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, Sequence, Tuple
 from utils.device_manager import DeviceOptimizer
-# core/ml_models.py
-import os
+from core.windowing import WindowBatcher, sliding_windows
+from core.numpy_lstm import NumpyLSTMModel, export_keras_weights
+from core.model_registry import ModelRegistry
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'  # Suppress TensorFlow warnings
-import tensorflow as tf
+
+if TYPE_CHECKING:
+    import tensorflow as tf
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _tensorflow():
+    """Import TensorFlow on first use; the NumPy and tflite-runtime paths never need it"""
+    import tensorflow
+    return tensorflow
+
+
+def _tflite_interpreter_class():
+    """Prefer the slim tflite-runtime wheel on edge devices, fall back to TensorFlow"""
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        Interpreter = _tensorflow().lite.Interpreter
+    return Interpreter
+
+
+def build_quantum_alpha(input_shape: Tuple[int, int] = (60, 5)) -> 'tf.keras.Model':
+    """The QuantumAlpha LSTM, uncompiled"""
+    tf = _tensorflow()
+    return tf.keras.Sequential([
+        tf.keras.layers.LSTM(128, input_shape=input_shape, return_sequences=True),
+        tf.keras.layers.Dropout(0.3),
+        tf.keras.layers.LSTM(64),
+        tf.keras.layers.Dense(32, activation='swish'),
+        tf.keras.layers.Dense(1, activation='linear')
+    ], name="QuantumAlpha")
+
+
+class TFLiteInterpreterPool:
+    """Warm, reusable TFLite interpreters for one model file.
+
+    Interpreters are created once per model path with their input tensor
+    already resized and allocated for each prepared batch size. A call
+    checks one out, so concurrent callers never share an interpreter.
+    Batches are split into prepared sizes (the tail is zero-padded) to
+    avoid re-allocating tensors on the hot path.
+    """
+
+    _pools: Dict[tuple, 'TFLiteInterpreterPool'] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, model_path: str, size: int = 1, batch_sizes: Sequence[int] = (1,), num_threads: int = 1):
+        self.model_path = model_path
+        self._idle: Dict[int, queue.LifoQueue] = {}
+        Interpreter = _tflite_interpreter_class()
+
+        for batch_size in sorted(set(batch_sizes)):
+            idle = queue.LifoQueue()
+            try:
+                for _ in range(max(1, size)):
+                    interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+                    input_details = interpreter.get_input_details()[0]
+                    if input_details['shape'][0] != batch_size:
+                        interpreter.resize_tensor_input(
+                            input_details['index'], [batch_size, *input_details['shape'][1:]])
+                    interpreter.allocate_tensors()
+                    idle.put(interpreter)
+            except Exception as e:
+                logger.warning(f"Skipping TFLite batch size {batch_size}: {str(e)}")
+                continue
+            self._idle[batch_size] = idle
+
+        if not self._idle:
+            raise RuntimeError(f"No usable TFLite interpreter for {model_path}")
+        self.batch_sizes = sorted(self._idle)
+        sample = self._idle[self.batch_sizes[0]].queue[0]
+        self.input_shape = tuple(sample.get_input_details()[0]['shape'][1:])
+
+    @classmethod
+    def get(cls, model_path: str, size: int = 1, batch_sizes: Sequence[int] = (1,), num_threads: int = 1):
+        """Shared pool for ``model_path``; built on first use"""
+        key = (os.path.abspath(model_path), size, tuple(sorted(set(batch_sizes))), num_threads)
+        with cls._pools_lock:
+            if key not in cls._pools:
+                cls._pools[key] = cls(model_path, size, batch_sizes, num_threads)
+            return cls._pools[key]
+
+    def _run(self, batch_size: int, chunk: np.ndarray) -> np.ndarray:
+        interpreter = self._idle[batch_size].get()
+        try:
+            input_details = interpreter.get_input_details()[0]
+            output_details = interpreter.get_output_details()[0]
+            interpreter.set_tensor(input_details['index'], chunk)
+            interpreter.invoke()
+            return interpreter.get_tensor(output_details['index']).copy()
+        finally:
+            self._idle[batch_size].put(interpreter)
+
+    def predict(self, data: np.ndarray) -> np.ndarray:
+        if data.shape[1:] != self.input_shape:
+            raise ValueError(f"Input shape {data.shape} doesn't match model {self.input_shape}")
+        data = np.asarray(data, dtype=np.float32)
+        if not len(data):
+            return np.zeros((0, 1), dtype=np.float32)
+        largest = self.batch_sizes[-1]
+        outputs = []
+        for start in range(0, len(data), largest):
+            chunk = data[start:start + largest]
+            batch_size = next(size for size in self.batch_sizes if size >= len(chunk))
+            if batch_size != len(chunk):
+                padded = np.zeros((batch_size, *self.input_shape), dtype=np.float32)
+                padded[:len(chunk)] = chunk
+                outputs.append(self._run(batch_size, padded)[:len(chunk)])
+            else:
+                outputs.append(self._run(batch_size, chunk))
+        return np.concatenate(outputs)
+
+
 class AdaptiveAlphaModel:
     """Hybrid AI model with hardware-aware optimization and automatic quantization"""
     
-    def __init__(self, input_shape: Tuple[int, int] = (60, 5)):
+    def __init__(self, input_shape: Tuple[int, int] = (60, 5), registry: Optional[ModelRegistry] = None):
         self.device = DeviceOptimizer()
         self.config = self.device.get_optimal_config()
         self.input_shape = input_shape
-        self.model: Optional[tf.keras.Model] = None
+        self.registry = registry or ModelRegistry("models")
+        self.npz_path = os.path.join("models", f"{self.config['model_type']}_weights.npz")
+        self.batcher = WindowBatcher(window=input_shape[0], n_features=input_shape[1])
+        self.model: Optional['tf.keras.Model'] = None
+        self.version: Optional[str] = None
+        self._swap_thread: Optional[threading.Thread] = None
         self._initialize_model()
 
     def _initialize_model(self):
         """Smart model initialization with fallback handling"""
+        entry = self.registry.active()
+        if entry is not None:
+            try:
+                self.model = self._load_artifact(entry)
+                self.version = entry['version']
+                logger.info(f"Loaded registry model {entry['version']} ({entry['format']}, {entry['quantization']})")
+                return
+            except Exception as e:
+                logger.warning(f"Registry model {entry['version']} unusable, falling back: {str(e)}")
+        if self.config.get('inference_backend') == 'numpy':
+            try:
+                self.model = self._load_numpy_model()
+                logger.info(f"Loaded NumPy inference engine from {self.npz_path}")
+                return
+            except Exception as e:
+                logger.warning(f"NumPy backend unavailable, using Keras: {str(e)}")
         try:
             self.model = self._load_model()
             logger.info(f"Loaded {self.config['model_type']} model quantized as {self.config['quantization']}")
         except Exception as e:
             logger.error(f"Model loading failed: {str(e)}")
-            self._convert_model_to_lite()
-            self.model = self._load_model()
+            entry = self._convert_model_to_lite()
+            self.model = self._load_artifact(entry)
+            self.version = entry['version']
+
+    def _load_artifact(self, entry: dict):
+        """Open a registry artifact: TFLite and .npy weights are memory-mapped, not read"""
+        if tuple(entry['input_shape']) != tuple(self.input_shape):
+            raise ValueError(f"Model {entry['version']} expects {tuple(entry['input_shape'])}, "
+                             f"not {self.input_shape}")
+        path = self.registry.path(entry)
+        if entry['format'] == 'tflite':
+            return self._interpreter_pool(path)
+        if entry['format'] == 'numpy':
+            return NumpyLSTMModel.load(path)
+        return _tensorflow().keras.models.load_model(path, compile=False)
+
+    def _warm_up(self, model):
+        """Run one batch so lazy allocations and page faults happen before the swap"""
+        data = np.zeros((self.config['batch_size'], *self.input_shape), dtype=np.float32)
+        if isinstance(model, TFLiteInterpreterPool):
+            model.predict(data[:1])
+            model.predict(data)
+        else:
+            model.predict(data, batch_size=self.config['batch_size'], verbose=0)
+
+    def hot_swap(self, version: Optional[str] = None, wait: bool = False) -> Optional[threading.Thread]:
+        """Load and warm ``version`` (default: the registry's active one) off-thread, then switch.
+
+        The running model keeps serving until the new one is ready; the
+        switch itself is a single reference assignment, so in-flight
+        predictions finish on the version they started with.
+        """
+        if self._swap_thread is not None and self._swap_thread.is_alive():
+            return self._swap_thread
+        version = version or self.registry.active_version()
+        if version is None or version == self.version:
+            return None
+
+        def swap():
+            try:
+                entry = self.registry.entry(version)
+                model = self._load_artifact(entry)
+                self._warm_up(model)
+                self.model, self.version = model, version
+                logger.info(f"Hot-swapped model to {version}")
+            except Exception as e:
+                logger.error(f"Hot-swap to {version} failed, keeping {self.version}: {str(e)}")
+
+        self._swap_thread = threading.Thread(target=swap, name=f"model-swap-{version}", daemon=True)
+        self._swap_thread.start()
+        if wait:
+            self._swap_thread.join()
+        return self._swap_thread
+
+    def check_for_update(self) -> bool:
+        """Start a background swap if the registry's active version changed; call once per cycle"""
+        try:
+            return self.hot_swap() is not None
+        except Exception as e:
+            logger.error(f"Model registry check failed: {str(e)}")
+            return False
 
-    def _build_full_model(self) -> tf.keras.Model:
+    def _build_full_model(self) -> 'tf.keras.Model':
         """State-of-the-art trading model architecture"""
-        return tf.keras.Sequential([
-            tf.keras.layers.LSTM(128, input_shape=self.input_shape, return_sequences=True),
-            tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.LSTM(64),
-            tf.keras.layers.Dense(32, activation='swish'),
-            tf.keras.layers.Dense(1, activation='linear')
-        ], name="QuantumAlpha")
-
-    def _load_model(self) -> tf.keras.Model:
+        return build_quantum_alpha(self.input_shape)
+
+    def _load_model(self) -> 'tf.keras.Model':
         """Dynamic model loader with version control"""
         model_path = os.path.join("models", 
                                  f"{self.config['model_type']}_quant_{self.config['quantization']}.h5")
@@ -50,16 +236,26 @@ class AdaptiveAlphaModel:
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model {model_path} not found")
             
-        return tf.keras.models.load_model(model_path, compile=False)
+        return _tensorflow().keras.models.load_model(model_path, compile=False)
 
-    def _convert_model_to_lite(self):
-        """Automated model optimization pipeline"""
-        model_path = os.path.join("models", 
-                                f"{self.config['model_type']}_quant_{self.config['quantization']}.h5")
-        
+    def _load_numpy_model(self) -> NumpyLSTMModel:
+        """Load the exported weights, exporting them from the Keras model once if needed"""
+        if not os.path.exists(self.npz_path):
+            export_keras_weights(self._load_model(), self.npz_path)
+        return NumpyLSTMModel.load(self.npz_path)
+
+    def _convert_model_to_lite(self) -> dict:
+        """Automated model optimization pipeline; returns the new registry entry"""
+        from core.quantization import convert, store_windows
+
+        tf = _tensorflow()
         try:
-            # Generate calibration data (1% of training data)
-            calibration_data = np.random.randn(100, *self.input_shape).astype(np.float32)
+            # Calibrate on real bar windows; random data only if there is no history yet
+            try:
+                calibration_data = store_windows(window=self.input_shape[0], count=100)
+            except Exception as e:
+                logger.warning(f"No bar history for calibration, using random windows: {str(e)}")
+                calibration_data = np.random.randn(100, *self.input_shape).astype(np.float32)
             
             # Build and convert model
             model = self._build_full_model()
@@ -67,30 +263,18 @@ class AdaptiveAlphaModel:
                          loss=tf.keras.losses.Huber(),
                          metrics=['mae'])
             
-            converter = tf.lite.TFLiteConverter.from_keras_model(model)
-            
-            # Quantization rules
-            if self.config['quantization'] == 'int8':
-                converter.optimizations = [tf.lite.Optimize.DEFAULT]
-                converter.representative_dataset = lambda: [calibration_data]
-                converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
-            elif self.config['quantization'] == 'fp16':
-                converter.optimizations = [tf.lite.Optimize.DEFAULT]
-                converter.target_spec.supported_types = [tf.float16]
+            tflite_model = convert(model, self.config['quantization'], calibration_data,
+                                   allow_select_ops=self.config['model_type'] == 'arm-tflite')
             
-            # ARM-specific optimizations
-            if self.config['model_type'] == 'arm-tflite':
-                converter._experimental_allow_all_select_tf_ops = True
-                
-            tflite_model = converter.convert()
-            
-            # Ensure model directory exists
-            os.makedirs(os.path.dirname(model_path), exist_ok=True)
-            
-            with open(model_path, 'wb') as f:
-                f.write(tflite_model)
-                
-            logger.info(f"Successfully converted model to {model_path}")
+            entry = self.registry.register(
+                tflite_model,
+                architecture=model.name,
+                input_shape=self.input_shape,
+                quantization=self.config['quantization'],
+                fmt='tflite',
+            )
+            logger.info(f"Successfully converted model to {self.registry.path(entry)}")
+            return entry
             
         except Exception as e:
             logger.error(f"Model conversion failed: {str(e)}")
@@ -98,33 +282,113 @@ class AdaptiveAlphaModel:
 
     def predict(self, data: np.ndarray) -> np.ndarray:
         """Hardware-optimized inference pipeline"""
+        model = self.model  # read once; a concurrent hot-swap must not split a call across versions
         try:
-            if self.config['model_type'] == 'arm-tflite':
-                return self._predict_tflite(data)
-            return self.model.predict(data, batch_size=self.config['batch_size'], verbose=0)
+            if isinstance(model, TFLiteInterpreterPool):
+                return model.predict(data)
+            return model.predict(data, batch_size=self.config['batch_size'], verbose=0)
         except Exception as e:
             logger.error(f"Prediction failed: {str(e)}")
             return np.zeros((data.shape[0], 1))  # Fail-safe output
 
-    def _predict_tflite(self, data: np.ndarray) -> np.ndarray:
-        """Edge-optimized inference for ARM devices"""
-        try:
-            model_path = os.path.join("models", "arm_lite.tflite")
-            interpreter = tf.lite.Interpreter(model_path=model_path)
-            interpreter.allocate_tensors()
-            
-            input_details = interpreter.get_input_details()
-            output_details = interpreter.get_output_details()
-            
-            # Validate input shape
-            if data.shape[1:] != tuple(input_details[0]['shape'][1:]):
-                raise ValueError(f"Input shape {data.shape} doesn't match model {input_details[0]['shape']}")
-                
-            interpreter.set_tensor(input_details[0]['index'], data.astype(np.float32))
-            interpreter.invoke()
-            
-            return interpreter.get_tensor(output_details[0]['index'])
-            
-        except Exception as e:
-            logger.error(f"TFLite prediction failed: {str(e)}")
-            return np.zeros((data.shape[0], 1))
\ No newline at end of file
+    def predict_latest(self, bar_views, threshold: float = 0.0) -> list:
+        """Signals for the newest window of each bar view (one per symbol) in one batch"""
+        return self.predict_signals(self.batcher.stack(bar_views), threshold)
+
+    def predict_series(self, bars: np.ndarray) -> np.ndarray:
+        """Model output for every window of a ``(time, features)`` or ``(symbols, time, features)`` bar array"""
+        return self.batcher.predict(self.predict, sliding_windows(bars, self.input_shape[0]))
+
+    def predict_signals(self, windows: np.ndarray, threshold: float = 0.0) -> list:
+        """Single batched inference call mapped to one trade signal per window"""
+        scores = np.asarray(self.predict(windows), dtype=np.float64).reshape(len(windows), -1)[:, 0]
+        signals = []
+        for score in scores:
+            if score > threshold:
+                signal = 'buy'
+            elif score < -threshold:
+                signal = 'sell'
+            else:
+                signal = 'hold'
+            signals.append({'signal': signal, 'confidence': float(np.tanh(abs(score))), 'score': float(score)})
+        return signals
+
+    def _interpreter_pool(self, model_path: str) -> TFLiteInterpreterPool:
+        threads = self.config['inference_threads']
+        return TFLiteInterpreterPool.get(
+            model_path,
+            size=threads,
+            batch_sizes=(1, self.config['batch_size']),
+            num_threads=max(1, (self.device.cpu_cores or 1) // threads),
+        )
+
+
+class MLModels:
+    """Close-price LSTM behind bot.py's multi-step price forecasts.
+
+    Windows are z-scored individually, so one trained model forecasts
+    any symbol regardless of its price level. Forecasting encodes the
+    last window once and then feeds each prediction back through
+    NumpyLSTMModel.step, so every extra step is one cell update per
+    layer rather than another pass over the whole window; the recurrent
+    state keeps the full window as context instead of dropping its
+    oldest bar.
+    """
+
+    def __init__(self, market_data, window: int = 60, units: int = 50, epochs: int = 10, batch_size: int = 64):
+        self.market_data = market_data
+        self.window = window
+        self.units = units
+        self.epochs = epochs
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _closes(market_data) -> np.ndarray:
+        if hasattr(market_data, 'columns'):
+            return market_data['close'].to_numpy(dtype=np.float64)
+        return np.asarray(market_data, dtype=np.float64)
+
+    def _scaled_windows(self, closes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """z-scored windows over the last axis plus each window's mean and scale"""
+        mean = closes.mean(axis=-1, keepdims=True)
+        scale = closes.std(axis=-1, keepdims=True) + 1e-8
+        return (closes - mean) / scale, mean, scale
+
+    def train_model(self) -> NumpyLSTMModel:
+        """Fit next-close prediction on every window of ``market_data``; returns the NumPy engine"""
+        closes = self._closes(self.market_data)
+        if len(closes) <= self.window:
+            raise ValueError(f"Need more than {self.window} bars to train, got {len(closes)}")
+        windows, mean, scale = self._scaled_windows(sliding_windows(closes[:, np.newaxis], self.window)[:-1, :, 0])
+        targets = (closes[self.window:, np.newaxis] - mean) / scale
+
+        tf = _tensorflow()
+        model = tf.keras.Sequential([
+            tf.keras.layers.LSTM(self.units, input_shape=(self.window, 1)),
+            tf.keras.layers.Dense(1)
+        ], name="CloseForecaster")
+        model.compile(optimizer='adam', loss='mse')
+        model.fit(windows[..., np.newaxis].astype(np.float32), targets.astype(np.float32),
+                  epochs=self.epochs, batch_size=self.batch_size, verbose=0)
+        logger.info(f"Trained {model.name} on {len(windows)} windows")
+        return NumpyLSTMModel.from_keras(model)
+
+    def forecast(self, model, closes, steps: int = 10) -> np.ndarray:
+        """``steps`` future closes for every row of a ``(symbols, time)`` price array in one batch"""
+        engine = model if isinstance(model, NumpyLSTMModel) else NumpyLSTMModel.from_keras(model)
+        closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+        if closes.shape[-1] < self.window:
+            raise ValueError(f"Need {self.window} bars to forecast, got {closes.shape[-1]}")
+        scaled, mean, scale = self._scaled_windows(closes[:, -self.window:])
+
+        out = np.empty((len(closes), steps), dtype=np.float64)
+        prediction, states = engine.encode(scaled[..., np.newaxis])
+        for step in range(steps):
+            out[:, step] = prediction[:, 0]
+            if step + 1 < steps:
+                prediction, states = engine.step(prediction[:, :1], states)
+        return out * scale + mean
+
+    def predict_future(self, model, steps: int = 10) -> np.ndarray:
+        """``(steps, 1)`` forecast of the next closes of ``market_data``"""
+        return self.forecast(model, self._closes(self.market_data), steps)[0][:, np.newaxis]
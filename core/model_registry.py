@@ -0,0 +1,188 @@
+# core/model_registry.py
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+
+# Artifact format by file suffix; 'numpy' directories hold memory-mappable .npy weights
+FORMATS = {'.tflite': 'tflite', '.h5': 'keras', '.keras': 'keras', '.npz': 'numpy', '': 'numpy'}
+
+
+def data_fingerprint(*sources: Union[str, np.ndarray, bytes]) -> str:
+    """Short sha256 over training inputs: file paths, arrays or raw bytes"""
+    digest = hashlib.sha256()
+    for source in sources:
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+        elif isinstance(source, np.ndarray):
+            digest.update(np.ascontiguousarray(source).data)
+        else:
+            digest.update(source)
+    return digest.hexdigest()[:16]
+
+
+def atomic_write(path: str, data: bytes):
+    """Write via a temp file in the same directory so readers never see a partial file"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class ModelRegistry:
+    """Versioned model artifacts described by ``models/manifest.json``.
+
+    Every entry records the architecture, input shape, quantization,
+    training-data hash, format and creation time of one artifact. The
+    manifest also names the active version; changing it (``activate`` or
+    ``python -m core.model_registry activate <version>``) is what running
+    bots watch for to hot-swap. Manifest and artifacts are written
+    atomically, and the manifest is only re-read when its mtime changes.
+    """
+
+    def __init__(self, root: str = 'models'):
+        self.root = str(root)
+        self.manifest_path = os.path.join(self.root, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self._cached: Optional[dict] = None
+        self._cached_mtime: Optional[int] = None
+
+    def _read(self) -> dict:
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return {'active': None, 'models': {}}
+        if mtime != self._cached_mtime:
+            with open(self.manifest_path) as f:
+                self._cached = json.load(f)
+            self._cached_mtime = mtime
+        return self._cached
+
+    def _write(self, manifest: dict):
+        os.makedirs(self.root, exist_ok=True)
+        atomic_write(self.manifest_path, json.dumps(manifest, indent=2).encode())
+        self._cached, self._cached_mtime = None, None
+
+    def versions(self) -> List[dict]:
+        return sorted(self._read()['models'].values(), key=lambda entry: entry['version'])
+
+    def entry(self, version: str) -> dict:
+        try:
+            return self._read()['models'][version]
+        except KeyError:
+            raise KeyError(f"Unknown model version {version}") from None
+
+    def active_version(self) -> Optional[str]:
+        """Cheap enough to call every trading cycle: one stat() unless the manifest changed"""
+        return self._read()['active']
+
+    def active(self) -> Optional[dict]:
+        version = self.active_version()
+        return self.entry(version) if version else None
+
+    def path(self, entry: dict) -> str:
+        return os.path.join(self.root, entry['path'])
+
+    def register(self, artifact: Union[str, bytes], architecture: str, input_shape: Sequence[int],
+                 quantization: str = 'fp32', data_hash: Optional[str] = None, fmt: Optional[str] = None,
+                 activate: bool = True, **metadata) -> dict:
+        """Copy an artifact (a path or serialized bytes) into the registry as a new version"""
+        if fmt is None:
+            if isinstance(artifact, bytes):
+                raise ValueError("fmt is required when registering raw bytes")
+            fmt = FORMATS.get(os.path.splitext(str(artifact))[1].lower())
+            if fmt is None:
+                raise ValueError(f"Unknown model format: {artifact}")
+        if isinstance(artifact, bytes):
+            suffix = {'tflite': '.tflite', 'keras': '.keras', 'numpy': '.npz'}[fmt]
+        else:
+            suffix = os.path.splitext(str(artifact))[1]
+
+        with self._lock:
+            manifest = self._read()
+            manifest = {'active': manifest['active'], 'models': dict(manifest['models'])}
+            number = 1 + max((int(v[1:]) for v in manifest['models']), default=0)
+            version = f"v{number:04d}"
+            relative = f"{architecture}-{version}{suffix}"
+            target = os.path.join(self.root, relative)
+            os.makedirs(self.root, exist_ok=True)
+
+            if isinstance(artifact, bytes):
+                atomic_write(target, artifact)
+            elif os.path.isdir(artifact):
+                staging = tempfile.mkdtemp(dir=self.root, prefix='.tmp-')
+                shutil.rmtree(staging)
+                shutil.copytree(artifact, staging)
+                os.replace(staging, target)
+            else:
+                with open(artifact, 'rb') as f:
+                    atomic_write(target, f.read())
+
+            entry = {
+                'version': version,
+                'architecture': architecture,
+                'input_shape': [int(n) for n in input_shape],
+                'quantization': quantization,
+                'format': fmt,
+                'data_hash': data_hash,
+                'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'path': relative,
+                **metadata,
+            }
+            manifest['models'][version] = entry
+            if activate:
+                manifest['active'] = version
+            self._write(manifest)
+        logger.info(f"Registered {architecture} {version} ({fmt}, {quantization})")
+        return entry
+
+    def activate(self, version: str):
+        self.entry(version)
+        with self._lock:
+            manifest = dict(self._read())
+            manifest['active'] = version
+            self._write(manifest)
+        logger.info(f"Activated model {version}")
+
+    def find(self, **criteria) -> List[dict]:
+        """Entries whose fields equal every given value, oldest first"""
+        return [entry for entry in self.versions()
+                if all(entry.get(key) == value for key, value in criteria.items())]
+
+
+if __name__ == '__main__':
+    registry = ModelRegistry()
+    if len(sys.argv) >= 3 and sys.argv[1] == 'activate':
+        registry.activate(sys.argv[2])
+    elif len(sys.argv) >= 2 and sys.argv[1] == 'list':
+        active = registry.active_version()
+        for entry in registry.versions():
+            marker = '*' if entry['version'] == active else ' '
+            print(f"{marker} {entry['version']}  {entry['architecture']:<16} {entry['format']:<7} "
+                  f"{entry['quantization']:<5} {tuple(entry['input_shape'])}  {entry['created_at']}")
+    else:
+        print("Usage: python -m core.model_registry list | activate <version>")
+        sys.exit(1)
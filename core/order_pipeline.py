@@ -0,0 +1,206 @@
+# core/order_pipeline.py
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RETCODE_REQUOTE = 10004
+RETCODE_DONE = 10009
+RETCODE_DONE_PARTIAL = 10010
+RETCODE_PRICE_CHANGED = 10020
+RETCODE_PRICE_OFF = 10021
+RETCODE_INVALID_FILL = 10030
+RETRY_PRICE = {RETCODE_REQUOTE, RETCODE_PRICE_CHANGED, RETCODE_PRICE_OFF}
+
+ORDER_FILLING_FOK, ORDER_FILLING_IOC, ORDER_FILLING_RETURN = 0, 1, 2
+# symbol_info().filling_mode flags
+SYMBOL_FILLING_FOK, SYMBOL_FILLING_IOC = 1, 2
+
+
+def _fallback_filling(filling: int, allowed: Optional[int]) -> Optional[int]:
+    """Next filling type to try after ``filling`` was rejected: FOK -> IOC -> RETURN"""
+    for candidate in (ORDER_FILLING_IOC, ORDER_FILLING_RETURN):
+        if candidate <= filling:
+            continue
+        if candidate == ORDER_FILLING_IOC and allowed is not None and not allowed & SYMBOL_FILLING_IOC:
+            continue
+        return candidate
+    return None
+
+
+def collect(futures: Iterable[Future]) -> List[dict]:
+    """Wait for every future; one that raised becomes an 'error' outcome instead of losing the rest"""
+    outcomes = []
+    for future in futures:
+        try:
+            outcomes.append(future.result())
+        except Exception as e:
+            outcomes.append({'status': 'error', 'retcode': None, 'comment': str(e), 'attempts': 0,
+                             'filling': None, 'result': None, 'latency_ms': {}})
+    return outcomes
+
+
+class OrderPipeline:
+    """Bounded queue of market orders worked off by a small thread pool.
+
+    ``submit`` returns a Future right away; a full queue blocks the
+    caller (back-pressure). Requotes and price changes are retried up to
+    ``max_retries`` times at a freshly fetched tick, and an unsupported
+    filling type falls back FOK -> IOC -> RETURN. Close requests are
+    deduplicated by position ticket while in flight. Every Future
+    resolves to a dict with the final status, the terminal result and a
+    latency breakdown in milliseconds.
+    """
+
+    def __init__(self, terminal, snapshot=None, workers: int = 4, queue_size: int = 64, max_retries: int = 3):
+        self.terminal = terminal
+        self.snapshot = snapshot
+        self.max_retries = max_retries
+        self._queue: 'queue.Queue' = queue.Queue(maxsize=queue_size)
+        self._closing: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._workers = [threading.Thread(target=self._run, name=f"order-{i}", daemon=True) for i in range(workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, request: dict) -> Future:
+        future: Future = Future()
+        self._enqueue(request, future)
+        return future
+
+    def send(self, request: dict) -> dict:
+        """Work ``request`` off on the calling thread and return its outcome.
+
+        Same retries, fallback and outcome dict as ``submit``, without the
+        two thread switches; for a caller that would only block on the
+        Future. The terminal session serializes calls either way.
+        """
+        return self._execute(dict(request))
+
+    def _enqueue(self, request: dict, future: Future):
+        self._queue.put((dict(request), future, time.perf_counter()))
+
+    def close_position(self, position, deviation: int = 20, magic: int = 0, comment: str = "AI Close") -> Future:
+        """Close ``position`` (a positions_get record); a ticket already being closed shares its Future"""
+        with self._lock:
+            future = self._closing.get(position.ticket)
+            if future is not None:
+                return future
+            future = self._closing[position.ticket] = Future()
+        future.add_done_callback(lambda _: self._forget(position.ticket))
+        buy = position.type == self.terminal.ORDER_TYPE_SELL
+        # Enqueued outside the lock: a full queue must not block workers finishing other closes
+        self._enqueue({
+            "position": position.ticket,
+            "action": self.terminal.TRADE_ACTION_DEAL,
+            "symbol": position.symbol,
+            "volume": position.volume,
+            "type": self.terminal.ORDER_TYPE_BUY if buy else self.terminal.ORDER_TYPE_SELL,
+            "deviation": deviation,
+            "magic": magic,
+            "comment": comment,
+            "type_time": self.terminal.ORDER_TIME_GTC,
+        }, future)
+        return future
+
+    def _forget(self, ticket: int):
+        with self._lock:
+            self._closing.pop(ticket, None)
+
+    def close_all(self, positions: Iterable, **kwargs) -> List[Future]:
+        """Queue a close for every distinct ticket at once; the workers send them concurrently"""
+        futures: Dict[int, Future] = {}
+        for position in positions:
+            if position.ticket not in futures:
+                futures[position.ticket] = self.close_position(position, **kwargs)
+        return list(futures.values())
+
+    def shutdown(self, wait: bool = True):
+        for _ in self._workers:
+            self._queue.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            request, future, queued_at = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._execute(request, queued_at))
+            except Exception as e:
+                logger.error(f"Order pipeline error for {request.get('symbol')}: {str(e)}")
+                future.set_exception(e)
+
+    def _tick(self, symbol: str, fresh: bool):
+        if self.snapshot is not None and not fresh:
+            return self.snapshot.tick(symbol)
+        return self.terminal.symbol_info_tick(symbol)
+
+    def _execute(self, request: dict, queued_at: Optional[float] = None) -> dict:
+        started = time.perf_counter()
+        queued_at = started if queued_at is None else queued_at
+        latency = {'queue': (started - queued_at) * 1000, 'tick': 0.0, 'send': 0.0}
+        symbol = request['symbol']
+        buy = request['type'] == self.terminal.ORDER_TYPE_BUY
+        info = self.snapshot.symbol_info(symbol) if self.snapshot is not None else self.terminal.symbol_info(symbol)
+        allowed = getattr(info, 'filling_mode', None)
+        filling = request.get('type_filling', ORDER_FILLING_FOK)
+        if filling == ORDER_FILLING_FOK and allowed is not None and not allowed & SYMBOL_FILLING_FOK:
+            filling = _fallback_filling(filling, allowed)
+
+        result, attempts, reprice = None, 0, 'price' not in request
+        while attempts <= self.max_retries:
+            attempts += 1
+            if reprice:
+                t0 = time.perf_counter()
+                tick = self._tick(symbol, fresh=attempts > 1)
+                latency['tick'] += (time.perf_counter() - t0) * 1000
+                if tick is None:
+                    break
+                request['price'] = tick.ask if buy else tick.bid
+            request['type_filling'] = filling
+
+            t0 = time.perf_counter()
+            result = self.terminal.order_send(request)
+            latency['send'] += (time.perf_counter() - t0) * 1000
+            if result is None or result.retcode in (RETCODE_DONE, RETCODE_DONE_PARTIAL):
+                break
+            if result.retcode in RETRY_PRICE:
+                reprice = True
+                continue
+            if result.retcode == RETCODE_INVALID_FILL:
+                fallback = _fallback_filling(filling, allowed)
+                if fallback is not None:
+                    filling = fallback
+                    continue
+            break
+
+        if self.snapshot is not None:
+            self.snapshot.invalidate_account()
+        latency['total'] = (time.perf_counter() - queued_at) * 1000
+        done = result is not None and result.retcode in (RETCODE_DONE, RETCODE_DONE_PARTIAL)
+        if result is None:
+            status, retcode, comment = 'error', None, str(self.terminal.last_error())
+        else:
+            status, retcode, comment = 'done' if done else 'rejected', result.retcode, result.comment
+        if not done:
+            logger.error(f"Order {status} for {symbol} after {attempts} attempt(s): {comment}")
+        return {
+            'status': status,
+            'retcode': retcode,
+            'comment': comment,
+            'attempts': attempts,
+            'filling': filling,
+            'result': result._asdict() if result is not None else None,
+            'latency_ms': latency,
+        }
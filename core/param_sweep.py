@@ -0,0 +1,275 @@
+# core/param_sweep.py
+
+import os
+import time
+import logging
+import itertools
+import multiprocessing
+from functools import lru_cache
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.backtest import backtest
+from core.bar_buffer import BAR_DTYPE
+
+logger = logging.getLogger(__name__)
+
+# Swept settings, in scenario-matrix column order (Config names, lower case)
+PARAMS = ('risk_per_trade', 'max_daily_loss', 'max_lot_size', 'stop_loss_pct', 'take_profit_pct')
+
+RESULT_DTYPE = np.dtype(
+    [('scenario', 'u4'), ('path', 'u2')]
+    + [(name, 'f4') for name in PARAMS]
+    + [('net_return', 'f4'), ('max_drawdown', 'f4'), ('trades', 'u4'), ('win_rate', 'f4'), ('halted_days', 'u2')]
+)
+
+
+def default_params() -> Dict[str, float]:
+    from config import Config
+    return {name: float(getattr(Config, name.upper())) for name in PARAMS}
+
+
+def sma_crossover(bars: np.ndarray, length: int = 20) -> np.ndarray:
+    """Default sweep strategy: long above the SMA, flat below it"""
+    close = np.asarray(bars['close'], dtype=np.float64)
+    sums = np.cumsum(close)
+    sma = np.empty_like(close)
+    sma[:length] = sums[:length] / np.arange(1, min(length, len(close)) + 1)
+    sma[length:] = (sums[length:] - sums[:-length]) / length
+    return np.where(close > sma, 1, -1).astype(np.int8)
+
+
+STRATEGIES: Dict[str, Callable[[np.ndarray], np.ndarray]] = {'sma': sma_crossover}
+
+
+def grid(**values: Sequence[float]) -> np.ndarray:
+    """Every combination of the given values; unnamed PARAMS keep their Config value"""
+    defaults = default_params() if set(PARAMS) - set(values) else {}
+    axes = [values.get(name, [defaults.get(name)]) for name in PARAMS]
+    return np.array(list(itertools.product(*axes)), dtype=np.float64).reshape(-1, len(PARAMS))
+
+
+def random_search(count: int, seed: int = 0, **ranges: Tuple[float, float]) -> np.ndarray:
+    """``count`` scenarios drawn uniformly from ``(low, high)`` ranges; unnamed PARAMS keep their Config value"""
+    defaults = default_params() if set(PARAMS) - set(ranges) else {}
+    rng = np.random.default_rng(seed)
+    columns = [rng.uniform(*ranges[name], size=count) if name in ranges else np.full(count, defaults[name])
+               for name in PARAMS]
+    return np.column_stack(columns)
+
+
+def bootstrap_path(bars: np.ndarray, seed: int, block: int = 96) -> np.ndarray:
+    """Synthetic bar history from a stationary block bootstrap of ``bars``.
+
+    Blocks of consecutive bars (geometric lengths, mean ``block``) are
+    drawn with replacement and chained on their close-to-close returns,
+    keeping intrabar ranges and spreads. Bar times are left untouched so
+    day boundaries line up with the original history.
+    """
+    n = len(bars)
+    close = np.asarray(bars['close'], dtype=np.float64)
+    previous = np.concatenate([[close[0]], close[:-1]])
+    rng = np.random.default_rng(seed)
+
+    starts = rng.integers(1, n, size=n)
+    new_block = rng.random(n) < 1.0 / block
+    new_block[0] = True
+    # Inside a block the source index advances by one; at a block start it jumps to a random bar
+    anchor = np.maximum.accumulate(np.where(new_block, np.arange(n), 0))
+    source = starts[anchor] + (np.arange(n) - anchor)
+    source = np.where(source >= n, 1 + (source - 1) % (n - 1), source)
+
+    path = bars[source].copy()
+    path['time'] = bars['time']
+    growth = close[source] / previous[source]
+    growth[0] = 1.0
+    path_close = close[0] * np.cumprod(growth)
+    path_previous = np.concatenate([[close[0]], path_close[:-1]])
+    for field in ('open', 'high', 'low', 'close'):
+        path[field] = path_previous * (np.asarray(bars[field], dtype=np.float64)[source] / previous[source])
+    return path
+
+
+# Worker-side state: the bars and scenario matrix are attached from shared memory once per process
+_worker: dict = {}
+
+
+def _share(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, dict]:
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+    return block, {'name': block.name, 'shape': array.shape, 'dtype': array.dtype}
+
+
+def _attach(spec: dict) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    block = shared_memory.SharedMemory(name=spec['name'])
+    return block, np.ndarray(spec['shape'], spec['dtype'], buffer=block.buf)
+
+
+def _init_worker(bars_spec: dict, scenarios_spec: dict, strategy: str, contract_size: float, balance: float,
+                 block: int, seed: int):
+    bars_block, bars = _attach(bars_spec)
+    scenarios_block, scenarios = _attach(scenarios_spec)
+    _worker.update(blocks=(bars_block, scenarios_block), bars=bars, scenarios=scenarios, strategy=strategy,
+                   contract_size=contract_size, balance=balance, block=block, seed=seed)
+    _path.cache_clear()
+    _trades.cache_clear()
+
+
+@lru_cache(maxsize=4)
+def _path(path: int) -> Tuple[np.ndarray, np.ndarray]:
+    bars = _worker['bars']
+    if path:
+        bars = bootstrap_path(bars, _worker['seed'] + path, _worker['block'])
+    return bars, STRATEGIES[_worker['strategy']](bars)
+
+
+@lru_cache(maxsize=64)
+def _trades(path: int, stop_loss: float, take_profit: float) -> Tuple[list, ...]:
+    """Closed trades for one price path and SL/TP pair, per unit of volume"""
+    bars, signals = _path(path)
+    trades = backtest(bars, signals, volume=1.0, stop_loss=stop_loss or None,
+                      take_profit=take_profit or None, slippage_pips=0.0).trades
+    trades = trades[trades['reason'] != 'open']
+    days = np.asarray(bars['time'], dtype=np.int64)[trades['entry_index']] // 86400
+    return days.tolist(), trades['entry_price'].tolist(), trades['pnl'].tolist()
+
+
+def simulate(days: Sequence[int], entry_prices: Sequence[float], unit_pnl: Sequence[float], risk_per_trade: float,
+             max_daily_loss: float, max_lot_size: float, balance: float = 10000.0,
+             contract_size: float = 100000.0) -> Tuple[float, float, int, float, int]:
+    """Replay a trade sequence with the executor's sizing and the daily loss stop.
+
+    Lots are ``min(balance * risk / (price * contract_size), max_lot_size)``
+    as in MT5TradeExecutor (without the broker's volume step). Once a UTC
+    day's realized loss reaches ``max_daily_loss`` of its starting balance,
+    the rest of that day's entries are skipped. Returns the net return,
+    max drawdown, trades taken, win rate and halted days.
+    """
+    start = peak = balance
+    drawdown, taken, wins, halted = 0.0, 0, 0, 0
+    day, day_start, day_pnl, stopped = None, balance, 0.0, False
+    for entry_day, price, pnl in zip(days, entry_prices, unit_pnl):
+        if entry_day != day:
+            day, day_start, day_pnl, stopped = entry_day, balance, 0.0, False
+        if stopped:
+            continue
+        lots = min(balance * risk_per_trade / (price * contract_size), max_lot_size)
+        profit = pnl * lots * contract_size
+        balance += profit
+        day_pnl += profit
+        taken += 1
+        wins += profit > 0
+        if balance > peak:
+            peak = balance
+        elif peak - balance > drawdown * peak:
+            drawdown = (peak - balance) / peak
+        if day_pnl <= -max_daily_loss * day_start:
+            stopped = True
+            halted += 1
+    return balance / start - 1.0, -drawdown, taken, wins / taken if taken else float('nan'), halted
+
+
+def _run_chunk(rows: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """Score ``(scenario, path)`` pairs; ordered so consecutive rows share a path and SL/TP"""
+    out = np.zeros(len(rows), dtype=RESULT_DTYPE)
+    for row, (scenario, path) in enumerate(rows):
+        risk, daily, max_lot, stop_loss, take_profit = _worker['scenarios'][scenario]
+        trades = _trades(path, float(stop_loss), float(take_profit))
+        metrics = simulate(*trades, risk, daily, max_lot, _worker['balance'], _worker['contract_size'])
+        out[row] = (scenario, path, risk, daily, max_lot, stop_loss, take_profit, *metrics)
+    return out
+
+
+def sweep(bars: np.ndarray, scenarios: np.ndarray, paths: int = 0, output: Optional[str] = None,
+          workers: Optional[int] = None, strategy: str = 'sma', balance: float = 10000.0,
+          contract_size: float = 100000.0, block: int = 96, seed: int = 0, chunk_size: int = 256) -> np.ndarray:
+    """Score every scenario on the real history plus ``paths`` bootstrap paths on a process pool.
+
+    ``scenarios`` is an ``(n, len(PARAMS))`` matrix from ``grid`` or
+    ``random_search``. Bars and scenarios go to the workers once through
+    shared memory; each task is just a list of ``(scenario, path)``
+    indices. Result rows (RESULT_DTYPE) are written to ``output`` (an
+    ``.npy`` file, created up front and filled as chunks finish) or to an
+    in-memory array.
+    """
+    bars = np.ascontiguousarray(bars, dtype=BAR_DTYPE)
+    scenarios = np.ascontiguousarray(scenarios, dtype=np.float64)
+    # Path-major, then SL/TP, so a chunk mostly reuses one cached backtest
+    order = np.lexsort((scenarios[:, 4], scenarios[:, 3]))
+    rows = [(int(s), p) for p in range(paths + 1) for s in order]
+    if output:
+        results = np.lib.format.open_memmap(output, mode='w+', dtype=RESULT_DTYPE, shape=(len(rows),))
+    else:
+        results = np.zeros(len(rows), dtype=RESULT_DTYPE)
+
+    workers = workers or os.cpu_count() or 1
+    # Small sweeps still get a few chunks per worker
+    chunk_size = max(1, min(chunk_size, -(-len(rows) // (workers * 4))))
+    chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    workers = min(workers, len(chunks))
+    bars_block, bars_spec = _share(bars)
+    scenarios_block, scenarios_spec = _share(scenarios)
+    started, done = time.perf_counter(), 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker,
+                                 initargs=(bars_spec, scenarios_spec, strategy, contract_size, balance,
+                                           block, seed)) as pool:
+            futures = {pool.submit(_run_chunk, chunk): i * chunk_size for i, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                chunk = future.result()
+                results[futures[future]:futures[future] + len(chunk)] = chunk
+                done += len(chunk)
+                if done == len(rows) or done % (chunk_size * workers * 4) < len(chunk):
+                    logger.info(f"{done}/{len(rows)} scenarios ({done / (time.perf_counter() - started):.0f}/s)")
+    finally:
+        for block_ in (bars_block, scenarios_block):
+            block_.close()
+            block_.unlink()
+    if output:
+        results.flush()
+    logger.info(f"Swept {len(rows)} scenarios on {workers} workers in {time.perf_counter() - started:.1f}s")
+    return results
+
+
+def summarize(results: np.ndarray, top: int = 10, by: str = 'net_return') -> str:
+    """Per-parameter-set median/5th percentile across paths, best ``top`` by the median of ``by``"""
+    table = []
+    for scenario in np.unique(results['scenario']):
+        rows = results[results['scenario'] == scenario]
+        table.append((np.median(rows[by]), np.percentile(rows[by], 5), np.median(rows['max_drawdown']),
+                      np.median(rows['trades']), rows[0]))
+    table.sort(key=lambda row: -row[0])
+    lines = [" ".join(f"{name[:12]:>12}" for name in PARAMS)
+             + f" {by + ' p50':>16} {'p5':>8} {'dd p50':>8} {'trades':>7}"]
+    for median, p5, drawdown, trades, row in table[:top]:
+        lines.append(" ".join(f"{row[name]:>12.4f}" for name in PARAMS)
+                     + f" {median:>16.4f} {p5:>8.4f} {drawdown:>8.4f} {trades:>7.0f}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import argparse
+    from core.bar_store import BarStore
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Sweep risk settings over a bar history and bootstrap paths")
+    parser.add_argument('data', help="Bar store file (SYMBOL_TIMEFRAME.bars)")
+    parser.add_argument('--random', type=int, help="Random search with this many scenarios (default: grid)")
+    parser.add_argument('--paths', type=int, default=0, help="Bootstrap paths per scenario")
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', default=os.path.join('data', 'param_sweep.npy'))
+    args = parser.parse_args()
+
+    if args.random:
+        matrix = random_search(args.random, risk_per_trade=(0.005, 0.05), max_daily_loss=(0.01, 0.1),
+                               max_lot_size=(0.1, 10.0), stop_loss_pct=(0.002, 0.03), take_profit_pct=(0.002, 0.06))
+    else:
+        matrix = grid(risk_per_trade=[0.005, 0.01, 0.02, 0.03], max_daily_loss=[0.02, 0.05, 0.1],
+                      stop_loss_pct=[0.005, 0.01, 0.02], take_profit_pct=[0.01, 0.02, 0.04])
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    swept = sweep(np.asarray(BarStore(args.data).bars), matrix, args.paths, args.output, args.workers)
+    print(summarize(swept))
@@ -0,0 +1,68 @@
+# core/prediction_cache.py
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+
+
+class PredictionCache:
+    """Bounded LRU of model outputs keyed by (symbol, timeframe, last bar time, model version, last bar).
+
+    A prediction only depends on the bars and the model. The newest bar
+    is still forming, so its values are part of the key: while no tick
+    has moved it and no model was swapped in, the cached output is
+    returned without touching the model. Hit/miss/eviction counters feed
+    the cycle log and the dashboard's /metrics endpoint.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, object]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    @staticmethod
+    def key(symbol: str, timeframe: str, last_bar_time: Optional[int], model_version: Optional[str] = None,
+            last_bar: tuple = ()) -> tuple:
+        return (symbol, timeframe, last_bar_time, model_version, last_bar)
+
+    def get(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], object]):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
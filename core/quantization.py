@@ -0,0 +1,208 @@
+# core/quantization.py
+
+import os
+import json
+import glob
+import logging
+import tempfile
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import psutil
+
+from core.bar_buffer import OHLCV_FIELDS
+from core.bar_store import BarStore
+from core.model_registry import ModelRegistry, atomic_write, data_fingerprint
+from core.windowing import normalize_windows, sliding_windows
+from utils.benchmark import latency_profile
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = ('fp32', 'fp16', 'int8')
+
+
+def default_error_budget() -> float:
+    from config import Config
+    return Config.QUANT_ERROR_BUDGET
+
+
+def representative_windows(bars: Sequence[np.ndarray], window: int = 60, count: int = 500,
+                           seed: int = 0) -> np.ndarray:
+    """Sample ``count`` real windows from one or more bar histories, preprocessed like live inference.
+
+    ``bars`` holds BAR_DTYPE arrays (e.g. ``BarStore.bars``). Windows are
+    drawn uniformly across all histories and z-scored the same way
+    WindowBatcher does it, so the calibration ranges match what the
+    model sees in production.
+    """
+    views = [sliding_windows(np.stack([np.asarray(b[field], dtype=np.float32) for field in OHLCV_FIELDS], axis=-1), window)
+             for b in bars if len(b) >= window]
+    if not views:
+        raise ValueError(f"No bar history with at least {window} bars")
+    sizes = np.array([len(view) for view in views])
+    picks = np.random.default_rng(seed).choice(sizes.sum(), size=min(count, sizes.sum()), replace=False)
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    batch = np.empty((len(picks), window, len(OHLCV_FIELDS)), dtype=np.float32)
+    for row, pick in enumerate(picks):
+        source = np.searchsorted(offsets, pick, side='right') - 1
+        batch[row] = views[source][pick - offsets[source]]
+    return normalize_windows(batch)
+
+
+def store_windows(root: Optional[str] = None, window: int = 60, count: int = 500, seed: int = 0) -> np.ndarray:
+    """representative_windows over every ``*.bars`` file in the bar store directory"""
+    if root is None:
+        from core.bar_store import default_root
+        root = default_root()
+    paths = sorted(glob.glob(os.path.join(str(root), '*.bars')))
+    return representative_windows([BarStore(path).bars for path in paths], window, count, seed)
+
+
+def convert(model, variant: str, calibration: np.ndarray, allow_select_ops: bool = False) -> bytes:
+    """Convert a Keras model to TFLite; int8 is calibrated on ``calibration`` windows"""
+    from core.ml_models import _tensorflow
+    tf = _tensorflow()
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if variant == 'fp16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == 'int8':
+        def representative_dataset():
+            for sample in calibration:
+                yield [sample[np.newaxis].astype(np.float32)]
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        # Integer kernels where they exist; float fallback keeps the LSTM convertible
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8, tf.lite.OpsSet.TFLITE_BUILTINS]
+    elif variant != 'fp32':
+        raise ValueError(f"Unknown quantization variant: {variant}")
+    if allow_select_ops:
+        converter._experimental_allow_all_select_tf_ops = True
+    return converter.convert()
+
+
+def benchmark_variant(model_bytes: bytes, windows: np.ndarray, reference: Optional[np.ndarray] = None,
+                      batch_size: int = 64, repeats: int = 200) -> Tuple[dict, np.ndarray]:
+    """Latency, throughput, memory and error against ``reference`` outputs on the local CPU.
+
+    Returns the measurements and the variant's outputs on ``windows``.
+    """
+    from core.ml_models import TFLiteInterpreterPool
+
+    with tempfile.NamedTemporaryFile(suffix='.tflite', delete=False) as f:
+        f.write(model_bytes)
+    try:
+        process = psutil.Process()
+        rss_before = process.memory_info().rss
+        pool = TFLiteInterpreterPool(f.name, size=1, batch_sizes=(1, batch_size))
+        rss_after = process.memory_info().rss
+
+        single = windows[:1]
+        batch = windows[:batch_size]
+        latency = latency_profile(lambda: pool.predict(single), repeats)
+        throughput = latency_profile(lambda: pool.predict(batch), max(10, repeats // 10))
+        outputs = pool.predict(windows)[:, 0]
+    finally:
+        os.remove(f.name)
+
+    result = {
+        'model_bytes': len(model_bytes),
+        'runtime_bytes': max(0, rss_after - rss_before),
+        'p50_ms': latency['p50_ms'],
+        'p99_ms': latency['p99_ms'],
+        'windows_per_sec': throughput['calls_per_sec'] * len(batch),
+    }
+    if reference is not None:
+        scale = float(np.std(reference)) or 1.0
+        result.update({
+            'max_abs_error': float(np.max(np.abs(outputs - reference))),
+            # error relative to the spread of fp32 scores, so the budget is unit-free
+            'relative_error': float(np.mean(np.abs(outputs - reference)) / scale),
+            'signal_agreement': float(np.mean(np.sign(outputs) == np.sign(reference))),
+        })
+    return result, outputs
+
+
+def quantize_and_select(model, windows: np.ndarray, registry: Optional[ModelRegistry] = None,
+                        error_budget: Optional[float] = None, variants: Sequence[str] = VARIANTS,
+                        report_path: Optional[str] = None, calibration_share: float = 0.5) -> dict:
+    """Build every variant, benchmark it and register the fastest one within ``error_budget``.
+
+    The first ``calibration_share`` of ``windows`` calibrates int8; the
+    rest is held out for measuring error, so no variant is scored on the
+    data it was calibrated with. Every variant is registered with its
+    benchmark; only the selected one is activated.
+    """
+    registry = registry or ModelRegistry("models")
+    error_budget = default_error_budget() if error_budget is None else error_budget
+    split = max(1, int(len(windows) * calibration_share))
+    calibration, evaluation = windows[:split], windows[split:]
+    if not len(evaluation):
+        raise ValueError("Need more representative windows than the calibration share")
+
+    report: Dict[str, dict] = {}
+    built: Dict[str, bytes] = {}
+    reference = None
+    for variant in ('fp32', *[v for v in variants if v != 'fp32']):
+        try:
+            built[variant] = convert(model, variant, calibration)
+            report[variant], outputs = benchmark_variant(built[variant], evaluation, reference)
+            if variant == 'fp32':
+                reference = outputs
+                report[variant].update(max_abs_error=0.0, relative_error=0.0, signal_agreement=1.0)
+        except Exception as e:
+            logger.error(f"{variant} variant failed: {str(e)}")
+            report[variant] = {'error': str(e)}
+        logger.info(f"{variant}: {report[variant]}")
+
+    if reference is None:
+        raise RuntimeError(f"fp32 conversion failed: {report['fp32']['error']}")
+    eligible = [v for v in built if 'p50_ms' in report[v] and report[v]['relative_error'] <= error_budget]
+    if not eligible:
+        errors = {v: row.get('relative_error', row.get('error')) for v, row in report.items()}
+        raise RuntimeError(f"No variant within the error budget {error_budget}: {errors}")
+    selected = min(eligible, key=lambda v: report[v]['p50_ms'])
+
+    data_hash = data_fingerprint(windows)
+    for variant in (v for v in built if 'p50_ms' in report[v]):
+        entry = registry.register(
+            built[variant],
+            architecture=model.name,
+            input_shape=windows.shape[1:],
+            quantization=variant,
+            data_hash=data_hash,
+            fmt='tflite',
+            activate=variant == selected,
+            benchmark=report[variant],
+        )
+        report[variant]['version'] = entry['version']
+
+    summary = {'selected': selected, 'error_budget': error_budget, 'windows': len(windows), 'variants': report}
+    report_path = report_path or os.path.join(registry.root, 'quantization_report.json')
+    atomic_write(report_path, json.dumps(summary, indent=2).encode())
+    logger.info(f"Selected {selected} ({report[selected]['p50_ms']:.3f} ms p50); report in {report_path}")
+    return summary
+
+
+def format_report(summary: dict) -> str:
+    lines = [f"{'variant':<8} {'size':>9} {'p50 ms':>8} {'p99 ms':>8} {'win/s':>10} {'rel err':>8} {'agree':>7}"]
+    for variant, row in summary['variants'].items():
+        if 'error' in row:
+            lines.append(f"{variant:<8} failed: {row['error'][:60]}")
+            continue
+        marker = ' *' if variant == summary['selected'] else ''
+        lines.append(f"{variant:<8} {row['model_bytes'] / 1024:>7.0f}KB {row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f} "
+                     f"{row['windows_per_sec']:>10.0f} {row['relative_error']:>8.4f} {row['signal_agreement']:>7.2%}{marker}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import sys
+    from core.ml_models import AdaptiveAlphaModel
+
+    logging.basicConfig(level=logging.INFO)
+    alpha = AdaptiveAlphaModel()
+    keras_model = alpha._load_model()
+    summary = quantize_and_select(keras_model, store_windows(sys.argv[1] if len(sys.argv) > 1 else None,
+                                                             window=alpha.input_shape[0]))
+    print(format_report(summary))
@@ -0,0 +1,143 @@
+# core/retrain_service.py
+
+import os
+import time
+import pickle
+import logging
+import multiprocessing
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from core.bar_store import BarStore
+from core.model_registry import atomic_write
+
+logger = logging.getLogger(__name__)
+
+# Bars needed before the first complete feature row (20-bar SMA, 14-bar RSI)
+LOOKBACK = 40
+
+
+def load_published(model_path: str) -> Optional[dict]:
+    """The last published state: ``{'model', 'last_time', 'samples', 'trees'}`` or None"""
+    if not os.path.exists(model_path):
+        return None
+    with open(model_path, 'rb') as f:
+        return pickle.load(f)
+
+
+class RetrainService:
+    """Keeps AITrader's forest current from a BarStore in a low-priority child process.
+
+    Each round reads only the bars appended since the last fit (plus the
+    feature lookback). New rows are scored by the current forest before
+    it sees them, then ``warm_start`` fits ``trees_per_update`` extra
+    trees on them and the oldest trees beyond ``max_trees`` are retired.
+    Results are published with temp file + ``os.replace``, which is what
+    AITrader.reload_if_updated watches.
+    """
+
+    def __init__(self, store_path: str, model_path: str, interval: float = 900.0,
+                 initial_trees: int = 200, trees_per_update: int = 25, max_trees: int = 400,
+                 min_samples: int = 200, niceness: int = 10):
+        self.store_path = str(store_path)
+        self.model_path = str(model_path)
+        self.interval = interval
+        self.initial_trees = initial_trees
+        self.trees_per_update = trees_per_update
+        self.max_trees = max_trees
+        self.min_samples = min_samples
+        self.niceness = niceness
+        self._stop = multiprocessing.Event()
+        self._process: Optional[multiprocessing.Process] = None
+
+    def start(self) -> multiprocessing.Process:
+        # spawn, not fork: the parent holds MT5, thread pools and model sessions
+        context = multiprocessing.get_context('spawn')
+        self._stop = context.Event()
+        process = context.Process(target=self._run, name="retrain", daemon=True)
+        process.start()
+        self._process = process
+        logger.info(f"Retraining from {self.store_path} every {self.interval:.0f}s (pid {process.pid})")
+        return process
+
+    def stop(self, timeout: float = 30.0):
+        self._stop.set()
+        if self._process is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+    def _run(self):
+        if hasattr(os, 'nice'):
+            os.nice(self.niceness)
+        state = load_published(self.model_path)
+        while not self._stop.is_set():
+            try:
+                state = self.run_once(state)
+            except Exception as e:
+                logger.error(f"Retraining round failed: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def _new_rows(self, last_time: Optional[int]) -> pd.DataFrame:
+        from ai_trader import AITrader
+
+        store = BarStore(self.store_path)
+        bars = store.bars
+        first = 0 if last_time is None else int(np.searchsorted(bars['time'], last_time, side='right'))
+        frame = pd.DataFrame(np.asarray(bars[max(0, first - LOOKBACK):]))
+        rows = AITrader.build_features(frame)
+        if last_time is not None:
+            rows = rows[rows['time'] > last_time]
+        return rows
+
+    def run_once(self, state: Optional[dict] = None) -> Optional[dict]:
+        """One incremental fit; returns the new state, or ``state`` if there was too little new data"""
+        from sklearn.ensemble import RandomForestClassifier
+        from ai_trader import FEATURES
+
+        rows = self._new_rows(None if state is None else state['last_time'])
+        if len(rows) < self.min_samples or rows['target'].nunique() < 2:
+            return state
+
+        X, y = rows[FEATURES].to_numpy(), rows['target'].to_numpy()
+        started = time.perf_counter()
+        if state is None:
+            model = RandomForestClassifier(n_estimators=self.initial_trees, warm_start=True)
+            accuracy = None
+        else:
+            model = state['model']
+            accuracy = float(model.score(X, y))  # scored before training on it: no look-ahead
+            model.n_estimators += self.trees_per_update
+        # Every core for the fit; the published forest predicts single-threaded in the live loop
+        model.set_params(n_jobs=-1).fit(X, y)
+        model.set_params(n_jobs=1)
+        if len(model.estimators_) > self.max_trees:
+            model.estimators_ = model.estimators_[-self.max_trees:]
+            model.n_estimators = self.max_trees
+
+        state = {
+            'model': model,
+            'last_time': int(rows['time'].iloc[-1]),
+            'samples': (0 if state is None else state['samples']) + len(rows),
+            'trees': len(model.estimators_),
+        }
+        atomic_write(self.model_path, pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+        logger.info(
+            f"Fitted {len(rows)} new rows in {time.perf_counter() - started:.1f}s "
+            f"({state['trees']} trees"
+            + (f", {accuracy:.2%} accuracy on them beforehand)" if accuracy is not None else ")")
+        )
+        return state
+
+
+if __name__ == '__main__':
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 3:
+        print("Usage: python -m core.retrain_service <store.bars> <model.pkl> [interval_seconds]")
+        sys.exit(1)
+    service = RetrainService(sys.argv[1], sys.argv[2], interval=float(sys.argv[3]) if len(sys.argv) > 3 else 900.0)
+    service._run()
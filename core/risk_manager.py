@@ -1,10 +1,18 @@
 # core/risk_manager.py
 
+from core.risk_state import RiskState
+
 class RiskManager:
-    def __init__(self, risk_per_trade=0.02, max_daily_loss=0.05):
+    def __init__(self, risk_per_trade=0.02, max_daily_loss=0.05, state=None):
         self.risk_per_trade = risk_per_trade
         self.max_daily_loss = max_daily_loss
-        self.daily_loss = 0.0
+        # Without a synced state the day starts at a unit balance, so booked losses are plain fractions
+        self.state = state or RiskState(1.0, max_daily_loss)
+
+    @property
+    def daily_loss(self):
+        """Today's realized loss as a fraction of the day's starting balance, like max_daily_loss"""
+        return self.state.daily_loss
 
     def calculate_position_size(self, account_balance, trade_risk):
         if account_balance <= 0:
@@ -14,10 +22,18 @@ class RiskManager:
         return account_balance * self.risk_per_trade * trade_risk
 
     def update_daily_loss(self, loss):
+        """Book a realized ``loss`` as a fraction of the day's starting balance; False once past the limit.
+
+        A loss exactly at ``max_daily_loss`` is still within it here, as it
+        always was; ``can_trade`` (the shared RiskState) already stops there.
+        """
         if loss < 0:
             raise ValueError("Loss cannot be negative.")
-        self.daily_loss += loss
+        self.state.book(-loss * (self.state.day_start_balance or 1.0))
         return self.daily_loss <= self.max_daily_loss
 
+    def can_trade(self):
+        return self.state.can_trade()
+
     def reset_daily_loss(self):
-        self.daily_loss = 0.0
\ No newline at end of file
+        self.state.reset_day()
@@ -0,0 +1,225 @@
+# core/risk_state.py
+
+import time
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 86400
+POSITION_TYPE_BUY = 0
+DEAL_TYPE_BUY, DEAL_TYPE_SELL = 0, 1
+
+
+class RiskState:
+    """Balance, equity, open exposure and today's realized PnL, kept from events.
+
+    Fills move exposure and realized PnL as they happen (``on_fill`` for
+    an open, ``on_close`` for a close, ``book`` for a bare profit). Two
+    periodic reconciliations keep it honest: ``on_positions`` with a
+    positions_get snapshot (floating profit, positions the broker closed
+    at SL/TP) and ``sync_account`` with account_info, whose balance is
+    taken as the truth. When today's deals are passed along, their
+    profit, commission, swap and fees replace the running estimate;
+    balance changes without a trade deal (deposits, withdrawals) never
+    count as PnL.
+
+    ``can_trade`` is an in-memory comparison of today's realized PnL
+    against ``max_daily_loss`` of the balance the UTC day started with;
+    with no balance known yet there is no limit to compare against and
+    trading is allowed. The day rolls over on the first call after
+    midnight UTC.
+    """
+
+    def __init__(self, balance: float = 0.0, max_daily_loss: float = 0.05, sync_interval: float = 60.0,
+                 contract_size: float = 100000.0, clock: Callable[[], float] = time.time):
+        self.max_daily_loss = max_daily_loss
+        self.sync_interval = sync_interval
+        self.contract_size = contract_size
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.balance = balance
+        self.floating = 0.0
+        self.exposure: Dict[str, float] = {}  # symbol -> net lots, buys positive
+        self.notional = 0.0  # gross entry value of the open positions
+        self._positions: Dict[int, list] = {}  # ticket -> [symbol, signed lots, price_open, contract_size, profit]
+        self.synced = False
+        self._last_sync = float('-inf')
+        # (day_start, magic, deals summed, first and last of them, their PnL) from the last sync
+        self._deal_sum = (None, None, 0, None, None, 0.0)
+        self._roll(clock())
+
+    # -- day ---------------------------------------------------------------
+
+    def _roll(self, now: float):
+        self._day_end = (int(now // DAY_SECONDS) + 1) * DAY_SECONDS
+        self.day_start_balance = self.balance
+        self.realized_today = 0.0
+        self.fills_today = 0
+
+    def _check_day(self, now: float):
+        if now >= self._day_end:
+            with self._lock:
+                if now >= self._day_end:
+                    logger.info(f"New trading day: yesterday's realized PnL {self.realized_today:.2f}")
+                    self._roll(now)
+
+    def reset_day(self):
+        with self._lock:
+            self._roll(self.clock())
+
+    @property
+    def day_start(self) -> float:
+        """Timestamp of the current UTC day's midnight"""
+        return self._day_end - DAY_SECONDS
+
+    @property
+    def loss_limit(self) -> float:
+        return self.max_daily_loss * self.day_start_balance
+
+    @property
+    def daily_loss(self) -> float:
+        """Today's realized loss as a fraction of the day's starting balance"""
+        if self.day_start_balance <= 0:
+            return 0.0
+        return max(-self.realized_today, 0.0) / self.day_start_balance
+
+    def can_trade(self) -> bool:
+        self._check_day(self.clock())
+        return self.day_start_balance <= 0 or self.realized_today > -self.loss_limit
+
+    @property
+    def equity(self) -> float:
+        return self.balance + self.floating
+
+    @property
+    def open_positions(self) -> int:
+        """Positions known from fills and the last positions_get reconciliation"""
+        return len(self._positions)
+
+    # -- events ------------------------------------------------------------
+
+    def book(self, profit: float):
+        """Realized profit (negative for a loss) from a close"""
+        self._check_day(self.clock())
+        with self._lock:
+            self.balance += profit
+            self.realized_today += profit
+            self.fills_today += 1
+
+    def on_fill(self, symbol: str, side: int, volume: float, price: float, position: Optional[int] = None,
+                contract_size: Optional[float] = None):
+        """An opening fill of ``volume`` lots (``side`` +1 buy, -1 sell)"""
+        contract_size = contract_size or self.contract_size
+        self._check_day(self.clock())
+        with self._lock:
+            self.exposure[symbol] = self.exposure.get(symbol, 0.0) + side * volume
+            self.notional += volume * contract_size * price
+            self.fills_today += 1
+            if position is not None:
+                self._positions[position] = [symbol, side * volume, price, contract_size, 0.0]
+
+    def on_close(self, position: int, price: float, volume: Optional[float] = None) -> Optional[float]:
+        """A closing fill of a known position; returns the profit booked, None for an unknown ticket"""
+        with self._lock:
+            record = self._positions.get(position)
+            if record is None:
+                return None
+            symbol, lots, price_open, contract_size, profit = record
+            closed = abs(lots) if volume is None else min(volume, abs(lots))
+            signed = closed if lots > 0 else -closed
+            pnl = (price - price_open) * signed * contract_size
+            self.exposure[symbol] = self.exposure.get(symbol, 0.0) - signed
+            self.notional -= closed * contract_size * price_open
+            if closed >= abs(lots) - 1e-12:
+                del self._positions[position]
+                self.floating -= profit
+            else:
+                record[1] -= signed
+                record[4] = profit * (1 - closed / abs(lots))
+                self.floating -= profit - record[4]
+        self.book(pnl)
+        return pnl
+
+    def on_positions(self, positions: Iterable, contract_size: Optional[Callable[[str], float]] = None):
+        """Reconcile with a positions_get snapshot; vanished tickets book their last floating profit"""
+        current, exposure = {}, {}
+        notional = floating = 0.0
+        for position in positions:
+            known = self._positions.get(position.ticket)
+            size = known[3] if known else (contract_size(position.symbol) if contract_size else self.contract_size)
+            lots = position.volume if position.type == POSITION_TYPE_BUY else -position.volume
+            current[position.ticket] = [position.symbol, lots, position.price_open, size, position.profit]
+            exposure[position.symbol] = exposure.get(position.symbol, 0.0) + lots
+            notional += position.volume * size * position.price_open
+            floating += position.profit
+        with self._lock:
+            closed = [record[4] for ticket, record in self._positions.items() if ticket not in current]
+            self._positions = current
+            self.exposure = exposure
+            self.notional = notional
+            self.floating = floating
+        for profit in closed:
+            self.book(profit)
+
+    def sync_account(self, account, deals: Optional[Iterable] = None, magic: Optional[int] = None):
+        """Take balance and floating profit from account_info, and today's PnL from ``deals`` if given
+
+        ``deals`` are history_deals_get records; only buy/sell deals since
+        ``day_start`` (and with ``magic``, if given) count, so deposits and
+        withdrawals move the balance but not the daily PnL.
+        """
+        self._check_day(self.clock())
+        realized = None if deals is None else self._realized(deals, magic)
+        with self._lock:
+            self.balance = account.balance
+            self.floating = account.equity - account.balance
+            if not self.synced:
+                self.day_start_balance = account.balance
+                self.synced = True
+            if realized is not None:
+                self.realized_today = realized
+            self._last_sync = self.clock()
+
+    def _realized(self, deals: Iterable, magic: Optional[int]) -> float:
+        """Today's trade PnL in ``deals``; a history that extends the last one only sums the new deals"""
+        deals = deals if isinstance(deals, (list, tuple)) else list(deals)
+        day_start = self.day_start
+        summed_day, summed_magic, count, first, last, realized = self._deal_sum
+        # The deal history only grows, so the same first and count-th deal mean the same prefix
+        if not ((summed_day, summed_magic) == (day_start, magic) and 0 < count <= len(deals)
+                and deals[0] == first and deals[count - 1] == last):
+            count, realized = 0, 0.0
+        realized += sum(deal.profit + deal.commission + deal.swap + getattr(deal, 'fee', 0.0)
+                        for deal in deals[count:]
+                        if deal.type in (DEAL_TYPE_BUY, DEAL_TYPE_SELL) and deal.time >= day_start
+                        and (magic is None or deal.magic == magic))
+        self._deal_sum = (day_start, magic, len(deals), deals[0] if deals else None, deals[-1] if deals else None,
+                          realized)
+        return realized
+
+    def reconcile(self, positions: Iterable, account, contract_size: Optional[Callable[[str], float]] = None,
+                  deals: Optional[Iterable] = None, magic: Optional[int] = None):
+        """Positions first, then the account, so estimated SL/TP profit is corrected rather than doubled"""
+        self.on_positions(positions, contract_size)
+        if account is not None:
+            self.sync_account(account, deals, magic)
+
+    def needs_sync(self) -> bool:
+        return self.clock() - self._last_sync >= self.sync_interval
+
+    def stats(self) -> dict:
+        return {
+            'balance': self.balance,
+            'equity': self.equity,
+            'floating': self.floating,
+            'notional': self.notional,
+            'exposure': dict(self.exposure),
+            'open_positions': self.open_positions,
+            'realized_today': self.realized_today,
+            'fills_today': self.fills_today,
+            'day_start_balance': self.day_start_balance,
+            'daily_loss': self.daily_loss,
+            'can_trade': self.can_trade(),
+        }
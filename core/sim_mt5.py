@@ -0,0 +1,477 @@
+# core/sim_mt5.py
+
+import os
+import sys
+import glob
+import bisect
+import logging
+from collections import deque, namedtuple
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+
+from core.bar_buffer import BAR_DTYPE, timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+Tick = namedtuple('Tick', 'time bid ask last volume time_msc flags volume_real')
+SymbolInfo = namedtuple('SymbolInfo', 'name point digits spread trade_contract_size volume_min volume_max '
+                                      'volume_step filling_mode bid ask')
+TerminalInfo = namedtuple('TerminalInfo', 'connected trade_allowed build name')
+AccountInfo = namedtuple('AccountInfo', 'login balance equity profit margin margin_free margin_level leverage currency')
+TradePosition = namedtuple('TradePosition', 'ticket time type magic volume price_open sl tp price_current '
+                                            'profit symbol comment')
+TradeDeal = namedtuple('TradeDeal', 'ticket order time type entry magic position_id volume price commission swap '
+                                    'profit fee symbol comment')
+# Lot sizes that differ from a standard 100,000 FX lot, as most retail servers quote them (troy ounces)
+CONTRACT_SIZES = {'XAUUSD': 100.0, 'XAGUSD': 5000.0}
+
+OrderSendResult = namedtuple('OrderSendResult', 'retcode deal order volume price bid ask comment request_id '
+                                                'retcode_external request')
+
+
+class SimulatedMT5:
+    """Local stand-in for the ``MetaTrader5`` module, replaying stored bars.
+
+    Implements the calls the bot makes (initialize, copy_rates_from_pos,
+    copy_rates_from, symbol_info_tick, symbol_info, account_info,
+    positions_get, history_deals_get, order_send, last_error, shutdown)
+    with the same constants and namedtuple results. Time only moves when ``advance`` is
+    called, so a replay runs as fast as the bot loop allows. Orders fill
+    at the current bar's bid/ask (close + spread); SL/TP are checked
+    against each newly revealed bar's low/high. With ``max_hold_bars``
+    the terminal also closes each position at market once it has been
+    open that many bars, standing in for the exits the bot leaves to
+    its operator.
+    """
+
+    ORDER_TYPE_BUY, ORDER_TYPE_SELL = 0, 1
+    POSITION_TYPE_BUY, POSITION_TYPE_SELL = 0, 1
+    DEAL_TYPE_BUY, DEAL_TYPE_SELL = 0, 1
+    DEAL_ENTRY_IN, DEAL_ENTRY_OUT = 0, 1
+    TRADE_ACTION_DEAL = 1
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_FOK, ORDER_FILLING_IOC, ORDER_FILLING_RETURN = 0, 1, 2
+    SYMBOL_FILLING_FOK, SYMBOL_FILLING_IOC = 1, 2
+    TRADE_RETCODE_REQUOTE = 10004
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+    TRADE_RETCODE_INVALID_VOLUME = 10014
+    TRADE_RETCODE_NO_MONEY = 10019
+    TRADE_RETCODE_PRICE_CHANGED = 10020
+    TRADE_RETCODE_INVALID_FILL = 10030
+    TRADE_RETCODE_POSITION_CLOSED = 10036
+    TIMEFRAME_M1, TIMEFRAME_M5, TIMEFRAME_M15, TIMEFRAME_M30 = 1, 5, 15, 30
+    TIMEFRAME_H1, TIMEFRAME_H4, TIMEFRAME_D1 = 0x4000 | 1, 0x4000 | 4, 0x4000 | 24
+    TIMEFRAME_W1, TIMEFRAME_MN1 = 0x8000 | 1, 0xC000 | 1
+
+    def __init__(self, history: Dict[str, np.ndarray], timeframe: str = 'M15', start: int = 500,
+                 balance: float = 10000.0, leverage: int = 100,
+                 contract_size: Union[float, Dict[str, float]] = 100000.0,
+                 point: float = 1e-5, filling_mode: int = 1, requote_probability: float = 0.0, seed: int = 0,
+                 max_hold_bars: Optional[int] = None):
+        self.history = {symbol: np.asarray(bars, dtype=BAR_DTYPE) for symbol, bars in history.items()}
+        # Contiguous copies: searchsorted on a strided field view copies the column on every call
+        self.times = {symbol: np.ascontiguousarray(bars['time']) for symbol, bars in self.history.items()}
+        self.step_seconds = timeframe_seconds(timeframe)
+        self.balance = balance
+        self.leverage = leverage
+        # One size for every symbol, or per symbol with 100,000 (a standard FX lot) for the rest
+        sizes = contract_size if isinstance(contract_size, dict) else {}
+        default = 100000.0 if isinstance(contract_size, dict) else contract_size
+        self.contract_sizes = {symbol: float(sizes.get(symbol, default)) for symbol in self.history}
+        self.point = point
+        self.filling_mode = filling_mode
+        self.requote_probability = requote_probability
+        self.rng = np.random.default_rng(seed)
+        self.positions: Dict[int, dict] = {}
+        # symbol -> [long lots, long lots*open, short lots, short lots*open, count]; account_info is per symbol
+        self._books: Dict[str, list] = {}
+        self._with_stops = set()  # tickets with an sl or tp for _check_stops
+        self.max_hold_bars = max_hold_bars
+        self._expiries = deque()  # (close time, ticket) in opening order, so expired ones sit at the left
+        self.closed = []
+        self.deals = []
+        self._deal_times = []  # parallel to deals; the clock never goes back, so it stays sorted
+        self._ticket = 0
+        self._error = (1, 'Success')
+        # The clock starts at the ``start``-th bar of the longest history
+        longest = max(self.times.values(), key=len)
+        self.now = int(longest[min(start, len(longest)) - 1])
+        self.end = int(max(times[-1] for times in self.times.values()))
+        self._visible = {}
+        self._ticks = {}  # symbol -> Tick at the current clock, built on first use
+        self._update_visible()
+
+    @classmethod
+    def from_store(cls, root: str, timeframe: str = 'M15', symbols=None, **kwargs) -> 'SimulatedMT5':
+        """Replay every ``SYMBOL_TIMEFRAME.bars`` file in a bar store directory"""
+        from core.bar_store import BarStore
+        history = {}
+        for path in sorted(glob.glob(os.path.join(str(root), f'*_{timeframe}.bars'))):
+            symbol = os.path.basename(path)[:-len(f'_{timeframe}.bars')]
+            if symbols is None or symbol in symbols:
+                history[symbol] = np.asarray(BarStore(path).bars)
+        if not history:
+            raise FileNotFoundError(f"No {timeframe} bar files in {root}")
+        return cls(history, timeframe, **kwargs)
+
+    # -- clock -------------------------------------------------------------
+
+    def _update_visible(self):
+        for symbol, times in self.times.items():
+            self._visible[symbol] = int(np.searchsorted(times, self.now, side='right'))
+
+    def _step_visible(self):
+        # The clock only moves forward a bar or so at a time; walking the cursor beats a search
+        for symbol, times in self.times.items():
+            visible, n = self._visible[symbol], len(times)
+            while visible < n and times[visible] <= self.now:
+                visible += 1
+            self._visible[symbol] = visible
+
+    def advance(self, bars: int = 1) -> bool:
+        """Move the clock forward; returns False once the history is exhausted"""
+        if self.now >= self.end:
+            return False
+        before = dict(self._visible)
+        self.now += bars * self.step_seconds
+        self._ticks.clear()
+        if bars == 1:
+            self._step_visible()
+        else:
+            self._update_visible()
+        if self._with_stops:
+            self._check_stops(before)
+        if self._expiries:
+            self._expire()
+        return self.now < self.end
+
+    def _check_stops(self, before: Dict[str, int]):
+        for ticket in list(self._with_stops):
+            position = self.positions[ticket]
+            bars = self.history[position['symbol']][before[position['symbol']]:self._visible[position['symbol']]]
+            for bar in bars:
+                buy = position['type'] == self.POSITION_TYPE_BUY
+                # Bars are bid prices: longs exit at bid, shorts at ask
+                offset = 0.0 if buy else bar['spread'] * self.point
+                low, high = bar['low'] + offset, bar['high'] + offset
+                sl, tp = position['sl'], position['tp']
+                if sl and (low <= sl if buy else high >= sl):
+                    self._close(ticket, sl)
+                    break
+                if tp and (high >= tp if buy else low <= tp):
+                    self._close(ticket, tp)
+                    break
+
+    def _expire(self):
+        while self._expiries and self._expiries[0][0] <= self.now:
+            _, ticket = self._expiries.popleft()
+            position = self.positions.get(ticket)
+            if position is not None:  # the bot or a stop may have closed it already
+                tick = self.symbol_info_tick(position['symbol'])
+                self._close(ticket, tick.bid if position['type'] == self.POSITION_TYPE_BUY else tick.ask)
+
+    # -- terminal ----------------------------------------------------------
+
+    def initialize(self, *args, **kwargs) -> bool:
+        return True
+
+    def shutdown(self):
+        return None
+
+    def last_error(self):
+        return self._error
+
+    def terminal_info(self):
+        return TerminalInfo(True, True, 0, 'SimulatedMT5')
+
+    def _bar(self, symbol: str) -> Optional[np.void]:
+        visible = self._visible.get(symbol, 0)
+        return self.history[symbol][visible - 1] if visible else None
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        if symbol not in self.history:
+            self._error = (-1, f'Unknown symbol {symbol}')
+            return None
+        end = self._visible[symbol] - start_pos
+        return self.history[symbol][max(0, end - count):max(0, end)].copy()
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        if symbol not in self.history:
+            self._error = (-1, f'Unknown symbol {symbol}')
+            return None
+        date_from = _timestamp(date_from)
+        if date_from >= self.now:
+            end = self._visible[symbol]  # the usual "anything newer" request
+        else:
+            end = int(np.searchsorted(self.times[symbol], int(date_from), side='right'))
+        return self.history[symbol][max(0, end - count):end].copy()
+
+    def symbol_info_tick(self, symbol):
+        tick = self._ticks.get(symbol)
+        if tick is None:
+            bar = self._bar(symbol)
+            if bar is None:
+                return None
+            bid = float(bar['close'])
+            tick = self._ticks[symbol] = Tick(self.now, bid, bid + int(bar['spread']) * self.point, bid,
+                                              int(bar['tick_volume']), self.now * 1000, 6, float(bar['real_volume']))
+        return tick
+
+    def symbol_info(self, symbol):
+        bar = self._bar(symbol)
+        if bar is None:
+            return None
+        bid = float(bar['close'])
+        digits = int(round(-np.log10(self.point)))
+        return SymbolInfo(symbol, self.point, digits, int(bar['spread']), self.contract_sizes[symbol],
+                          0.01, 100.0, 0.01, self.filling_mode, bid, bid + int(bar['spread']) * self.point)
+
+    def _profit(self, position: dict, price: float) -> float:
+        direction = 1.0 if position['type'] == self.POSITION_TYPE_BUY else -1.0
+        return (direction * (price - position['price_open']) * position['volume']
+                * self.contract_sizes[position['symbol']])
+
+    def _book(self, position: dict, sign: int):
+        book = self._books.setdefault(position['symbol'], [0.0, 0.0, 0.0, 0.0, 0])
+        side = 0 if position['type'] == self.POSITION_TYPE_BUY else 2
+        book[side] += sign * position['volume']
+        book[side + 1] += sign * position['volume'] * position['price_open']
+        book[4] += sign
+        if not book[4]:
+            book[:] = [0.0, 0.0, 0.0, 0.0, 0]  # drop accumulated rounding once flat
+
+    def account_info(self):
+        profit = opened = 0.0
+        for symbol, (long_lots, long_value, short_lots, short_value, count) in self._books.items():
+            if count:
+                tick = self.symbol_info_tick(symbol)
+                size = self.contract_sizes[symbol]
+                profit += (tick.bid * long_lots - long_value + short_value - tick.ask * short_lots) * size
+                opened += (long_value + short_value) * size
+        margin = opened / self.leverage
+        equity = self.balance + profit
+        return AccountInfo(1, self.balance, equity, profit, margin, equity - margin,
+                           equity / margin * 100 if margin else 0.0, self.leverage, 'USD')
+
+    def positions_get(self, symbol=None, ticket=None, magic=None, **kwargs):
+        result = []
+        for position in self.positions.values():
+            if symbol is not None and position['symbol'] != symbol:
+                continue
+            if ticket is not None and position['ticket'] != ticket:
+                continue
+            if magic is not None and position['magic'] != magic:
+                continue
+            tick = self.symbol_info_tick(position['symbol'])
+            price = tick.bid if position['type'] == self.POSITION_TYPE_BUY else tick.ask
+            result.append(TradePosition(position['ticket'], position['time'], position['type'], position['magic'],
+                                        position['volume'], position['price_open'], position['sl'], position['tp'],
+                                        price, self._profit(position, price), position['symbol'], position['comment']))
+        return tuple(result)
+
+    def history_deals_get(self, date_from=None, date_to=None, group=None, ticket=None, position=None):
+        first = bisect.bisect_left(self._deal_times, _timestamp(date_from)) if date_from is not None else 0
+        last = bisect.bisect_right(self._deal_times, _timestamp(date_to)) if date_to is not None else len(self.deals)
+        deals = self.deals[first:last]
+        if position is not None:
+            return tuple(deal for deal in deals if deal.position_id == position)
+        return tuple(deals)
+
+    def _deal(self, position: dict, entry: int, price: float, profit: float = 0.0):
+        buy = (position['type'] == self.POSITION_TYPE_BUY) == (entry == self.DEAL_ENTRY_IN)
+        self.deals.append(TradeDeal(len(self.deals) + 1, position['ticket'], self.now,
+                                    self.DEAL_TYPE_BUY if buy else self.DEAL_TYPE_SELL, entry, position['magic'],
+                                    position['ticket'], position['volume'], price, 0.0, 0.0, profit, 0.0,
+                                    position['symbol'], position['comment']))
+        self._deal_times.append(self.now)
+
+    def _result(self, retcode: int, request: dict, comment: str, price: float = 0.0, volume: float = 0.0,
+                ticket: int = 0, tick=None):
+        return OrderSendResult(retcode, ticket, ticket, volume, price, tick.bid if tick else 0.0,
+                               tick.ask if tick else 0.0, comment, 0, 0, request)
+
+    def order_send(self, request: dict):
+        symbol = request.get('symbol')
+        tick = self.symbol_info_tick(symbol) if symbol in self.history else None
+        if tick is None or request.get('action') != self.TRADE_ACTION_DEAL:
+            return self._result(self.TRADE_RETCODE_INVALID, request, 'Invalid request')
+        filling = request.get('type_filling', self.ORDER_FILLING_FOK)
+        if filling in (self.ORDER_FILLING_FOK, self.ORDER_FILLING_IOC) and not self.filling_mode & (1 << filling):
+            return self._result(self.TRADE_RETCODE_INVALID_FILL, request, 'Unsupported filling mode', tick=tick)
+        if self.requote_probability and self.rng.random() < self.requote_probability:
+            return self._result(self.TRADE_RETCODE_REQUOTE, request, 'Requote', tick=tick)
+
+        buy = request.get('type') == self.ORDER_TYPE_BUY
+        price = tick.ask if buy else tick.bid
+        requested = request.get('price') or price
+        if abs(price - requested) > request.get('deviation', 0) * self.point:
+            return self._result(self.TRADE_RETCODE_PRICE_CHANGED, request, 'Prices changed', tick=tick)
+
+        volume = round(float(request.get('volume', 0.0)) / 0.01) * 0.01
+        if 'position' in request:
+            position = self.positions.get(request['position'])
+            if position is None:
+                return self._result(self.TRADE_RETCODE_POSITION_CLOSED, request, 'Position closed', tick=tick)
+            self._close(position['ticket'], price)
+            return self._result(self.TRADE_RETCODE_DONE, request, 'Request executed', price,
+                                position['volume'], position['ticket'], tick)
+
+        if volume < 0.01:
+            return self._result(self.TRADE_RETCODE_INVALID_VOLUME, request, 'Invalid volume', tick=tick)
+        margin = volume * self.contract_sizes[symbol] * price / self.leverage
+        if margin > self.account_info().margin_free:
+            return self._result(self.TRADE_RETCODE_NO_MONEY, request, 'No money', tick=tick)
+
+        self._ticket += 1
+        position = self.positions[self._ticket] = {
+            'ticket': self._ticket, 'time': self.now, 'symbol': symbol, 'volume': volume,
+            'type': self.POSITION_TYPE_BUY if buy else self.POSITION_TYPE_SELL, 'price_open': price,
+            'sl': request.get('sl', 0.0), 'tp': request.get('tp', 0.0),
+            'magic': request.get('magic', 0), 'comment': request.get('comment', ''),
+        }
+        self._book(position, 1)
+        if position['sl'] or position['tp']:
+            self._with_stops.add(self._ticket)
+        if self.max_hold_bars:
+            self._expiries.append((self.now + self.max_hold_bars * self.step_seconds, self._ticket))
+        self._deal(position, self.DEAL_ENTRY_IN, price)
+        return self._result(self.TRADE_RETCODE_DONE, request, 'Request executed', price, volume, self._ticket, tick)
+
+    def _close(self, ticket: int, price: float):
+        position = self.positions.pop(ticket)
+        self._book(position, -1)
+        self._with_stops.discard(ticket)
+        profit = self._profit(position, price)
+        self.balance += profit
+        self._deal(position, self.DEAL_ENTRY_OUT, price, profit)
+        self.closed.append({**position, 'price_close': price, 'time_close': self.now, 'profit': profit})
+
+
+def _timestamp(value) -> int:
+    if isinstance(value, datetime):
+        return int((value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp())
+    return int(value)
+
+
+class ReplayModel:
+    """Cheap stand-in for AdaptiveAlphaModel so a replay measures the bot loop, not inference.
+
+    Scores the close-to-close move over the window, with the same
+    prediction dicts as ``AdaptiveAlphaModel.predict_latest``. It enters
+    when the newest bar takes the score past ``threshold`` (buy) or
+    below ``-threshold`` (sell) and holds while the move persists, the
+    way a strategy that leaves exits to the terminal trades; with
+    ``every_bar`` it signals the sign of the move on every bar instead.
+    """
+
+    version = 'replay'
+
+    def __init__(self, input_shape=(60, 5), threshold: float = 0.0, every_bar: bool = False):
+        self.input_shape = input_shape
+        self.threshold = threshold
+        self.every_bar = every_bar
+
+    def check_for_update(self) -> bool:
+        return False
+
+    def predict_latest(self, bar_views: Sequence[np.ndarray]) -> list:
+        predictions = []
+        for view in bar_views:
+            score = previous = 0.0
+            if len(view) > 1:
+                score = (view[-1, 3] - view[0, 3]) / view[0, 3] * 100
+                previous = (view[-2, 3] - view[0, 3]) / view[0, 3] * 100
+            if self.every_bar:
+                previous = 0.0
+            if score > self.threshold and not previous > self.threshold:
+                signal = 'buy'
+            elif score < -self.threshold and not previous < -self.threshold:
+                signal = 'sell'
+            else:
+                signal = 'hold'
+            predictions.append({'signal': signal, 'confidence': float(np.tanh(abs(score))), 'score': float(score)})
+        return predictions
+
+
+def install(sim: SimulatedMT5) -> SimulatedMT5:
+    """Make ``import MetaTrader5`` and the shared MT5 session use ``sim``"""
+    from core.mt5_session import get_session
+    sys.modules['MetaTrader5'] = sim
+    get_session().bind(sim)
+    return sim
+
+
+def replay(root: str, cycles: int, timeframe: str = 'M15', mode: str = 'rotate', model=None,
+           balance: float = 100000.0, hold_bars: Optional[int] = 16) -> dict:
+    """Run the unchanged TradingBot against stored bars, one bar per cycle.
+
+    ``model`` defaults to ReplayModel; pass an AdaptiveAlphaModel to
+    replay the real network at whatever speed inference allows. The
+    default ``balance`` is large enough that 2% risk on a 100k-contract
+    FX symbol clears the 0.01 lot minimum; metals use CONTRACT_SIZES.
+    The risk tracker runs on the simulated clock, so trading days roll
+    over with the bars. The bot never closes positions itself, so the
+    terminal closes each one after ``hold_bars`` bars; without exits the
+    open book, and the cost of every positions_get over it, grows for
+    the whole replay.
+    """
+    import time
+
+    # Config validates credentials on import and main.py talks to Telegram; neither exists offline
+    for name, value in (('MT5_LOGIN', '1'), ('MT5_PASSWORD', 'replay'), ('MT5_SERVER', 'replay'),
+                        ('TELEGRAM_BOT_TOKEN', '')):
+        os.environ.setdefault(name, value)
+    sim = install(SimulatedMT5.from_store(root, timeframe, balance=balance, max_hold_bars=hold_bars,
+                                          contract_size=CONTRACT_SIZES))
+
+    from main import TradingBot
+    bot = TradingBot(model=model or ReplayModel(), clock=lambda: sim.now)
+    cycle = bot.execute_multi_symbol_cycle if mode == 'all' else bot.execute_trading_cycle
+
+    started = time.perf_counter()
+    done = 0
+    while done < cycles and sim.advance():
+        cycle()
+        done += 1
+    elapsed = time.perf_counter() - started
+    bot.trader.shutdown()
+    return {
+        'cycles': done,
+        'seconds': elapsed,
+        'cycles_per_sec': done / elapsed if elapsed else float('inf'),
+        'balance': sim.balance,
+        'open_positions': len(sim.positions),
+        'closed_trades': len(sim.closed),
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay TradingBot against a simulated MT5 terminal")
+    parser.add_argument('root', help="Bar store directory with SYMBOL_TIMEFRAME.bars files")
+    parser.add_argument('--cycles', type=int, default=10000)
+    parser.add_argument('--timeframe', default='M15')
+    parser.add_argument('--mode', choices=('rotate', 'all'), default='rotate')
+    parser.add_argument('--hold-bars', type=int, default=16, help="Close positions after this many bars (0: never)")
+    parser.add_argument('--every-bar', action='store_true', help="Trade on every bar instead of on signal changes")
+    parser.add_argument('--profile', action='store_true', help="Print a cProfile of the replay")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    def run():
+        return replay(args.root, args.cycles, args.timeframe, args.mode,
+                      model=ReplayModel(every_bar=args.every_bar), hold_bars=args.hold_bars or None)
+
+    if args.profile:
+        import cProfile
+        import pstats
+        profiler = cProfile.Profile()
+        stats = profiler.runcall(run)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+    else:
+        stats = run()
+    print(stats)
@@ -1,21 +1,33 @@
-import MetaTrader5 as mt5
 import numpy as np
 from config import Config
+from core.market_snapshot import MarketSnapshot
+from core.mt5_session import get_session
+from core.order_pipeline import OrderPipeline, collect
+from core.risk_state import RiskState
+from utils.latency import LatencyRecorder
+import time
 import logging
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict
 
 logger = logging.getLogger(__name__)
+mt5 = get_session()
 
 class MT5TradeExecutor:
-    def __init__(self):
+    def __init__(self, snapshot: Optional[MarketSnapshot] = None, clock=time.time, paper=None):
         self._initialize_mt5()
+        self.paper = paper  # PaperTrade whose ledger is flushed on shutdown
+        self.snapshot = snapshot or MarketSnapshot(mt5)
+        self.pipeline = OrderPipeline(mt5, self.snapshot, workers=Config.ORDER_WORKERS,
+                                      max_retries=Config.ORDER_RETRIES)
+        self.latency = LatencyRecorder()
+        self.risk = RiskState(max_daily_loss=Config.MAX_DAILY_LOSS, sync_interval=Config.RISK_SYNC_SECONDS,
+                              clock=clock)
+        self.sync_risk(force=True)
         
     def _initialize_mt5(self):
         """Establish MT5 connection with error handling"""
-        if not mt5.initialize(login=Config.MT5_LOGIN, 
-                            password=Config.MT5_PASSWORD,
-                            server=Config.MT5_SERVER,
-                            path=Config.MT5_PATH):
+        if not mt5.connect():
             logger.error(f"MT5 initialization failed: {mt5.last_error()}")
             raise ConnectionError("Failed to connect to MT5 terminal")
             
@@ -24,14 +36,26 @@ class MT5TradeExecutor:
     def execute_trade(self, symbol: str, signal: str, risk: float) -> Optional[Dict]:
         """Execute market order with advanced risk controls"""
         try:
+            if not self.risk.can_trade():
+                logger.warning(f"Daily loss limit reached ({self.risk.realized_today:.2f}); skipping {symbol}")
+                return None
+
+            watch = self.latency.stopwatch(symbol)
+            tick = self.snapshot.tick(symbol)
+            watch.lap('tick')
+            if tick is None:
+                logger.error(f"No tick for {symbol}: {mt5.last_error()}")
+                return None
+
             # Calculate position size
-            lot_size = self._calculate_lot_size(symbol, risk)
+            lot_size = self._calculate_lot_size(symbol, risk, tick)
+            watch.lap('lot_size')
             if lot_size <= 0:
                 return None
 
             # Prepare order structure
             order_type = mt5.ORDER_TYPE_BUY if signal.lower() == 'buy' else mt5.ORDER_TYPE_SELL
-            price = mt5.symbol_info_tick(symbol).ask if order_type == mt5.ORDER_TYPE_BUY else mt5.symbol_info_tick(symbol).bid
+            price = tick.ask if order_type == mt5.ORDER_TYPE_BUY else tick.bid
             
             request = {
                 "action": mt5.TRADE_ACTION_DEAL,
@@ -47,49 +71,79 @@ class MT5TradeExecutor:
                 "type_time": mt5.ORDER_TIME_GTC,
                 "type_filling": mt5.ORDER_FILLING_FOK,
             }
+            watch.lap('build')
             
-            # Send order
-            result = mt5.order_send(request)
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                logger.error(f"Order failed: {result.comment}")
+            # Send order (requote retries and filling fallback happen in the pipeline)
+            outcome = self.pipeline.send(request)
+            watch.last = self._record_pipeline(symbol, outcome['latency_ms'], watch.last)
+            if outcome['status'] != 'done':
+                logger.error(f"Order failed: {outcome['comment']}")
                 return None
-                
-            logger.info(f"Executed {symbol} {signal} @ {price} Lots: {lot_size:.2f}")
-            return result._asdict()
+
+            result = outcome['result']
+            info = self.snapshot.symbol_info(symbol)
+            self.risk.on_fill(symbol, 1 if order_type == mt5.ORDER_TYPE_BUY else -1, result['volume'],
+                              result['price'], result['order'], info.trade_contract_size)
+            self.latency.record_slippage(symbol, order_type == mt5.ORDER_TYPE_BUY, price, result['price'],
+                                         info.point, result['volume'], info.trade_contract_size)
+            logger.info(f"Executed {symbol} {signal} @ {result['price']} (quoted {price}) Lots: {lot_size:.2f}")
+            watch.lap('result')
+            watch.stop()
+            return result
             
         except Exception as e:
             logger.error(f"Trade execution error: {str(e)}")
             return None
 
-    def _calculate_lot_size(self, symbol: str, risk_percent: float) -> float:
+    def _record_pipeline(self, symbol: str, latency: Dict[str, float], submitted: float) -> float:
+        """Split the wait on the pipeline into queue, reprice and order_send; returns when it ended"""
+        self.latency.record(symbol, 'queue', latency['queue'])
+        if latency['tick']:
+            self.latency.record(symbol, 'reprice', latency['tick'])
+        self.latency.record(symbol, 'order_send', latency['send'])
+        return submitted + latency['total'] / 1000
+
+    def _calculate_lot_size(self, symbol: str, risk_percent: float, tick=None) -> float:
         """Calculate lot size based on account balance and current price"""
-        account_info = mt5.account_info()
-        if not account_info:
-            logger.error("Failed to get account info")
+        balance = self.risk.balance
+        if balance <= 0:
+            logger.error("No account balance yet")
             return 0.0
             
-        balance = account_info.balance
         risk_amount = balance * risk_percent
-        price = mt5.symbol_info_tick(symbol).ask
-        contract_size = mt5.symbol_info(symbol).trade_contract_size
+        price = (tick or self.snapshot.tick(symbol)).ask
+        contract_size = self.snapshot.symbol_info(symbol).trade_contract_size
         lot_size = (risk_amount / (price * contract_size))
         
         return min(lot_size, Config.MAX_LOT_SIZE)
 
-    def close_all_positions(self):
-        """Close all open positions from this bot"""
-        positions = mt5.positions_get(magic=Config.MAGIC_NUMBER)
-        for pos in positions:
-            close_request = {
-                "position": pos.ticket,
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": pos.symbol,
-                "volume": pos.volume,
-                "type": mt5.ORDER_TYPE_BUY if pos.type == mt5.ORDER_TYPE_SELL else mt5.ORDER_TYPE_SELL,
-                "price": mt5.symbol_info_tick(pos.symbol).ask if pos.type == mt5.ORDER_TYPE_SELL else mt5.symbol_info_tick(pos.symbol).bid,
-                "deviation": Config.SLIPPAGE_PIPS,
-                "magic": Config.MAGIC_NUMBER,
-                "comment": "AI Close",
-                "type_time": mt5.ORDER_TIME_GTC,
-            }
-            mt5.order_send(close_request)
\ No newline at end of file
+    def sync_risk(self, force: bool = False):
+        """Reconcile risk state with the terminal every Config.RISK_SYNC_SECONDS"""
+        if force or self.risk.needs_sync():
+            positions = mt5.positions_get(magic=Config.MAGIC_NUMBER) or ()
+            # Deal times are server-local, often ahead of UTC, so the window runs a day past the UTC one
+            start = datetime.fromtimestamp(self.risk.day_start, timezone.utc)
+            deals = mt5.history_deals_get(start, start + timedelta(days=2))
+            self.risk.reconcile(positions, self.snapshot.account(),
+                                lambda symbol: self.snapshot.symbol_info(symbol).trade_contract_size, deals,
+                                magic=Config.MAGIC_NUMBER)
+
+    def close_all_positions(self) -> list:
+        """Close all open positions from this bot concurrently; one pipeline outcome per position"""
+        positions = mt5.positions_get(magic=Config.MAGIC_NUMBER) or ()
+        futures = self.pipeline.close_all(positions, deviation=Config.SLIPPAGE_PIPS, magic=Config.MAGIC_NUMBER)
+        outcomes = collect(futures)
+        # close_all keeps the first-seen order of distinct tickets
+        for ticket, outcome in zip(dict.fromkeys(position.ticket for position in positions), outcomes):
+            if outcome['status'] == 'done':
+                self.risk.on_close(ticket, outcome['result']['price'], outcome['result']['volume'])
+        failed = [outcome for outcome in outcomes if outcome['status'] != 'done']
+        if failed:
+            logger.error(f"{len(failed)} of {len(outcomes)} positions failed to close: {failed[0]['comment']}")
+        return outcomes
+
+    def shutdown(self):
+        self.pipeline.shutdown()
+        if self.paper is not None:
+            self.paper.close()
+        self.latency.dump(Config.DATA_DIR / "order_latency.json")
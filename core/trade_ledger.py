@@ -0,0 +1,173 @@
+# core/trade_ledger.py
+
+import os
+import time
+import atexit
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'AITLEDG1'
+HEADER_SIZE = 64
+
+BUY, SELL = 1, -1
+
+# One row per fill: a buy opens ``position``, a sell closes ``volume`` of it and books ``pnl``
+LEDGER_DTYPE = np.dtype([
+    ('time', 'M8[ns]'),
+    ('symbol', 'S16'),
+    ('action', 'i1'),
+    ('position', 'i8'),  # -1 for a sell that found nothing to close
+    ('price', 'f8'),
+    ('volume', 'f8'),
+    ('sl', 'f8'),
+    ('tp', 'f8'),
+    ('pnl', 'f8'),
+])
+
+STAT_FIELDS = ('realized_pnl', 'fills', 'closes', 'wins', 'volume')
+
+
+def _aggregate(rows: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-symbol STAT_FIELDS over ledger rows, in one bincount per field"""
+    if not len(rows):
+        return {}
+    symbols, index = np.unique(rows['symbol'], return_inverse=True)
+    closes = rows['action'] == SELL
+    columns = np.stack([
+        np.bincount(index, weights=rows['pnl'], minlength=len(symbols)),
+        np.bincount(index, minlength=len(symbols)),
+        np.bincount(index, weights=closes & (rows['position'] >= 0), minlength=len(symbols)),
+        np.bincount(index, weights=closes & (rows['pnl'] > 0), minlength=len(symbols)),
+        np.bincount(index, weights=rows['volume'], minlength=len(symbols)),
+    ], axis=1)
+    return {symbol.decode(): column for symbol, column in zip(symbols, columns)}
+
+
+class TradeLedger:
+    """Append-only fill history in preallocated structured NumPy columns.
+
+    Rows live in an in-memory block that doubles as needed up to
+    ``spill_rows``. With a ``spill_path`` the block is appended to disk
+    (64 byte header + LEDGER_DTYPE records, like BarStore) whenever it
+    fills up or ``spill_seconds`` have passed, and per-symbol totals of
+    the spilled rows are kept, so memory stays flat however long the run.
+    An existing spill file is picked up and its totals rebuilt on start.
+    Rows still in memory are spilled by ``close()``, on leaving a
+    ``with`` block, or at interpreter exit, whichever comes first.
+    """
+
+    def __init__(self, spill_path: Optional[Union[str, Path]] = None, spill_rows: int = 65536,
+                 spill_seconds: float = 300.0, capacity: int = 1024):
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.spill_rows = spill_rows
+        self.spill_seconds = spill_seconds
+        self._rows = np.zeros(min(capacity, spill_rows), dtype=LEDGER_DTYPE)
+        self._size = 0
+        self._spilled = 0
+        self._totals: Dict[str, np.ndarray] = {}
+        self._last_spill = time.monotonic()
+        if self.spill_path is not None:
+            self._open_spill_file()
+            atexit.register(self._close_at_exit)
+
+    def _open_spill_file(self):
+        if not self.spill_path.exists():
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.spill_path, 'wb') as f:
+                f.write(MAGIC.ljust(HEADER_SIZE, b'\0'))
+            return
+        with open(self.spill_path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.spill_path} is not a trade ledger file")
+        spilled = self.spilled()
+        self._spilled = len(spilled)
+        # Chunked so a long history is never fully resident
+        for start in range(0, len(spilled), self.spill_rows):
+            self._add_totals(_aggregate(spilled[start:start + self.spill_rows]))
+        logger.info(f"Resumed trade ledger {self.spill_path} with {self._spilled} fills")
+
+    def _add_totals(self, totals: Dict[str, np.ndarray]):
+        for symbol, column in totals.items():
+            self._totals[symbol] = self._totals.get(symbol, 0) + column
+
+    def append(self, symbol: str, action: int, price: float, volume: float, position: int = -1,
+               sl: Optional[float] = None, tp: Optional[float] = None, pnl: float = 0.0):
+        if self._size == len(self._rows):
+            if len(self._rows) < self.spill_rows or self.spill_path is None:
+                grown = np.zeros(len(self._rows) * 2, dtype=LEDGER_DTYPE)
+                grown[:self._size] = self._rows
+                self._rows = grown
+            else:
+                self.spill()
+        self._rows[self._size] = (np.datetime64(time.time_ns(), 'ns'), symbol.encode(), action, position, price,
+                                  volume, np.nan if sl is None else sl, np.nan if tp is None else tp, pnl)
+        self._size += 1
+        if self.spill_path is not None and time.monotonic() - self._last_spill >= self.spill_seconds:
+            self.spill()
+
+    def spill(self):
+        """Move the in-memory rows to the spill file"""
+        self._last_spill = time.monotonic()
+        if self.spill_path is None or not self._size:
+            return
+        rows = self._rows[:self._size]
+        with open(self.spill_path, 'ab') as f:
+            f.write(rows.tobytes())
+        self._add_totals(_aggregate(rows))
+        self._spilled += self._size
+        self._size = 0
+
+    def close(self):
+        """Spill the buffered fills; safe to call more than once"""
+        self.spill()
+        if self.spill_path is not None:
+            atexit.unregister(self._close_at_exit)
+
+    def _close_at_exit(self):
+        try:
+            self.close()
+        except OSError as e:
+            logger.error(f"Lost {self._size} unspilled fills: {e}")
+
+    def __enter__(self) -> 'TradeLedger':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._spilled + self._size
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Fills still in memory (a view; valid until the next append)"""
+        return self._rows[:self._size]
+
+    def spilled(self) -> np.ndarray:
+        """Read-only mapping of the fills already on disk"""
+        if self.spill_path is None or not self.spill_path.exists():
+            return np.zeros(0, dtype=LEDGER_DTYPE)
+        n = (os.path.getsize(self.spill_path) - HEADER_SIZE) // LEDGER_DTYPE.itemsize
+        if n == 0:
+            return np.zeros(0, dtype=LEDGER_DTYPE)
+        return np.memmap(self.spill_path, dtype=LEDGER_DTYPE, mode='r', offset=HEADER_SIZE, shape=(n,))
+
+    def history(self) -> np.ndarray:
+        """Every fill, spilled and in memory, as one array"""
+        return np.concatenate([self.spilled(), self.rows])
+
+    def symbol_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-symbol realized PnL, fill/close/win counts and traded volume"""
+        totals = dict(self._totals)
+        for symbol, column in _aggregate(self.rows).items():
+            totals[symbol] = totals.get(symbol, 0) + column
+        return {symbol: dict(zip(STAT_FIELDS, map(float, column))) for symbol, column in totals.items()}
+
+    def realized_pnl(self) -> float:
+        spilled = sum(float(column[0]) for column in self._totals.values())
+        return spilled + float(self.rows['pnl'].sum())
@@ -0,0 +1,209 @@
+# core/walk_forward.py
+
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.model_registry import data_fingerprint
+from core.windowing import normalize_windows, sliding_windows
+
+logger = logging.getLogger(__name__)
+
+
+class Fold(NamedTuple):
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+def walk_forward_splits(n_rows: int, train_size: int, test_size: int, step: Optional[int] = None,
+                        expanding: bool = False, gap: int = 0) -> List[Fold]:
+    """Time-ordered train/test folds over ``n_rows`` feature rows.
+
+    Every test range starts ``gap`` rows after its training range ends.
+    Rolling folds keep ``train_size`` rows; expanding folds always start
+    at row 0. ``step`` defaults to ``test_size`` (back-to-back test ranges).
+    """
+    step = step or test_size
+    folds, train_end = [], train_size
+    while train_end + gap + test_size <= n_rows:
+        test_start = train_end + gap
+        folds.append(Fold(len(folds), 0 if expanding else train_end - train_size,
+                          train_end, test_start, test_start + test_size))
+        train_end += step
+    return folds
+
+
+class SklearnAdapter:
+    """AITrader's random forest on its returns / SMA-20 / RSI features"""
+
+    name = 'random_forest'
+    columns = ('close',)  # every bar column prepare reads
+
+    def __init__(self, n_estimators: int = 200):
+        self.n_estimators = n_estimators
+
+    def spec(self) -> str:
+        return f"{self.name}-features-v1"
+
+    def prepare(self, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        from ai_trader import AITrader, FEATURES
+        rows = AITrader.build_features(frame)
+        next_return = frame['close'].pct_change().shift(-1)
+        return {
+            'X': rows[FEATURES].to_numpy(dtype=np.float64),
+            'target': rows['target'].to_numpy(dtype=np.int8),
+            'next_return': next_return.loc[rows.index].to_numpy(dtype=np.float64),
+        }
+
+    def fit_predict(self, arrays: Dict[str, np.ndarray], fold: Fold) -> np.ndarray:
+        from sklearn.ensemble import RandomForestClassifier
+        # One core per fold; the pool supplies the parallelism
+        model = RandomForestClassifier(n_estimators=self.n_estimators, n_jobs=1)
+        model.fit(arrays['X'][fold.train_start:fold.train_end], arrays['target'][fold.train_start:fold.train_end])
+        return np.where(model.predict(arrays['X'][fold.test_start:fold.test_end]) == 1, 1, -1)
+
+
+class KerasAdapter:
+    """AdaptiveAlphaModel's QuantumAlpha LSTM on z-scored OHLCV windows"""
+
+    name = 'quantum_alpha'
+    columns = ('open', 'high', 'low', 'close', 'tick_volume')
+
+    def __init__(self, window: int = 60, epochs: int = 5, batch_size: int = 64, threshold: float = 0.0):
+        self.window = window
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.threshold = threshold
+
+    def spec(self) -> str:
+        return f"{self.name}-w{self.window}-v1"
+
+    def prepare(self, frame: pd.DataFrame) -> Dict[str, np.ndarray]:
+        bars = frame[list(self.columns)].to_numpy(dtype=np.float32)
+        next_return = frame['close'].pct_change().shift(-1).to_numpy(dtype=np.float64)
+        # Row r is the window ending at bar r + window - 1; the last bar has no next return
+        rows = slice(self.window - 1, len(frame) - 1)
+        return {
+            'bars': bars,
+            'target': (next_return[rows] > 0).astype(np.int8),
+            'next_return': next_return[rows],
+        }
+
+    def _windows(self, arrays: Dict[str, np.ndarray], start: int, end: int) -> np.ndarray:
+        batch = np.array(sliding_windows(arrays['bars'], self.window)[start:end], dtype=np.float32)
+        return normalize_windows(batch)
+
+    def fit_predict(self, arrays: Dict[str, np.ndarray], fold: Fold) -> np.ndarray:
+        from core.ml_models import _tensorflow, build_quantum_alpha
+        tf = _tensorflow()
+        tf.config.threading.set_intra_op_parallelism_threads(1)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+        returns = arrays['next_return'][fold.train_start:fold.train_end]
+        scale = returns.std() or 1.0
+        model = build_quantum_alpha((self.window, arrays['bars'].shape[1]))
+        model.compile(optimizer='adam', loss=tf.keras.losses.Huber())
+        model.fit(self._windows(arrays, fold.train_start, fold.train_end), returns / scale,
+                  epochs=self.epochs, batch_size=self.batch_size, verbose=0)
+        scores = model.predict(self._windows(arrays, fold.test_start, fold.test_end),
+                               batch_size=self.batch_size, verbose=0)[:, 0]
+        return np.where(scores > self.threshold, 1, np.where(scores < -self.threshold, -1, 0))
+
+
+ADAPTERS = {'rf': SklearnAdapter, 'keras': KerasAdapter}
+
+
+def cache_features(adapter, frame: pd.DataFrame, cache_dir: str) -> Dict[str, str]:
+    """Compute the adapter's features once and store them as ``.npy`` files.
+
+    The cache is keyed by the adapter's feature spec and a hash of every
+    bar column the adapter reads (``adapter.columns``), so repeated runs
+    skip feature engineering. Workers map
+    the files read-only instead of receiving pickled copies.
+    """
+    key = data_fingerprint(frame[list(adapter.columns)].to_numpy(np.float64), adapter.spec().encode())
+    directory = os.path.join(cache_dir, f"{adapter.spec()}-{key}")
+    done = os.path.join(directory, '.complete')
+    if not os.path.exists(done):
+        os.makedirs(directory, exist_ok=True)
+        for name, array in adapter.prepare(frame).items():
+            np.save(os.path.join(directory, f'{name}.npy'), array)
+        open(done, 'w').close()
+    return {name[:-4]: os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.npy')}
+
+
+def _run_fold(adapter, paths: Dict[str, str], fold: Fold) -> dict:
+    started = time.perf_counter()
+    arrays = {name: np.load(path, mmap_mode='r') for name, path in paths.items()}
+    signals = adapter.fit_predict(arrays, fold)
+    target = np.asarray(arrays['target'][fold.test_start:fold.test_end])
+    next_return = np.asarray(arrays['next_return'][fold.test_start:fold.test_end])
+
+    traded = signals != 0
+    hits = np.sign(next_return[traded]) == signals[traded]
+    return {
+        'fold': fold.index,
+        'train_rows': fold.train_end - fold.train_start,
+        'test_rows': fold.test_end - fold.test_start,
+        'accuracy': float(np.mean((signals == 1) == (target == 1))),
+        'hit_rate': float(hits.mean()) if traded.any() else float('nan'),
+        'trades': int(traded.sum()),
+        'strategy_return': float(np.sum(signals * next_return)),
+        'wall_time': time.perf_counter() - started,
+    }
+
+
+def walk_forward(adapter, frame: pd.DataFrame, train_size: int, test_size: int, step: Optional[int] = None,
+                 expanding: bool = False, gap: int = 0, workers: Optional[int] = None,
+                 cache_dir: str = os.path.join('data', 'walk_forward')) -> pd.DataFrame:
+    """Train and score every fold on a process pool; one result row per fold"""
+    paths = cache_features(adapter, frame, cache_dir)
+    n_rows = len(np.load(paths['target'], mmap_mode='r'))
+    folds = walk_forward_splits(n_rows, train_size, test_size, step, expanding, gap)
+    if not folds:
+        raise ValueError(f"{n_rows} rows are too few for train_size={train_size}, test_size={test_size}")
+
+    workers = min(workers or os.cpu_count() or 1, len(folds))
+    started = time.perf_counter()
+    # spawn keeps TensorFlow state out of the workers' address space until they import it
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        results = list(pool.map(_run_fold, [adapter] * len(folds), [paths] * len(folds), folds))
+    report = pd.DataFrame(results).set_index('fold')
+    logger.info(f"{len(folds)} {adapter.name} folds on {workers} workers in {time.perf_counter() - started:.1f}s")
+    return report
+
+
+def format_report(report: pd.DataFrame) -> str:
+    summary = report[['accuracy', 'hit_rate', 'strategy_return', 'wall_time']].agg(['mean', 'std'])
+    return (report.to_string(float_format=lambda v: f"{v:.4f}") + "\n\n"
+            + summary.to_string(float_format=lambda v: f"{v:.4f}"))
+
+
+if __name__ == '__main__':
+    import argparse
+    from ai_trader import AITrader
+
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Walk-forward validation on a bar history")
+    parser.add_argument('data', help="Bar store file or legacy CSV export")
+    parser.add_argument('--model', choices=sorted(ADAPTERS), default='rf')
+    parser.add_argument('--train', type=int, default=500)
+    parser.add_argument('--test', type=int, default=100)
+    parser.add_argument('--step', type=int)
+    parser.add_argument('--expanding', action='store_true')
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    frame = AITrader.load_history(args.data)
+    result = walk_forward(ADAPTERS[args.model](), frame, args.train, args.test, args.step,
+                          args.expanding, workers=args.workers)
+    print(format_report(result))
@@ -0,0 +1,98 @@
+# core/windowing.py
+
+import threading
+from typing import Callable, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def sliding_windows(bars: np.ndarray, window: int = 60) -> np.ndarray:
+    """Every ``window``-bar window of a bar array as a strided view.
+
+    ``(time, features)`` becomes ``(n_windows, window, features)`` and
+    ``(symbols, time, features)`` becomes
+    ``(symbols, n_windows, window, features)``. Nothing is copied; window
+    ``i`` covers bars ``i .. i + window - 1``.
+    """
+    bars = np.asarray(bars)
+    if bars.shape[-2] < window:
+        raise ValueError(f"Need at least {window} bars, got {bars.shape[-2]}")
+    return np.swapaxes(sliding_window_view(bars, window, axis=-2), -1, -2)
+
+
+def normalize_windows(batch: np.ndarray, eps: float = 1e-8) -> np.ndarray:
+    """Z-score each window per feature, in place"""
+    window = batch.shape[1]
+    batch -= batch.mean(axis=1, keepdims=True)
+    scale = np.einsum('nwf,nwf->nf', batch, batch)
+    scale /= window
+    np.sqrt(scale, out=scale)
+    scale += eps
+    batch /= scale[:, np.newaxis, :]
+    return batch
+
+
+class WindowBatcher:
+    """Turns window views into model-ready float32 batches.
+
+    ``stack`` builds a fresh small batch per call, so concurrent
+    ``predict_latest`` calls never share memory. ``batches`` fills one
+    reusable scratch buffer; the arrays it yields are overwritten by the
+    next chunk, and ``predict`` holds a lock while it walks them.
+    """
+
+    def __init__(self, window: int = 60, n_features: int = 5, chunk_size: int = 4096, normalize: bool = True):
+        self.window = window
+        self.n_features = n_features
+        self.normalize = normalize
+        self.scratch = np.empty((chunk_size, window, n_features), dtype=np.float32)
+        self._scratch_lock = threading.Lock()
+
+    @property
+    def chunk_size(self) -> int:
+        return len(self.scratch)
+
+    def _finish(self, batch: np.ndarray) -> np.ndarray:
+        if self.normalize:
+            normalize_windows(batch)
+        return batch
+
+    def stack(self, windows: Sequence[np.ndarray]) -> np.ndarray:
+        """Batch the latest window of several symbols, e.g. ring buffer views"""
+        if len(windows) > self.chunk_size:
+            raise ValueError(f"At most {self.chunk_size} windows per batch")
+        batch = np.empty((len(windows), self.window, self.n_features), dtype=np.float32)
+        for row, window in zip(batch, windows):
+            row[...] = window[-self.window:]
+        return self._finish(batch)
+
+    def batches(self, windows: np.ndarray):
+        """Yield ``(start, batch)`` chunks over a window view from sliding_windows"""
+        n_windows = windows.shape[-3]
+        total = n_windows * (windows.shape[0] if windows.ndim == 4 else 1)
+        for start in range(0, total, self.chunk_size):
+            stop = min(start + self.chunk_size, total)
+            row, position = 0, start
+            # Copy symbol by symbol; reshaping a 4-D view to 3-D would copy all of it
+            while position < stop:
+                symbol, offset = divmod(position, n_windows)
+                take = min(stop - position, n_windows - offset)
+                source = windows[symbol] if windows.ndim == 4 else windows
+                self.scratch[row:row + take] = source[offset:offset + take]
+                row += take
+                position += take
+            yield start, self._finish(self.scratch[:stop - start])
+
+    def predict(self, predict_fn: Callable[[np.ndarray], np.ndarray], windows: np.ndarray) -> np.ndarray:
+        """Run ``predict_fn`` over every window, one chunk at a time.
+
+        Returns the first model output per window, shaped ``(n_windows,)`` or
+        ``(symbols, n_windows)`` like the input view.
+        """
+        total = windows.shape[-3] * (windows.shape[0] if windows.ndim == 4 else 1)
+        out = np.empty(total, dtype=np.float32)
+        with self._scratch_lock:
+            for start, batch in self.batches(windows):
+                out[start:start + len(batch)] = np.asarray(predict_fn(batch)).reshape(len(batch), -1)[:, 0]
+        return out.reshape(windows.shape[:-2])
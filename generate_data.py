@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from core.bar_store import BarStore
 
 # Generate fake BTCUSD data
 dates = pd.date_range(start="2024-01-01", periods=1000, freq="T")
@@ -11,8 +12,10 @@ df = pd.DataFrame({
     "high": prices + 200,
     "low": prices - 200,
     "close": prices + 50,
-    "volume": np.random.randint(500, 1500, 1000)
+    "tick_volume": np.random.randint(500, 1500, 1000)
 })
+df["time"] = df["time"].astype("datetime64[s]").astype(np.int64)
 
-df.to_csv("BTCUSD_historical.csv", index=False)
-print("Fake data generated!")
\ No newline at end of file
+store = BarStore.open("BTCUSD", "M1")
+store.append(df.to_records(index=False))
+print(f"Fake data generated in {store.path}!")
\ No newline at end of file
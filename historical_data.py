@@ -1,9 +1,11 @@
-import MetaTrader5 as mt5
-import pandas as pd
+from core.bar_store import BarStore
+from core.mt5_session import get_session
+
+mt5 = get_session()
 
 def collect_crypto_data():
     """Fetch historical data for crypto pairs"""
-    if not mt5.initialize():
+    if not mt5.connect():
         print("Failed to connect to MT5")
         return
     
@@ -15,15 +17,13 @@ def collect_crypto_data():
             print("No data received for BTCUSD. Check symbol availability.")
             return
         
-        df = pd.DataFrame(btc_data)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        df.to_csv("BTCUSD_historical.csv", index=False)
-        print("Saved BTCUSD_historical.csv with", len(df), "rows")
+        store = BarStore.open("BTCUSD", "M1")
+        written = store.append(btc_data)
+        print(f"Appended {written} new bars to {store.path} ({len(store)} total)")
         
     except Exception as e:
         print(f"Error fetching data: {e}")
-    finally:
-        mt5.shutdown()
 
 if __name__ == "__main__":
-    collect_crypto_data()
\ No newline at end of file
+    collect_crypto_data()
+    mt5.shutdown()
\ No newline at end of file
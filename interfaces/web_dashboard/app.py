@@ -1,19 +1,28 @@
 from flask import Flask, render_template, jsonify
 from core.data_handler import DataHandler
 from core.market_analyzer import MarketAnalyzer
+from core.prediction_cache import PredictionCache
 import threading
 
 app = Flask(__name__)
 symbol = "AAPL"
+interval = "5m"
+cache = PredictionCache(max_entries=256)
 
-def update_data():
-    data = DataHandler(symbol).fetch_live_data()
+def compute_indicators(data):
     analyzer = MarketAnalyzer(data)
     return {
         "rsi": analyzer.calculate_rsi().iloc[-1],
         "macd": analyzer.calculate_macd().iloc[-1].to_dict()
     }
 
+def update_data():
+    data = DataHandler(symbol, interval=interval).fetch_live_data()
+    # Indicators only change when the bars do; the last one is still forming, so its values are keyed too
+    last = (str(data.index[-1]), tuple(data.iloc[-1].tolist())) if len(data) else (None, ())
+    key = PredictionCache.key(symbol, interval, last[0], "indicators", last[1])
+    return cache.get_or_compute(key, lambda: compute_indicators(data))
+
 @app.route("/")
 def home():
     return render_template("dashboard.html")
@@ -22,5 +31,9 @@ def home():
 def data():
     return jsonify(update_data())
 
+@app.route("/metrics")
+def metrics():
+    return jsonify({"prediction_cache": cache.stats()})
+
 if __name__ == "__main__":
     threading.Thread(target=app.run).start()
\ No newline at end of file
@@ -1,13 +1,18 @@
 # main.py
+import sys
+from utils.startup_profile import ImportProfiler
+startup_profiler = ImportProfiler().install() if '--startup-profile' in sys.argv else None
+
 import os
 import time
 import schedule
-import pandas as pd
-import MetaTrader5 as mt5
 from datetime import datetime
 from dotenv import load_dotenv
 import httpx
+from core.bar_buffer import MT5BarFeed
 from core.ml_models import AdaptiveAlphaModel
+from core.mt5_session import get_session
+from core.prediction_cache import PredictionCache
 from core.trade_executor import MT5TradeExecutor
 from utils.resource_watchdog import ResourceGuardian
 from config import Config
@@ -21,9 +26,12 @@ os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+mt5 = get_session()
 
 def send_telegram_report(message: str):
     """Send formatted message to Telegram with error handling"""
+    if not os.getenv('TELEGRAM_BOT_TOKEN'):
+        return  # offline runs and replays have no bot configured
     try:
         response = httpx.post(
             f"https://api.telegram.org/bot{os.getenv('TELEGRAM_BOT_TOKEN')}/sendMessage",
@@ -40,10 +48,13 @@ def send_telegram_report(message: str):
         logger.error(f"Telegram notification failed: {str(e)}")
 
 class TradingBot:
-    def __init__(self):
-        self.model = AdaptiveAlphaModel()
-        self.trader = MT5TradeExecutor()
+    def __init__(self, model=None, clock=time.time):
+        self.model = model or AdaptiveAlphaModel()
+        self.trader = MT5TradeExecutor(clock=clock)
         self.resource_guard = ResourceGuardian()
+        self.bar_feed = MT5BarFeed(mt5.TIMEFRAME_M15, capacity=Config.BAR_BUFFER_SIZE, terminal=mt5)
+        self.window = self.model.input_shape[0]
+        self.prediction_cache = PredictionCache(Config.PREDICTION_CACHE_SIZE)
         self.current_symbol = Config.SYMBOLS[0]
         self.account_info = None
         self.last_trade_report = ""
@@ -51,15 +62,20 @@ class TradingBot:
     def get_mt5_account_status(self) -> str:
         """Fetch and format MT5 account statistics"""
         try:
-            self.account_info = mt5.account_info()._asdict()
-            positions = mt5.positions_get(magic=Config.MAGIC_NUMBER)
+            self.account_info = self.trader.snapshot.account()._asdict()
+            session = mt5.stats()
+            orders = self.trader.latency.latency()
+            slippage_cost = self.trader.latency.slippage_cost()
             
             status = (
                 f"💼 *Account Overview*\n"
                 f"Balance: ${self.account_info['balance']:,.2f}\n"
                 f"Equity: ${self.account_info['equity']:,.2f}\n"
                 f"Margin Free: ${self.account_info['margin_free']:,.2f}\n"
-                f"Open Positions: {len(positions)}"
+                f"Open Positions: {self.trader.risk.open_positions}\n"
+                f"Today: ${self.trader.risk.realized_today:,.2f} realized (limit -${self.trader.risk.loss_limit:,.2f})\n"
+                f"Terminal: up {session['uptime'] / 3600:.1f}h, {session['reconnects']} reconnects\n"
+                f"Orders: p50 {orders['p50']:.0f}ms p99 {orders['p99']:.0f}ms, slippage cost ${slippage_cost:,.2f}"
             )
             return status
         except Exception as e:
@@ -69,18 +85,18 @@ class TradingBot:
     def execute_trading_cycle(self):
         """Complete trading iteration with enhanced reporting"""
         try:
+            self.model.check_for_update()
+            self.trader.snapshot.new_cycle()
+            self.trader.sync_risk()
+
             # 1. Market Analysis
-            rates = mt5.copy_rates_from_pos(
-                self.current_symbol, 
-                mt5.TIMEFRAME_M15, 
-                0, 
-                100
-            )
-            df = pd.DataFrame(rates)
-            df['time'] = pd.to_datetime(df['time'], unit='s')
+            bars = self.bar_feed.refresh(self.current_symbol)
 
-            # 2. AI Prediction
-            prediction = self.model.predict(df[['open', 'high', 'low', 'close', 'tick_volume']].values)
+            # 2. AI Prediction (skipped if the bars are unchanged since the last identical request)
+            prediction = self.prediction_cache.get_or_compute(
+                self._cache_key(self.current_symbol, bars),
+                lambda: self.model.predict_latest([bars.ohlcv(self.window)])[0]
+            )
             
             # 3. Execute Trade
             trade_result = None
@@ -97,7 +113,7 @@ class TradingBot:
                 f"🔹 Symbol: {self.current_symbol}\n"
                 f"🔹 Signal: {prediction['signal'].upper()}\n"
                 f"🔹 Confidence: {prediction['confidence']:.2%}\n"
-                f"🔹 Price: {df['close'].iloc[-1]:.5f}\n\n"
+                f"🔹 Price: {bars.close[-1]:.5f}\n\n"
                 f"{self.get_mt5_account_status()}"
             )
             
@@ -122,6 +138,102 @@ class TradingBot:
             send_telegram_report(error_msg)
             logger.error(f"Trading cycle failed: {str(e)}")
 
+    def execute_multi_symbol_cycle(self):
+        """Evaluate every configured symbol in one cycle.
+
+        Inference is a single batched call and a failing symbol only drops
+        itself from the cycle. Bar refreshes and orders run one after the
+        other: every terminal call holds the MT5 session lock, so a thread
+        pool here only added handoffs.
+        """
+        started = time.perf_counter()
+        failures = {}
+        try:
+            self.model.check_for_update()
+            self.trader.snapshot.new_cycle()
+            self.trader.sync_risk()
+
+            # 1. Market Analysis
+            ready = []
+            for symbol in Config.SYMBOLS:
+                try:
+                    bars = self.bar_feed.refresh(symbol)
+                    if len(bars) < self.window:
+                        raise ValueError(f"only {len(bars)} bars available")
+                    ready.append((symbol, bars))
+                except Exception as e:
+                    failures[symbol] = f"data: {str(e)[:100]}"
+
+            # 2. AI Prediction (one batch over the symbols without a cached result)
+            predictions, stale = {}, []
+            for symbol, bars in ready:
+                key = self._cache_key(symbol, bars)
+                cached = self.prediction_cache.get(key)
+                if cached is None:
+                    stale.append((symbol, bars, key))
+                else:
+                    predictions[symbol] = cached
+            if stale:
+                views = [bars.ohlcv(self.window) for _, bars, _ in stale]
+                for (symbol, _, key), prediction in zip(stale, self.model.predict_latest(views)):
+                    self.prediction_cache.put(key, prediction)
+                    predictions[symbol] = prediction
+
+            # 3. Execute Trades
+            trade_results = {}
+            for symbol, prediction in predictions.items():
+                if prediction['signal'] == 'hold':
+                    continue
+                try:
+                    trade_results[symbol] = self.trader.execute_trade(symbol, prediction['signal'],
+                                                                      Config.RISK_PER_TRADE)
+                    if trade_results[symbol] is None:
+                        failures[symbol] = "order: not executed"
+                except Exception as e:
+                    failures[symbol] = f"order: {str(e)[:100]}"
+
+            # 4. Prepare Report
+            lines = []
+            for symbol, bars in ready:
+                prediction = predictions[symbol]
+                line = (
+                    f"🔹 {symbol}: {prediction['signal'].upper()} "
+                    f"({prediction['confidence']:.0%}) @ {bars.close[-1]:.5f}"
+                )
+                result = trade_results.get(symbol)
+                if result:
+                    line += f" ✅ {result['volume']:.2f} lots #{result['order']}"
+                lines.append(line)
+            lines.extend(f"⚠️ {symbol}: {reason}" for symbol, reason in failures.items())
+
+            report = (
+                f"📈 *Trading Update* ({datetime.now().strftime('%Y-%m-%d %H:%M')})\n"
+                + "\n".join(lines) + "\n\n"
+                + self.get_mt5_account_status()
+            )
+
+            # 5. Send Update
+            if report != self.last_trade_report:
+                send_telegram_report(report)
+                self.last_trade_report = report
+
+            cache = self.prediction_cache.stats()
+            logger.info(
+                f"Cycle over {len(Config.SYMBOLS)} symbols took {time.perf_counter() - started:.3f}s "
+                f"({len(failures)} failed, {len(ready) - len(stale)} cached predictions, "
+                f"cache hit rate {cache['hit_rate']:.0%})"
+            )
+
+        except Exception as e:
+            error_msg = f"🚨 *Trading Error*\n{str(e)[:200]}"
+            send_telegram_report(error_msg)
+            logger.error(f"Trading cycle failed: {str(e)}")
+
+    def _cache_key(self, symbol: str, bars) -> tuple:
+        # The newest bar is still forming; a tick that moves it changes the model's input
+        return PredictionCache.key(symbol, Config.TIMEFRAME, bars.last_time, self.model.version,
+                                   tuple(bars.ohlcv(1)[0].tolist()) if len(bars) else ())
+
     def _rotate_symbols(self):
         """Rotate focus between configured symbols"""
         current_index = Config.SYMBOLS.index(self.current_symbol)
@@ -130,16 +242,22 @@ class TradingBot:
     def shutdown(self):
         """Graceful shutdown procedure"""
         self.trader.close_all_positions()
+        self.trader.shutdown()
         mt5.shutdown()
         send_telegram_report("🔴 Trading Bot Shutdown Complete")
         logger.info("System shutdown successfully")
 
 if __name__ == '__main__':
     bot = TradingBot()
+    if startup_profiler:
+        startup_profiler.mark("TradingBot ready")
+        startup_profiler.uninstall()
+        print(startup_profiler.report())
     send_telegram_report("🟢 AI Trading Bot Started Successfully")
     
     # Configure trading schedule
-    schedule.every(15).minutes.do(bot.execute_trading_cycle)
+    cycle = bot.execute_multi_symbol_cycle if Config.CYCLE_MODE == 'all' else bot.execute_trading_cycle
+    schedule.every(15).minutes.do(cycle)
     
     try:
         while True:
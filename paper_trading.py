@@ -1,31 +1,116 @@
-import pandas as pd
 import numpy as np
+from collections import deque
+from core.trade_ledger import BUY, SELL, TradeLedger
+
+class Position:
+    """One open paper position; a symbol can hold several, closed oldest first"""
+    __slots__ = ('ticket', 'symbol', 'price', 'volume', 'sl', 'tp')
+
+    def __init__(self, ticket, symbol, price, volume, sl=None, tp=None):
+        self.ticket = ticket
+        self.symbol = symbol
+        self.price = price
+        self.volume = volume
+        self.sl = sl
+        self.tp = tp
 
 class PaperTrade:
-    def __init__(self):
-        self.balance = 10000
-        self.positions = {}
-        self.trade_history = []
+    def __init__(self, balance=10000, spill_path=None, spill_rows=65536):
+        self.balance = balance
+        self.positions = {}  # symbol -> deque of Position, oldest first
+        self.ledger = TradeLedger(spill_path, spill_rows)
+        self._next_ticket = 1
+        self._resume()
+
+    def _resume(self):
+        """Rebuild balance, the ticket counter and open positions from an existing spill file"""
+        rows = self.ledger.spilled()
+        if not len(rows):
+            return
+        self.balance += self.ledger.realized_pnl()
+        opened = rows[rows['action'] == BUY]
+        closes = rows[(rows['action'] == SELL) & (rows['position'] >= 0)]
+        if not len(opened):
+            return
+        self._next_ticket = int(opened['position'].max()) + 1
+        remaining = opened['volume'].copy()
+        if len(closes):
+            tickets, index = np.unique(closes['position'], return_inverse=True)
+            closed = np.bincount(index, weights=closes['volume'])
+            at = np.minimum(np.searchsorted(tickets, opened['position']), len(tickets) - 1)
+            hit = tickets[at] == opened['position']
+            remaining[hit] -= closed[at[hit]]
+        still_open = remaining > 1e-12
+        # Buys are in ticket order, so each symbol's deque comes back oldest first
+        for row, volume in zip(opened[still_open], remaining[still_open]):
+            sl, tp = (None if np.isnan(row[field]) else float(row[field]) for field in ('sl', 'tp'))
+            symbol = row['symbol'].decode()
+            self.positions.setdefault(symbol, deque()).append(
+                Position(int(row['position']), symbol, float(row['price']), float(volume), sl, tp))
+
+    def close(self):
+        """Write the buffered fills to the spill file so a restart resumes from them"""
+        self.ledger.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def trade_history(self):
+        return self.ledger.history()
 
     def execute_trade(self, action, symbol, price, volume, sl=None, tp=None):
-        trade = {
-            "timestamp": pd.Timestamp.now(),
-            "symbol": symbol,
-            "action": action,
-            "price": price,
-            "volume": volume,
-            "sl": sl,
-            "tp": tp
-        }
-        self.trade_history.append(trade)
-        
         if action == "buy":
-            self.positions[symbol] = trade
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self.positions.setdefault(symbol, deque()).append(Position(ticket, symbol, price, volume, sl, tp))
+            self.ledger.append(symbol, BUY, price, volume, ticket, sl, tp)
             return f"📝 Paper BUY {symbol} {volume} @ {price:.5f} | SL: {sl:.2f} TP: {tp:.2f}"
         else:
-            if symbol in self.positions:
-                closed_trade = self.positions.pop(symbol)
-                profit = (price - closed_trade["price"]) * volume
-                self.balance += profit
-                return f"📝 Paper SELL {symbol} {volume} @ {price:.5f} | PNL: {profit:.2f}"
-            return "No position to close"
\ No newline at end of file
+            open_positions = self.positions.get(symbol)
+            if not open_positions:
+                self.ledger.append(symbol, SELL, price, volume, -1, sl, tp)
+                return "No position to close"
+            # FIFO: the sell closes the oldest positions first, partially if needed
+            remaining, profit = volume, 0.0
+            while open_positions and remaining > 1e-12:
+                position = open_positions[0]
+                filled = min(position.volume, remaining)
+                pnl = (price - position.price) * filled
+                self.ledger.append(symbol, SELL, price, filled, position.ticket, sl, tp, pnl)
+                profit += pnl
+                remaining -= filled
+                position.volume -= filled
+                if position.volume <= 1e-12:
+                    open_positions.popleft()
+            if not open_positions:
+                del self.positions[symbol]
+            self.balance += profit
+            return f"📝 Paper SELL {symbol} {volume} @ {price:.5f} | PNL: {profit:.2f}"
+
+    def open_positions(self):
+        """Open positions as parallel arrays: symbols, entry prices and volumes"""
+        records = [position for queue in self.positions.values() for position in queue]
+        symbols = np.array([position.symbol for position in records], dtype=object)
+        prices = np.fromiter((position.price for position in records), dtype=np.float64, count=len(records))
+        volumes = np.fromiter((position.volume for position in records), dtype=np.float64, count=len(records))
+        return symbols, prices, volumes
+
+    def unrealized_pnl(self, prices):
+        """Open PnL per symbol at ``prices`` (symbol -> current price)"""
+        symbols, entry, volume = self.open_positions()
+        if not len(symbols):
+            return {}
+        names, index = np.unique(symbols.astype(str), return_inverse=True)
+        current = np.array([prices[name] for name in names], dtype=np.float64)[index]
+        pnl = np.bincount(index, weights=(current - entry) * volume, minlength=len(names))
+        return dict(zip(names.tolist(), pnl.tolist()))
+
+    def realized_pnl(self):
+        return self.ledger.realized_pnl()
+
+    def symbol_stats(self):
+        return self.ledger.symbol_stats()
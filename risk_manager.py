@@ -1,27 +1,49 @@
-import MetaTrader5 as mt5
 import pandas as pd
 import numpy as np
+from datetime import datetime, timedelta, timezone
+from core.mt5_session import get_session
+from core.risk_state import RiskState
+
+mt5 = get_session()
 # Example definitions
 RISK_PER_TRADE = 0.02  # 2% risk per trade
 MAX_DAILY_LOSS = 0.05  # 5% maximum daily loss
 class RiskManager:
     def __init__(self):
-        self.daily_pnl = 0
-        self.trade_count = 0
+        self.state = RiskState(max_daily_loss=MAX_DAILY_LOSS)
+
+    @property
+    def daily_pnl(self):
+        return self.state.realized_today
+
+    @property
+    def trade_count(self):
+        return self.state.fills_today
+
+    def sync(self, force=False):
+        """Reconcile with the terminal's positions and account, at most every sync_interval seconds"""
+        if force or not self.state.synced or self.state.needs_sync():
+            start = datetime.fromtimestamp(self.state.day_start, timezone.utc)
+            deals = mt5.history_deals_get(start, start + timedelta(days=2))
+            self.state.reconcile(mt5.positions_get() or (), mt5.account_info(), deals=deals)
 
     def calculate_position_size(self, symbol):
-        account_info = mt5.account_info()
-        balance = account_info.balance
+        if not self.state.synced:
+            self.sync()
         tick = mt5.symbol_info_tick(symbol)
-        risk_amount = balance * RISK_PER_TRADE
+        risk_amount = self.state.balance * RISK_PER_TRADE
         return round(risk_amount / (tick.ask * 100000), 2)
 
     def can_trade(self):
-        return self.daily_pnl > -(MAX_DAILY_LOSS * mt5.account_info().balance)
+        if not self.state.synced:
+            self.sync()
+        return self.state.can_trade()
+
+    def on_fill(self, symbol, side, volume, price, position=None):
+        self.state.on_fill(symbol, side, volume, price, position)
 
     def update_pnl(self, profit):
-        self.daily_pnl += profit
-        self.trade_count += 1
+        self.state.book(profit)
         # risk_manager.py
 
 # Risk management settings
@@ -0,0 +1,39 @@
+# test_ai_trader.py
+
+import os
+import tempfile
+import unittest
+import importlib.util
+from pathlib import Path
+import pandas as pd
+
+HAS_SKLEARN = importlib.util.find_spec('sklearn') is not None
+ROOT = Path(__file__).resolve().parent
+
+@unittest.skipUnless(HAS_SKLEARN, "scikit-learn is needed for the forest")
+class TestAITrader(unittest.TestCase):
+    def test_live_model_predicts_single_threaded(self):
+        from ai_trader import AITrader
+        self.assertEqual(AITrader().model.n_jobs, 1)
+
+    def test_csv_timeframe_comes_from_the_bars(self):
+        from ai_trader import AITrader
+        from core.feature_store import FeatureStore
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = FeatureStore(tmp)
+            trader = AITrader(feature_store=store)
+            trader.model.set_params(n_estimators=5)
+            trader.train(ROOT / 'EURUSD_historical.csv')
+            trader.train(ROOT / 'BTCUSD_historical.csv', timeframe='M1')
+            self.assertEqual(sorted(name.split('_')[:2] for name in os.listdir(tmp) if '_' in name),
+                             [['BTCUSD', 'M1'], ['EURUSD', 'H1']])
+
+    def test_infer_timeframe(self):
+        from ai_trader import AITrader
+        self.assertEqual(AITrader.infer_timeframe(pd.read_csv(ROOT / 'BTCUSD_historical.csv')), 'M1')
+        with self.assertRaises(ValueError):
+            AITrader.infer_timeframe(pd.DataFrame({'time': [0, 7, 14]}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# test_backtest.py
+
+import unittest
+import numpy as np
+from core.bar_buffer import BAR_DTYPE
+from core.backtest import backtest
+from paper_trading import PaperTrade
+
+def make_bars(close, spread=0):
+    bars = np.zeros(len(close), dtype=BAR_DTYPE)
+    bars['close'] = bars['open'] = close
+    bars['high'] = bars['low'] = close
+    bars['spread'] = spread
+    return bars
+
+class TestBacktest(unittest.TestCase):
+    def test_matches_paper_trade_on_alternating_signals(self):
+        close = np.array([1.10, 1.11, 1.12, 1.09, 1.08, 1.10, 1.13, 1.12])
+        signals = np.array(['buy', 'hold', 'sell', 'buy', 'hold', 'hold', 'sell', 'hold'])
+
+        paper = PaperTrade()
+        for price, signal in zip(close, signals):
+            if signal != 'hold':
+                paper.execute_trade(signal, 'EURUSD', price, 2.0, sl=0.0, tp=0.0)
+
+        result = backtest(make_bars(close), signals, volume=2.0, slippage_pips=0)
+        self.assertAlmostEqual(result.equity[-1], paper.balance, places=9)
+        np.testing.assert_array_equal(result.position, [1, 1, 0, 1, 1, 1, 0, 0])
+        self.assertEqual(list(result.trades['reason']), ['signal', 'signal'])
+        self.assertAlmostEqual(result.summary()['net_pnl'], paper.balance - 10000, places=9)
+
+    def test_costs_stops_and_open_positions(self):
+        close = np.array([1.0, 1.0, 1.0, 1.0, 1.0])
+        bars = make_bars(close, spread=10)
+        bars['low'][2] = 0.98  # stop at 1% below the ask fill
+        result = backtest(bars, [1, 0, 0, 1, 0], stop_loss=0.01, slippage_pips=1)
+
+        stop, still_open = result.trades
+        self.assertEqual((stop['reason'], stop['exit_index']), ('sl', 2))
+        self.assertAlmostEqual(stop['entry_price'], 1.0 + 10e-5 + 10e-5)
+        self.assertAlmostEqual(stop['exit_price'], stop['entry_price'] * 0.99 - 10e-5)
+        self.assertEqual(still_open['reason'], 'open')
+        self.assertEqual(result.summary()['trades'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
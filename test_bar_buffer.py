@@ -0,0 +1,92 @@
+# test_bar_buffer.py
+
+import unittest
+import numpy as np
+from core.bar_buffer import BAR_DTYPE, BarRingBuffer, MT5BarFeed, timeframe_seconds
+
+def make_rates(start, count, step=900):
+    rates = np.zeros(count, dtype=BAR_DTYPE)
+    rates['time'] = start + step * np.arange(count)
+    rates['close'] = np.arange(start, start + count, dtype=float)
+    rates['open'] = rates['close'] - 0.5
+    return rates
+
+class FakeTerminal:
+    """Serves bars from a fixed history, the newest being ``visible``"""
+    def __init__(self, history):
+        self.history = history
+        self.visible = len(history)
+        self.calls = []
+
+    def copy_rates_from_pos(self, symbol, timeframe, start_pos, count):
+        self.calls.append(('from_pos', count))
+        return self.history[max(0, self.visible - count):self.visible].copy()
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        self.calls.append(('from', count))
+        return self.history[max(0, self.visible - count):self.visible].copy()
+
+    def last_error(self):
+        return (0, 'ok')
+
+class TestBarRingBuffer(unittest.TestCase):
+    def test_views_are_contiguous_after_wraparound(self):
+        buffer = BarRingBuffer(capacity=5)
+        buffer.extend(make_rates(0, 3, step=1))
+        buffer.extend(make_rates(3, 4, step=1))
+        np.testing.assert_array_equal(buffer.times(), [2, 3, 4, 5, 6])
+        np.testing.assert_array_equal(buffer.close, [2, 3, 4, 5, 6])
+        self.assertEqual(buffer.ohlcv(2).shape, (2, 5))
+        self.assertTrue(np.shares_memory(buffer.ohlcv(), buffer.values()))
+        self.assertFalse(buffer.ohlcv().flags.writeable)
+
+    def test_forming_bar_is_replaced_and_old_bars_ignored(self):
+        buffer = BarRingBuffer(capacity=10)
+        buffer.extend(make_rates(0, 4, step=1))
+        update = make_rates(2, 3, step=1)
+        update['close'] = [20.0, 30.0, 40.0]
+        self.assertEqual(buffer.extend(update), 1)
+        np.testing.assert_array_equal(buffer.close, [0, 1, 2, 30, 40])
+        self.assertEqual(buffer.last_time, 4)
+
+    def test_timeframe_seconds(self):
+        self.assertEqual(timeframe_seconds('M15'), 900)
+        self.assertEqual(timeframe_seconds(16385), 3600)   # TIMEFRAME_H1
+        self.assertEqual(timeframe_seconds(16408), 86400)  # TIMEFRAME_D1
+
+class TestMT5BarFeed(unittest.TestCase):
+    def test_incremental_refresh_fetches_only_new_bars(self):
+        terminal = FakeTerminal(make_rates(0, 200))
+        terminal.visible = 150
+        feed = MT5BarFeed(timeframe=15, capacity=100, terminal=terminal)
+        buffer = feed.refresh('EURUSD')
+        self.assertEqual(len(buffer), 100)
+
+        terminal.visible = 151
+        feed.refresh('EURUSD')
+        self.assertEqual(terminal.calls[-1], ('from', 2))
+        np.testing.assert_array_equal(buffer.close[-2:], [149, 150])
+
+        terminal.visible = 160
+        feed.refresh('EURUSD')
+        np.testing.assert_array_equal(buffer.close[-3:], [157, 158, 159])
+        self.assertEqual(len(buffer), 100)
+        self.assertEqual(terminal.calls[-2:], [('from', 3), ('from', 12)])  # 1 new bar last time, so 3 first
+
+        # 9 new bars last time: the next refresh asks for 11 straight away
+        terminal.visible = 169
+        feed.refresh('EURUSD')
+        self.assertEqual(terminal.calls[-1], ('from', 11))
+        np.testing.assert_array_equal(buffer.close[-2:], [167, 168])
+
+    def test_long_gap_reseeds(self):
+        terminal = FakeTerminal(make_rates(0, 500))
+        terminal.visible = 50
+        feed = MT5BarFeed(timeframe=15, capacity=20, terminal=terminal)
+        feed.refresh('EURUSD')
+        terminal.visible = 400
+        buffer = feed.refresh('EURUSD')
+        np.testing.assert_array_equal(buffer.close, np.arange(380, 400))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# test_bar_store.py
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from core.bar_buffer import BAR_DTYPE
+from core.bar_store import BarStore, import_csv
+from test_bar_buffer import make_rates
+
+ROOT = Path(__file__).resolve().parent
+
+class TestBarStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'EURUSD_M15.bars')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_skips_bars_already_stored(self):
+        store = BarStore(self.path)
+        self.assertEqual(store.append(make_rates(0, 10)), 10)
+        self.assertEqual(store.append(make_rates(900 * 5, 10)), 5)
+        self.assertEqual(store.append(make_rates(0, 15)), 0)
+        self.assertEqual(len(store), 15)
+        np.testing.assert_array_equal(store.bars['time'], 900 * np.arange(15))
+        self.assertEqual(store.last_time, 900 * 14)
+        self.assertEqual(len(BarStore(self.path)), 15)
+
+    def test_rejects_unordered_bars_and_foreign_files(self):
+        store = BarStore(self.path)
+        with self.assertRaises(ValueError):
+            store.append(make_rates(0, 5)[::-1])
+        other = os.path.join(self.tmp.name, 'other.bars')
+        Path(other).write_bytes(b'not a bar store')
+        with self.assertRaises(ValueError):
+            BarStore(other)
+
+    def test_slice_is_half_open_and_follows_appends(self):
+        store = BarStore(self.path)
+        store.append(make_rates(0, 10))
+        bars = store.slice(900 * 2, 900 * 5)
+        np.testing.assert_array_equal(bars['time'], [1800, 2700, 3600])
+        self.assertEqual(len(store.slice(901, 1799)), 0)
+        np.testing.assert_array_equal(store.column('close', start=900 * 8), [8.0, 9.0])
+        store.append(make_rates(900 * 10, 5))
+        np.testing.assert_array_equal(store.slice(start=900 * 12)['time'], [10800, 11700, 12600])
+        self.assertEqual(len(store.slice()), 15)
+
+    def test_import_shipped_csvs(self):
+        eurusd = import_csv(ROOT / 'EURUSD_historical.csv', 'EURUSD', 'H1', self.tmp.name)
+        expected = pd.read_csv(ROOT / 'EURUSD_historical.csv')
+        self.assertEqual(eurusd.bars.dtype, BAR_DTYPE)
+        self.assertEqual(len(eurusd), len(expected))
+        np.testing.assert_allclose(eurusd.bars['close'], expected['close'])
+        np.testing.assert_array_equal(eurusd.bars['spread'], expected['spread'])
+        frame = eurusd.to_frame(end=int(pd.Timestamp('2024-12-17 10:00').timestamp()))
+        self.assertEqual(list(frame['time'].astype(str)),
+                         ['2024-12-17 07:00:00', '2024-12-17 08:00:00', '2024-12-17 09:00:00'])
+
+        # The BTCUSD file has a plain 'volume' column
+        btcusd = import_csv(ROOT / 'BTCUSD_historical.csv', 'BTCUSD', 'M1', self.tmp.name)
+        expected = pd.read_csv(ROOT / 'BTCUSD_historical.csv')
+        np.testing.assert_array_equal(btcusd.bars['tick_volume'], expected['volume'])
+        self.assertEqual(Path(btcusd.path).name, 'BTCUSD_M1.bars')
+        # Importing again adds nothing
+        self.assertEqual(len(import_csv(ROOT / 'BTCUSD_historical.csv', 'BTCUSD', 'M1', self.tmp.name)), 1000)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+# test_device_manager.py
+
+import os
+import unittest
+from unittest import mock
+from utils.device_manager import detect_gpu
+
+class TestDetectGPU(unittest.TestCase):
+    def detect(self, env=None, which=None, paths=()):
+        with mock.patch.dict(os.environ, env or {}, clear=False), \
+                mock.patch('utils.device_manager.shutil.which', return_value=which), \
+                mock.patch('utils.device_manager.os.path.exists', side_effect=lambda path: path in paths):
+            if env is None:
+                os.environ.pop('CUDA_VISIBLE_DEVICES', None)
+            return detect_gpu()
+
+    def test_no_driver_means_no_gpu(self):
+        self.assertFalse(self.detect())
+
+    def test_nvidia_driver(self):
+        self.assertTrue(self.detect(which='/usr/bin/nvidia-smi'))
+        self.assertTrue(self.detect(paths=('/proc/driver/nvidia/version',)))
+
+    def test_rocm_driver(self):
+        self.assertTrue(self.detect(paths=('/dev/kfd',)))
+
+    def test_hidden_devices_win_over_drivers(self):
+        for hidden in ('', '-1'):
+            self.assertFalse(self.detect({'CUDA_VISIBLE_DEVICES': hidden}, which='/usr/bin/nvidia-smi'))
+        self.assertTrue(self.detect({'CUDA_VISIBLE_DEVICES': '0'}, which='/usr/bin/nvidia-smi'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+# test_feature_store.py
+
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from core.feature_store import FeatureStore
+
+def sma_rsi(series, period=14):
+    delta = series.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    return 100 - (100 / (1 + (gain.rolling(period).mean() / loss.rolling(period).mean())))
+
+class TestFeatureStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(5)
+        self.bars = pd.DataFrame({'close': 1.1 + np.cumsum(rng.normal(0, 0.001, 800))})
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_matches_pandas_and_extends_incrementally(self):
+        store = FeatureStore(self.tmp.name)
+        head = store.features('EURUSD', 'M15', self.bars[:500])
+        full = store.features('EURUSD', 'M15', self.bars)
+        again = FeatureStore(self.tmp.name).features('EURUSD', 'M15', self.bars)
+
+        close = self.bars['close']
+        for name, expected in (('returns', close.pct_change()), ('sma_20', close.rolling(20).mean()),
+                               ('rsi', sma_rsi(close))):
+            np.testing.assert_array_equal(full[name], expected.to_numpy())
+            np.testing.assert_array_equal(again[name], full[name])
+            np.testing.assert_array_equal(head[name], full[name][:500])
+        self.assertEqual((store.misses, store.extensions), (1, 1))
+        self.assertEqual(store.stats()['entries'], 1)
+
+    def test_shorter_range_after_an_extension_is_served_from_the_entry(self):
+        store = FeatureStore(self.tmp.name)
+        store.features('EURUSD', 'M15', self.bars[:500])
+        full = store.features('EURUSD', 'M15', self.bars)
+        head = store.features('EURUSD', 'M15', self.bars[:500])
+        self.assertEqual(full['rsi'][-1], sma_rsi(self.bars['close']).iloc[-1])  # used to die with SIGBUS
+        np.testing.assert_array_equal(head['sma_20'], full['sma_20'][:500])
+        self.assertEqual((store.misses, store.extensions, store.hits), (1, 1, 1))
+        self.assertEqual(store.stats()['entries'], 1)
+        # The extended entry survives and is still a hit for the full range, also after a reopen
+        np.testing.assert_array_equal(FeatureStore(self.tmp.name).features('EURUSD', 'M15', self.bars)['rsi'],
+                                      full['rsi'])
+        np.testing.assert_array_equal(store.features('EURUSD', 'M15', self.bars[:600])['rsi'], full['rsi'][:600])
+        self.assertEqual((store.misses, store.hits), (1, 2))
+
+    def test_changed_history_and_eviction(self):
+        store = FeatureStore(self.tmp.name, max_bytes=8 * 3 * 800)
+        store.features('EURUSD', 'M15', self.bars)
+        revised = self.bars.copy()
+        revised.loc[10, 'close'] += 0.01  # not a prefix of the cached range any more
+        store.features('EURUSD', 'M15', revised)
+        self.assertEqual(store.misses, 2)
+        self.assertEqual(store.stats()['entries'], 1)  # the older entry was evicted
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+# test_indicators.py
+
+import pickle
+import unittest
+import numpy as np
+import pandas as pd
+from core.indicators import ATR, EMA, MACD, RSI, SMA, BollingerBands, batch_macd, batch_rsi
+
+# pandas reproductions of the pandas_ta formulas MarketAnalyzer delegates to,
+# so the comparison also runs where pandas_ta is not installed
+def ta_ema(close, length):
+    close = close.copy()
+    seed = close[0:length].mean()
+    close[:length - 1] = np.nan
+    close.iloc[length - 1] = seed
+    return close.ewm(span=length, adjust=False).mean()
+
+def ta_rma(series, length):
+    return series.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+def ta_rsi(close, length=14):
+    negative = close.diff()
+    positive = negative.copy()
+    positive[positive < 0] = 0
+    negative[negative > 0] = 0
+    positive_avg = ta_rma(positive, length)
+    negative_avg = ta_rma(negative, length)
+    return 100 * positive_avg / (positive_avg + negative_avg.abs())
+
+def ta_macd(close, fast=12, slow=26, signal=9):
+    macd = ta_ema(close, fast) - ta_ema(close, slow)
+    signal_line = ta_ema(macd.loc[macd.first_valid_index():], signal)
+    return pd.DataFrame({'macd': macd, 'hist': macd - signal_line, 'signal': signal_line})
+
+def ta_atr(high, low, close, length=14):
+    prev_close = close.shift(1)
+    ranges = pd.concat([high - low, high - prev_close, prev_close - low], axis=1)
+    true_range = ranges.abs().max(axis=1)
+    true_range.iloc[:1] = np.nan
+    return ta_rma(true_range, length)
+
+def ta_bbands(close, length=5, std=2.0):
+    mid = close.rolling(length).mean()
+    deviation = close.rolling(length).std(ddof=0) * std
+    lower, upper = mid - deviation, mid + deviation
+    return pd.DataFrame({
+        'lower': lower, 'mid': mid, 'upper': upper,
+        'bandwidth': 100 * (upper - lower) / mid,
+        'percent': (close - lower) / (upper - lower),
+    })
+
+def sma_rsi(series, period=14):
+    # AITrader._calculate_rsi
+    delta = series.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    avg_gain = gain.rolling(period).mean()
+    avg_loss = loss.rolling(period).mean()
+    return 100 - (100 / (1 + (avg_gain / avg_loss)))
+
+class TestStreamingIndicators(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(7)
+        close = 1.05 + np.cumsum(rng.normal(0, 0.0005, 600))
+        cls.close = pd.Series(close)
+        cls.high = cls.close + rng.uniform(0, 0.001, 600)
+        cls.low = cls.close - rng.uniform(0, 0.001, 600)
+
+    def assertSeriesClose(self, actual, expected):
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(np.asarray(expected)))
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+    def test_ema_and_sma(self):
+        self.assertSeriesClose(EMA(20).update_many(self.close), ta_ema(self.close, 20))
+        self.assertSeriesClose(SMA(20).update_many(self.close), self.close.rolling(20).mean())
+
+    def test_rsi_variants(self):
+        self.assertSeriesClose(RSI(14).update_many(self.close), ta_rsi(self.close))
+        self.assertSeriesClose(RSI(14, method='sma').update_many(self.close), sma_rsi(self.close))
+
+    def test_macd(self):
+        self.assertSeriesClose(MACD().update_many(self.close), ta_macd(self.close).to_numpy())
+
+    def test_atr_and_bollinger(self):
+        self.assertSeriesClose(ATR(14).update_many(self.high, self.low, self.close),
+                               ta_atr(self.high, self.low, self.close))
+        self.assertSeriesClose(BollingerBands(20).update_many(self.close),
+                               ta_bbands(self.close, 20).to_numpy())
+
+    def test_checkpoint_resumes_identically(self):
+        head, tail = self.close[:300], self.close[300:]
+        for make in (lambda: MACD(), lambda: RSI(14), lambda: RSI(14, 'sma'), lambda: BollingerBands(20)):
+            reference = make()
+            reference.update_many(head)
+            restored = make().load_state_dict(pickle.loads(pickle.dumps(reference.state_dict())))
+            np.testing.assert_array_equal(restored.update_many(tail), reference.update_many(tail))
+
+class TestBatchIndicators(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.prices = 1.05 + np.cumsum(rng.normal(0, 0.0005, (3, 300)), axis=1)
+
+    def assertMatches(self, actual, expected):
+        np.testing.assert_array_equal(np.isnan(actual), np.isnan(np.asarray(expected)))
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-12, equal_nan=True)
+
+    def test_batch_rsi_matches_per_symbol_reference(self):
+        wilder = batch_rsi(self.prices, [7, 14])
+        rolling = batch_rsi(self.prices, [7, 14], method='sma')
+        self.assertEqual(wilder.shape, (2, 3, 300))
+        for s, row in enumerate(self.prices):
+            for p, period in enumerate([7, 14]):
+                self.assertMatches(wilder[p, s], ta_rsi(pd.Series(row), period))
+                self.assertMatches(rolling[p, s], sma_rsi(pd.Series(row), period))
+
+    def test_batch_macd_matches_per_symbol_reference(self):
+        grid = [(12, 26, 9), (5, 35, 5), (26, 12, 9)]
+        result = batch_macd(self.prices, grid)
+        self.assertEqual(result.shape, (3, 3, 3, 300))
+        for s, row in enumerate(self.prices):
+            for p, (fast, slow, signal) in enumerate(grid):
+                expected = ta_macd(pd.Series(row), min(fast, slow), max(fast, slow), signal).to_numpy().T
+                self.assertMatches(result[:, p, s], expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+# test_latency.py
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+import numpy as np
+from utils.latency import Histogram, LatencyRecorder
+
+class TestHistogram(unittest.TestCase):
+    def test_small_values_exact(self):
+        histogram = Histogram(highest=10_000)
+        for value in range(1, 101):
+            histogram.record(value)
+        p = histogram.percentiles((50, 99))
+        self.assertEqual(p[50], 50)
+        self.assertEqual(p[99], 99)
+        self.assertEqual((histogram.min, histogram.max, histogram.count), (1, 100, 100))
+
+    def test_percentiles_within_relative_error(self):
+        values = np.random.default_rng(3).lognormal(8, 1.5, 20_000).astype(np.int64)
+        histogram = Histogram(highest=int(values.max()))
+        for value in values:
+            histogram.record(value)
+        for q, value in histogram.percentiles((50, 90, 99)).items():
+            exact = np.percentile(values, q, method='inverted_cdf')
+            self.assertLessEqual(abs(value - exact), exact / 128 + 1)
+
+    def test_fixed_memory_and_clamping(self):
+        histogram = Histogram(highest=60_000_000)
+        size = histogram.counts.nbytes
+        for value in (0, 5, 10 ** 9, -3):
+            histogram.record(value)
+        self.assertEqual(histogram.counts.nbytes, size)
+        self.assertEqual(histogram.max, 60_000_000)
+        self.assertEqual(histogram.min, 0)
+
+    def test_bulk_and_single_bucketing_agree(self):
+        values = np.random.default_rng(4).lognormal(6, 3, 5000).astype(np.int64)
+        bulk, single = Histogram(highest=10 ** 9), Histogram(highest=10 ** 9, pending=1)
+        for value in values:
+            bulk.record(value)
+            single.record(value)
+        np.testing.assert_array_equal(bulk.counts, single.counts)
+        self.assertEqual(bulk.percentiles(), single.percentiles())
+        self.assertEqual(int(bulk.counts.sum()), 5000)
+
+    def test_merge(self):
+        a, b = Histogram(1000), Histogram(1000)
+        a.record(10)
+        b.record(500)
+        a.merge(b)
+        self.assertEqual((a.count, a.min, a.max), (2, 10, 500))
+        with self.assertRaises(ValueError):
+            a.merge(Histogram(2000))
+
+class TestLatencyRecorder(unittest.TestCase):
+    def test_stages_per_symbol_and_merged(self):
+        recorder = LatencyRecorder()
+        recorder.record('EURUSD', 'order_send', 12.5)
+        recorder.record('EURUSD', 'order_send', 40.0)
+        recorder.record('GBPUSD', 'order_send', 100.0)
+        self.assertEqual(recorder.latency('EURUSD', 'order_send')['max'], 40.0)
+        merged = recorder.latency(stage='order_send')
+        self.assertEqual(merged['count'], 3)
+        self.assertAlmostEqual(merged['p50'], 40.0, delta=0.4)
+        self.assertEqual(recorder.latency('USDJPY')['count'], 0)
+
+    def test_stopwatch_laps_and_total(self):
+        recorder = LatencyRecorder()
+        watch = recorder.stopwatch('EURUSD')
+        watch.lap('tick')
+        watch.lap('build')
+        watch.stop()
+        report = recorder.report()['EURUSD']['latency_ms']
+        self.assertEqual(list(report), ['tick', 'build', 'total'])
+        self.assertGreaterEqual(report['total']['max'], report['tick']['max'])
+
+    def test_slippage_sign_and_cost(self):
+        recorder = LatencyRecorder()
+        self.assertAlmostEqual(recorder.record_slippage('EURUSD', True, 1.10000, 1.10003, 1e-5, 1.0, 1e5), 3)
+        self.assertAlmostEqual(recorder.record_slippage('EURUSD', False, 1.10000, 1.10001, 1e-5, 1.0, 1e5), -1)
+        slippage = recorder.slippage('EURUSD')
+        self.assertEqual(slippage['adverse']['count'], 1)
+        self.assertEqual(slippage['adverse']['max'], 3)
+        self.assertEqual(slippage['improved']['max'], 1)
+        self.assertAlmostEqual(slippage['cost'], 2.0)
+        recorder.record_slippage('GBPUSD', True, 1.30000, 1.30001, 1e-5, 1.0, 1e5)
+        self.assertAlmostEqual(recorder.slippage_cost('EURUSD'), 2.0)
+        self.assertAlmostEqual(recorder.slippage_cost(), 3.0)
+        self.assertEqual(recorder.slippage()['adverse']['count'], 2)  # served from the all-symbols histogram
+
+    def test_dump(self):
+        recorder = LatencyRecorder()
+        recorder.record('EURUSD', 'total', 5.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'latency.json'
+            recorder.dump(path)
+            data = json.loads(path.read_text())
+        self.assertEqual(data['EURUSD']['latency_ms']['total']['count'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
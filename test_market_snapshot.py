@@ -0,0 +1,77 @@
+# test_market_snapshot.py
+
+import unittest
+from collections import Counter
+from core.market_snapshot import MarketSnapshot
+
+class CountingTerminal:
+    def __init__(self):
+        self.calls = Counter()
+        self.available = True
+
+    def symbol_info_tick(self, symbol):
+        self.calls['tick'] += 1
+        return (symbol, self.calls['tick']) if self.available else None
+
+    def symbol_info(self, symbol):
+        self.calls['symbol'] += 1
+        return (symbol, 100000)
+
+    def account_info(self):
+        self.calls['account'] += 1
+        return ('account', self.calls['account'])
+
+class TestMarketSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.terminal = CountingTerminal()
+        self.snapshot = MarketSnapshot(self.terminal, tick_max_age=1.0, account_max_age=5.0,
+                                       symbol_max_age=60.0, clock=lambda: self.now)
+
+    def test_tick_fetched_once_per_cycle_within_max_age(self):
+        first = self.snapshot.tick('EURUSD')
+        self.assertIs(self.snapshot.tick('EURUSD'), first)
+        self.snapshot.new_cycle()
+        self.assertEqual(self.snapshot.tick('EURUSD'), ('EURUSD', 2))
+        self.now = 1.5
+        self.assertEqual(self.snapshot.tick('EURUSD'), ('EURUSD', 3))
+        self.assertEqual(self.terminal.calls['tick'], 3)
+
+    def test_symbol_info_cached_long_term(self):
+        for _ in range(3):
+            self.snapshot.new_cycle()
+            self.snapshot.symbol_info('EURUSD')
+        self.now = 61.0
+        self.snapshot.symbol_info('EURUSD')
+        self.assertEqual(self.terminal.calls['symbol'], 2)
+
+    def test_account_invalidated_after_fill(self):
+        self.snapshot.account()
+        self.snapshot.account()
+        self.snapshot.invalidate_account()
+        self.assertEqual(self.snapshot.account(), ('account', 2))
+        self.assertEqual(self.snapshot.stats()['account'], {'fetches': 2, 'hits': 1})
+
+    def test_fetch_overtaken_by_invalidation_not_cached(self):
+        fetch = self.terminal.account_info
+
+        def fill_during_fetch():
+            info = fetch()  # read before the fill landed...
+            self.snapshot.invalidate_account()  # ...which another thread reports while we return
+            return info
+
+        self.terminal.account_info = fill_during_fetch
+        self.assertEqual(self.snapshot.account(), ('account', 1))
+        self.terminal.account_info = fetch
+        self.assertEqual(self.snapshot.account(), ('account', 2))
+        self.assertEqual(self.snapshot.account(), ('account', 2))
+        self.assertEqual(self.snapshot.stats()['account'], {'fetches': 2, 'hits': 1})
+
+    def test_failed_fetch_not_cached(self):
+        self.terminal.available = False
+        self.assertIsNone(self.snapshot.tick('EURUSD'))
+        self.terminal.available = True
+        self.assertIsNotNone(self.snapshot.tick('EURUSD'))
+
+if __name__ == '__main__':
+    unittest.main()
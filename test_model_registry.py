@@ -0,0 +1,51 @@
+# test_model_registry.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from core.model_registry import ModelRegistry, data_fingerprint
+from core.numpy_lstm import NumpyLSTMModel
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_register_and_activate_versions(self):
+        first = self.registry.register(b'fp32', architecture='QuantumAlpha', input_shape=(60, 5), fmt='tflite',
+                                       data_hash=data_fingerprint(np.arange(10.0)))
+        second = self.registry.register(b'int8', architecture='QuantumAlpha', input_shape=(60, 5),
+                                        quantization='int8', fmt='tflite', activate=False)
+        self.assertEqual((first['version'], second['version']), ('v0001', 'v0002'))
+        self.assertEqual(self.registry.active_version(), 'v0001')
+
+        self.registry.activate('v0002')
+        reopened = ModelRegistry(self.tmp.name)
+        self.assertEqual(reopened.active()['quantization'], 'int8')
+        with open(reopened.path(reopened.active()), 'rb') as f:
+            self.assertEqual(f.read(), b'int8')
+        self.assertEqual(len(reopened.find(architecture='QuantumAlpha')), 2)
+        self.assertFalse([name for name in os.listdir(self.tmp.name) if name.startswith('.tmp-')])
+
+    def test_numpy_weights_are_memory_mapped(self):
+        rng = np.random.default_rng(1)
+        specs = [{'kind': 'LSTM', 'activation': 'tanh', 'recurrent_activation': 'sigmoid', 'return_sequences': False},
+                 {'kind': 'Dense', 'activation': 'linear'}]
+        weights = {'0_kernel': rng.normal(size=(5, 32)), '0_recurrent': rng.normal(size=(8, 32)),
+                   '0_bias': np.zeros(32), '1_kernel': rng.normal(size=(8, 1)), '1_bias': np.zeros(1)}
+        model = NumpyLSTMModel(specs, weights)
+        source = model.save(os.path.join(self.tmp.name, 'export'))
+
+        entry = self.registry.register(source, architecture='tiny', input_shape=(10, 5))
+        self.assertEqual(entry['format'], 'numpy')
+        loaded = NumpyLSTMModel.load(self.registry.path(entry))
+        self.assertIsInstance(loaded.weights['0_kernel'].base, np.memmap)
+        windows = rng.normal(size=(4, 10, 5))
+        np.testing.assert_array_equal(loaded.predict(windows), model.predict(windows))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+# test_mt5_session.py
+
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+from core.mt5_session import NOT_CONNECTED, MT5Session
+
+class FlakyTerminal:
+    TIMEFRAME_M15 = 15
+
+    def __init__(self):
+        self.up = True
+        self.initialize_calls = 0
+        self.active = 0
+        self.overlaps = 0
+        self.error = (1, 'Success')
+
+    def initialize(self, **kwargs):
+        self.initialize_calls += 1
+        self.error = (1, 'Success') if self.up else (-10003, 'IPC initialize failed')
+        return self.up
+
+    def shutdown(self):
+        pass
+
+    def last_error(self):
+        return self.error
+
+    def terminal_info(self):
+        return object() if self.up else None
+
+    def symbol_info_tick(self, symbol):
+        self.active += 1
+        self.overlaps += self.active > 1
+        time.sleep(0.001)
+        self.active -= 1
+        if not self.up:
+            self.error = (-10004, 'No IPC connection')
+            return None
+        return (symbol, 1.1)
+
+class TestMT5Session(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.terminal = FlakyTerminal()
+        self.session = MT5Session(self.terminal, credentials={'login': 1}, heartbeat_interval=0,
+                                  backoff_initial=1.0, backoff_max=4.0, clock=lambda: self.now)
+
+    def test_connects_once_and_forwards_constants(self):
+        self.assertTrue(self.session.initialize(login=1))
+        self.assertTrue(self.session.initialize(login=1))
+        self.assertEqual(self.session.symbol_info_tick('EURUSD'), ('EURUSD', 1.1))
+        self.assertEqual(self.session.TIMEFRAME_M15, 15)
+        self.assertEqual(self.terminal.initialize_calls, 1)
+
+    def test_ipc_failure_reconnects_with_backoff(self):
+        self.session.connect()
+        self.now = 10.0
+        self.terminal.up = False
+        self.assertIsNone(self.session.symbol_info_tick('EURUSD'))
+        self.assertFalse(self.session.connected)
+
+        self.assertFalse(self.session.check())  # immediate attempt fails, backoff 1s
+        self.now = 10.5
+        self.assertFalse(self.session.check())  # still backing off: no attempt
+        self.assertEqual(self.session.failed_attempts, 1)
+        calls = self.session.calls
+        self.assertIsNone(self.session.symbol_info_tick('EURUSD'))  # refused without reaching the terminal
+        self.assertEqual(self.session.calls, calls)
+        self.assertEqual(self.session.last_error()[0], NOT_CONNECTED)
+        self.now = 11.0
+        self.assertFalse(self.session.check())  # second failure, backoff 2s
+        self.terminal.up = True
+        self.now = 12.0
+        self.assertFalse(self.session.ensure_connected())  # still inside the 2s backoff
+        self.now = 13.0
+        self.assertEqual(self.session.symbol_info_tick('EURUSD'), ('EURUSD', 1.1))
+
+        stats = self.session.stats()
+        self.assertEqual((stats['connects'], stats['reconnects'], stats['disconnects'], stats['failed_attempts']),
+                         (2, 1, 1, 2))
+        self.assertEqual(stats['total_uptime'], 10.0)
+        self.now = 20.0
+        self.assertEqual(self.session.uptime, 7.0)
+
+    def test_calls_are_serialized_across_threads(self):
+        self.session.connect()
+        threads = [threading.Thread(target=lambda: [self.session.symbol_info_tick('EURUSD') for _ in range(20)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.terminal.overlaps, 0)
+        self.assertEqual(self.session.calls, 80)
+
+    def test_metatrader5_imported_on_first_use(self):
+        with mock.patch.dict(sys.modules, {'MetaTrader5': None}):  # None makes the import fail
+            session = MT5Session(credentials={'login': 1}, heartbeat_interval=0)
+            with self.assertRaises(ImportError):
+                session.TIMEFRAME_M15
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+# test_numpy_lstm.py
+
+import os
+import tempfile
+import unittest
+import importlib.util
+import numpy as np
+from core.numpy_lstm import KERAS_TOLERANCE, NumpyLSTMModel, export_keras_weights
+
+HAS_TF = importlib.util.find_spec('tensorflow') is not None
+
+@unittest.skipUnless(HAS_TF, "TensorFlow is needed for the reference model")
+class TestNumpyLSTM(unittest.TestCase):
+    def test_matches_keras_quantum_alpha(self):
+        import tensorflow as tf
+        tf.random.set_seed(3)
+        model = tf.keras.Sequential([
+            tf.keras.layers.LSTM(128, input_shape=(60, 5), return_sequences=True),
+            tf.keras.layers.Dropout(0.3),
+            tf.keras.layers.LSTM(64),
+            tf.keras.layers.Dense(32, activation='swish'),
+            tf.keras.layers.Dense(1, activation='linear')
+        ], name="QuantumAlpha")
+        windows = np.random.default_rng(0).normal(size=(16, 60, 5)).astype(np.float32)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = export_keras_weights(model, os.path.join(tmp, 'weights.npz'))
+            engine = NumpyLSTMModel.load(path)
+
+        expected = model.predict(windows, verbose=0)
+        np.testing.assert_allclose(engine.predict(windows), expected, atol=KERAS_TOLERANCE)
+        np.testing.assert_allclose(engine.predict(windows, batch_size=5), expected, atol=KERAS_TOLERANCE)
+
+class TestRecurrentStepping(unittest.TestCase):
+    def test_step_continues_the_encoded_sequence(self):
+        rng = np.random.default_rng(4)
+        specs = [{'kind': 'LSTM', 'activation': 'tanh', 'recurrent_activation': 'sigmoid', 'return_sequences': True},
+                 {'kind': 'LSTM', 'activation': 'tanh', 'recurrent_activation': 'sigmoid', 'return_sequences': False},
+                 {'kind': 'Dense', 'activation': 'linear'}]
+        weights = {'0_kernel': rng.normal(size=(3, 64)), '0_recurrent': rng.normal(size=(16, 64)), '0_bias': rng.normal(size=64),
+                   '1_kernel': rng.normal(size=(16, 32)), '1_recurrent': rng.normal(size=(8, 32)), '1_bias': rng.normal(size=32),
+                   '2_kernel': rng.normal(size=(8, 1)), '2_bias': rng.normal(size=1)}
+        engine = NumpyLSTMModel(specs, weights, dtype=np.float64)
+        x = rng.normal(size=(4, 65, 3))
+
+        output, states = engine.encode(x[:, :60])
+        for t in range(60, 65):
+            output, states = engine.step(x[:, t], states)
+        np.testing.assert_allclose(output, engine.predict(x), rtol=1e-12)
+
+if __name__ == '__main__':
+    unittest.main()
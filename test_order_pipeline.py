@@ -0,0 +1,97 @@
+# test_order_pipeline.py
+
+import unittest
+from concurrent.futures import Future
+import numpy as np
+from core.bar_buffer import BAR_DTYPE
+from core.order_pipeline import ORDER_FILLING_IOC, OrderPipeline, collect
+from core.sim_mt5 import SimulatedMT5
+
+def make_sim(**kwargs):
+    bars = np.zeros(200, dtype=BAR_DTYPE)
+    bars['time'] = 1_700_000_000 + 900 * np.arange(200)
+    bars['open'] = bars['high'] = bars['low'] = bars['close'] = 1.1 + 0.001 * np.arange(200)
+    bars['spread'] = 10
+    return SimulatedMT5({'EURUSD': bars, 'GBPUSD': bars.copy()}, 'M15', start=100, **kwargs)
+
+class TestOrderPipeline(unittest.TestCase):
+    def setUp(self):
+        self.pipelines = []
+
+    def tearDown(self):
+        for pipeline in self.pipelines:
+            pipeline.shutdown()
+
+    def pipeline(self, sim, **kwargs):
+        pipeline = OrderPipeline(sim, **kwargs)
+        self.pipelines.append(pipeline)
+        return pipeline
+
+    def buy(self, sim, symbol='EURUSD', **extra):
+        return dict({'action': sim.TRADE_ACTION_DEAL, 'symbol': symbol, 'volume': 0.1,
+                     'type': sim.ORDER_TYPE_BUY, 'deviation': 3}, **extra)
+
+    def test_requotes_retried_at_fresh_tick(self):
+        sim = make_sim(requote_probability=0.5, seed=1)
+        pipeline = self.pipeline(sim, max_retries=20)
+        outcomes = [future.result() for future in [pipeline.submit(self.buy(sim)) for _ in range(10)]]
+        self.assertTrue(all(outcome['status'] == 'done' for outcome in outcomes))
+        self.assertGreater(sum(outcome['attempts'] for outcome in outcomes), 10)
+        self.assertEqual(len(sim.positions), 10)
+
+    def test_stale_price_repriced(self):
+        sim = make_sim()
+        stale = sim.symbol_info_tick('EURUSD').ask
+        sim.advance()
+        outcome = self.pipeline(sim).submit(self.buy(sim, price=stale)).result()
+        self.assertEqual(outcome['status'], 'done')
+        self.assertEqual(outcome['attempts'], 2)
+        self.assertEqual(outcome['result']['price'], sim.symbol_info_tick('EURUSD').ask)
+        self.assertEqual(set(outcome['latency_ms']), {'queue', 'tick', 'send', 'total'})
+
+    def test_falls_back_to_ioc(self):
+        sim = make_sim(filling_mode=2)  # IOC only
+        outcome = self.pipeline(sim).submit(self.buy(sim)).result()
+        self.assertEqual((outcome['status'], outcome['filling'], outcome['attempts']), ('done', ORDER_FILLING_IOC, 1))
+
+    def test_send_runs_on_the_calling_thread(self):
+        sim = make_sim(requote_probability=0.5, seed=1)
+        pipeline = self.pipeline(sim, workers=0, max_retries=20)  # no worker could pick it up
+        request = self.buy(sim)
+        outcome = pipeline.send(request)
+        self.assertEqual(outcome['status'], 'done')
+        self.assertNotIn('type_filling', request)  # the caller's request is not modified
+        self.assertEqual(outcome['latency_ms']['queue'], 0.0)
+        self.assertEqual(len(sim.positions), 1)
+
+    def test_close_all_deduplicates_tickets(self):
+        sim = make_sim()
+        pipeline = self.pipeline(sim, workers=4, queue_size=2)
+        for symbol in ('EURUSD', 'GBPUSD') * 5:
+            pipeline.submit(self.buy(sim, symbol)).result()
+        positions = sim.positions_get()
+        futures = pipeline.close_all(positions + positions[:3])
+        outcomes = [future.result() for future in futures]
+        self.assertEqual(len(futures), len(positions))
+        self.assertTrue(all(outcome['status'] == 'done' for outcome in outcomes))
+        self.assertEqual(sim.positions_get(), ())
+        self.assertEqual(len(sim.closed), len(positions))
+
+    def test_close_in_flight_shares_future(self):
+        sim = make_sim()
+        sim.order_send(self.buy(sim))
+        position, = sim.positions_get()
+        idle = OrderPipeline(sim, workers=0)  # nothing runs, so the first close stays in flight
+        self.assertIs(idle.close_position(position), idle.close_position(position))
+
+    def test_collect_keeps_outcomes_after_a_failed_future(self):
+        futures = [Future() for _ in range(3)]
+        futures[0].set_result({'status': 'done'})
+        futures[1].set_exception(RuntimeError('terminal gone'))
+        futures[2].set_result({'status': 'done'})
+        outcomes = collect(futures)
+        self.assertEqual([outcome['status'] for outcome in outcomes], ['done', 'error', 'done'])
+        self.assertEqual(outcomes[1]['comment'], 'terminal gone')
+
+if __name__ == '__main__':
+    unittest.main()
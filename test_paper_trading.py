@@ -0,0 +1,100 @@
+# test_paper_trading.py
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from paper_trading import PaperTrade
+
+class TestPaperTrade(unittest.TestCase):
+    def test_multiple_positions_close_fifo(self):
+        paper = PaperTrade()
+        paper.execute_trade('buy', 'EURUSD', 1.10, 1.0, sl=1.09, tp=1.12)
+        paper.execute_trade('buy', 'EURUSD', 1.20, 1.0, sl=1.19, tp=1.22)
+        self.assertEqual(len(paper.positions['EURUSD']), 2)
+
+        message = paper.execute_trade('sell', 'EURUSD', 1.30, 1.5)
+        self.assertEqual(message, "📝 Paper SELL EURUSD 1.5 @ 1.30000 | PNL: 0.25")
+        remaining, = paper.positions['EURUSD']
+        self.assertAlmostEqual(remaining.volume, 0.5)
+        self.assertAlmostEqual(remaining.price, 1.20)
+        self.assertAlmostEqual(paper.balance, 10000.25)
+        self.assertEqual(paper.execute_trade('sell', 'GBPUSD', 1.3, 1.0), "No position to close")
+
+    def test_pnl_aggregates(self):
+        paper = PaperTrade()
+        paper.execute_trade('buy', 'EURUSD', 1.10, 2.0, sl=0.0, tp=0.0)
+        paper.execute_trade('buy', 'XAUUSD', 2000.0, 0.1, sl=0.0, tp=0.0)
+        paper.execute_trade('sell', 'EURUSD', 1.05, 1.0)
+        self.assertAlmostEqual(paper.realized_pnl(), -0.05)
+        unrealized = paper.unrealized_pnl({'EURUSD': 1.15, 'XAUUSD': 2010.0})
+        self.assertAlmostEqual(unrealized['EURUSD'], 0.05)
+        self.assertAlmostEqual(unrealized['XAUUSD'], 1.0)
+        stats = paper.symbol_stats()
+        self.assertEqual((stats['EURUSD']['fills'], stats['EURUSD']['closes'], stats['EURUSD']['wins']), (2, 1, 0))
+
+    def test_spill_keeps_memory_flat_and_totals_exact(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'ledger.trades')
+            paper = PaperTrade(spill_path=path, spill_rows=64)
+            for i in range(500):
+                paper.execute_trade('buy', 'EURUSD', 1.0, 1.0, sl=0.0, tp=0.0)
+                paper.execute_trade('sell', 'EURUSD', 1.0 + (i % 3 - 1) * 0.01, 1.0)
+            self.assertLessEqual(len(paper.ledger.rows), 64)
+            self.assertEqual(len(paper.ledger), 1000)
+            history = paper.trade_history
+            self.assertEqual(len(history), 1000)
+            self.assertAlmostEqual(paper.realized_pnl(), history['pnl'].sum())
+            self.assertAlmostEqual(paper.balance - 10000, paper.realized_pnl())
+
+            paper.close()
+            with PaperTrade(spill_path=path, spill_rows=64) as resumed:
+                self.assertEqual(len(resumed.ledger), 1000)
+                np.testing.assert_allclose(resumed.symbol_stats()['EURUSD']['realized_pnl'], paper.realized_pnl())
+
+    def test_resume_restores_balance_tickets_and_open_positions(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'ledger.trades')
+            paper = PaperTrade(balance=5000, spill_path=path)
+            paper.execute_trade('buy', 'EURUSD', 1.10, 1.0, sl=1.09, tp=1.12)
+            paper.execute_trade('buy', 'XAUUSD', 2000.0, 0.5, sl=1990.0, tp=2020.0)
+            paper.execute_trade('buy', 'EURUSD', 1.20, 1.0, sl=1.19, tp=1.22)
+            paper.execute_trade('sell', 'EURUSD', 1.30, 1.5)
+            paper.close()
+
+            resumed = PaperTrade(balance=5000, spill_path=path)
+            self.assertAlmostEqual(resumed.balance, paper.balance)
+            (eurusd,), (xauusd,) = resumed.positions['EURUSD'], resumed.positions['XAUUSD']
+            self.assertEqual((eurusd.ticket, eurusd.price, eurusd.sl, eurusd.tp), (3, 1.20, 1.19, 1.22))
+            self.assertAlmostEqual(eurusd.volume, 0.5)
+            self.assertEqual((xauusd.ticket, xauusd.volume), (2, 0.5))
+            resumed.execute_trade('buy', 'EURUSD', 1.25, 1.0, sl=0.0, tp=0.0)
+            self.assertEqual(resumed.positions['EURUSD'][-1].ticket, 4)
+            resumed.execute_trade('sell', 'EURUSD', 1.30, 0.5)
+            self.assertEqual([p.ticket for p in resumed.positions['EURUSD']], [4])
+            resumed.close()
+
+    def test_buffered_fills_are_flushed_on_close_and_exit(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'ledger.trades')
+            with PaperTrade(spill_path=path) as paper:
+                paper.execute_trade('buy', 'EURUSD', 1.10, 1.0, sl=0.0, tp=0.0)
+                self.assertEqual(len(paper.ledger.spilled()), 0)
+            resumed = PaperTrade(spill_path=path)
+            self.assertEqual(resumed.positions['EURUSD'][0].ticket, 1)
+            resumed.close()
+            resumed.close()  # idempotent: nothing is written twice
+            self.assertEqual(len(resumed.ledger.spilled()), 1)
+
+            # Never closed: the exit hook registered by the ledger writes the fill
+            with mock.patch('atexit.register') as register:
+                abandoned = PaperTrade(spill_path=path)
+            abandoned.execute_trade('buy', 'XAUUSD', 2000.0, 0.1, sl=0.0, tp=0.0)
+            exit_hook, = (call.args[0] for call in register.call_args_list)
+            exit_hook()
+            with PaperTrade(spill_path=path) as reopened:
+                self.assertEqual(set(reopened.positions), {'EURUSD', 'XAUUSD'})
+
+if __name__ == '__main__':
+    unittest.main()
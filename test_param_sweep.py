@@ -0,0 +1,56 @@
+# test_param_sweep.py
+
+import unittest
+import numpy as np
+from core.bar_buffer import BAR_DTYPE
+from core.param_sweep import PARAMS, bootstrap_path, grid, simulate, sweep
+
+def make_bars(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1.1 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    bars = np.zeros(n, dtype=BAR_DTYPE)
+    bars['time'] = 1_700_000_000 + 900 * np.arange(n)
+    bars['close'] = close
+    bars['open'] = np.concatenate([[close[0]], close[:-1]])
+    bars['high'] = np.maximum(bars['open'], close) * 1.0002
+    bars['low'] = np.minimum(bars['open'], close) * 0.9998
+    bars['spread'] = 10
+    return bars
+
+class TestParamSweep(unittest.TestCase):
+    def test_grid_covers_every_combination(self):
+        scenarios = grid(risk_per_trade=[0.01, 0.02], max_daily_loss=[0.05], max_lot_size=[1.0, 10.0],
+                         stop_loss_pct=[0.01], take_profit_pct=[0.01, 0.02, 0.03])
+        self.assertEqual(scenarios.shape, (12, len(PARAMS)))
+        self.assertEqual(len({tuple(row) for row in scenarios}), 12)
+
+    def test_daily_loss_stop_skips_rest_of_day(self):
+        # Two losing trades then a winner on day 0, one winner on day 1
+        days, prices, pnl = [0, 0, 0, 1], [1.0] * 4, [-0.05, -0.05, 0.05, 0.05]
+        net, _, taken, win_rate, halted = simulate(days, prices, pnl, risk_per_trade=0.5, max_daily_loss=0.04,
+                                                   max_lot_size=1000.0, balance=1000.0, contract_size=1.0)
+        self.assertEqual((taken, halted), (3, 1))
+        self.assertAlmostEqual(win_rate, 1 / 3)
+        # Sizing compounds: 500 units lose 25, 487.5 lose 24.375, then 475.3125 win 23.765625
+        self.assertAlmostEqual(net, (1000 - 25 - 24.375 + 23.765625) / 1000 - 1)
+
+    def test_bootstrap_path_keeps_times_and_ranges(self):
+        bars = make_bars()
+        path = bootstrap_path(bars, seed=3)
+        np.testing.assert_array_equal(path['time'], bars['time'])
+        self.assertTrue((path['high'] >= path['low']).all() and (path['close'] > 0).all())
+        self.assertFalse(np.array_equal(path['close'], bars['close']))
+
+    def test_sweep_results_are_complete(self):
+        bars = make_bars()
+        scenarios = grid(risk_per_trade=[0.01, 0.05], max_daily_loss=[0.05], max_lot_size=[10.0],
+                         stop_loss_pct=[0.005, 0.01], take_profit_pct=[0.01])
+        results = sweep(bars, scenarios, paths=2, workers=2)
+        self.assertEqual(len(results), len(scenarios) * 3)
+        self.assertEqual(sorted(zip(results['scenario'].tolist(), results['path'].tolist())),
+                         [(s, p) for s in range(len(scenarios)) for p in range(3)])
+        self.assertTrue((results['trades'] > 0).all())
+        np.testing.assert_allclose(results['risk_per_trade'], scenarios[results['scenario'], 0], rtol=1e-6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+# test_prediction_cache.py
+
+import unittest
+from core.prediction_cache import PredictionCache
+
+class TestPredictionCache(unittest.TestCase):
+    def test_same_bar_and_model_skip_the_model(self):
+        cache, calls = PredictionCache(max_entries=2), []
+        predict = lambda: calls.append(1) or {'signal': 'buy', 'confidence': 0.7}
+
+        key = PredictionCache.key('EURUSD', 'M15', 1_700_000_000, 'v0001')
+        self.assertEqual(cache.get_or_compute(key, predict), cache.get_or_compute(key, predict))
+        cache.get_or_compute(PredictionCache.key('EURUSD', 'M15', 1_700_000_000, 'v0002'), predict)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_forming_bar_values_are_part_of_the_key(self):
+        key = PredictionCache.key('EURUSD', 'M15', 1_700_000_000, 'v0001', (1.1, 1.2, 1.0, 1.15, 40.0))
+        self.assertEqual(key, PredictionCache.key('EURUSD', 'M15', 1_700_000_000, 'v0001', (1.1, 1.2, 1.0, 1.15, 40.0)))
+        self.assertNotEqual(key, PredictionCache.key('EURUSD', 'M15', 1_700_000_000, 'v0001', (1.1, 1.2, 1.0, 1.16, 41.0)))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = PredictionCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.get('a'), cache.evictions), (1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
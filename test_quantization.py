@@ -0,0 +1,98 @@
+# test_quantization.py
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from core.bar_buffer import BAR_DTYPE
+from core.model_registry import ModelRegistry
+from core.quantization import quantize_and_select, representative_windows
+
+def make_bars(n, level):
+    bars = np.zeros(n, dtype=BAR_DTYPE)
+    bars['time'] = 900 * np.arange(n)
+    bars['close'] = level + np.arange(n)
+    bars['open'] = bars['high'] = bars['low'] = bars['close']
+    bars['tick_volume'] = 100
+    return bars
+
+class TestRepresentativeWindows(unittest.TestCase):
+    def test_samples_every_history_without_repeats(self):
+        histories = [make_bars(100, 1000.0), make_bars(30, 2000.0), make_bars(200, 3000.0)]
+        with mock.patch('core.quantization.normalize_windows', side_effect=lambda batch: batch):
+            batch = representative_windows(histories, window=60, count=1000)
+        # The 30-bar history is too short; 41 + 141 windows remain and all are returned once
+        self.assertEqual(batch.shape, (182, 60, 5))
+        starts = batch[:, 0, 3]
+        self.assertEqual(len(np.unique(starts)), 182)
+        self.assertEqual(int(np.sum(starts < 2000)), 41)
+        self.assertEqual(int(np.sum(starts >= 3000)), 141)
+        # Each sample is a real window: 60 consecutive closes
+        np.testing.assert_array_equal(batch[:, :, 3] - starts[:, None], np.tile(np.arange(60), (182, 1)))
+
+    def test_count_seed_and_normalization(self):
+        histories = [make_bars(100, 1000.0), make_bars(200, 3000.0)]
+        a = representative_windows(histories, window=60, count=50, seed=1)
+        self.assertEqual(a.shape, (50, 60, 5))
+        np.testing.assert_array_equal(a, representative_windows(histories, window=60, count=50, seed=1))
+        np.testing.assert_allclose(a[:, :, 3].mean(axis=1), 0.0, atol=1e-4)
+        with self.assertRaises(ValueError):
+            representative_windows([make_bars(10, 1.0)], window=60)
+
+class TestQuantizeAndSelect(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(self.tmp.name)
+        self.windows = np.random.default_rng(0).normal(size=(20, 60, 5)).astype(np.float32)
+        self.model = mock.Mock()
+        self.model.name = 'QuantumAlpha'
+        self.calibrated = []
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_selection(self, measured, error_budget=0.05):
+        """``measured`` maps variant -> (p50_ms, relative_error), or an exception to raise"""
+        def convert(model, variant, calibration):
+            self.calibrated.append(len(calibration))
+            if isinstance(measured[variant], Exception):
+                raise measured[variant]
+            return variant.encode()
+
+        def benchmark_variant(model_bytes, windows, reference):
+            p50, error = measured[model_bytes.decode()]
+            return {'p50_ms': p50, 'p99_ms': p50 * 2, 'relative_error': error}, np.zeros(len(windows))
+
+        with mock.patch('core.quantization.convert', side_effect=convert), \
+                mock.patch('core.quantization.benchmark_variant', side_effect=benchmark_variant):
+            return quantize_and_select(self.model, self.windows, self.registry, error_budget=error_budget,
+                                       report_path=os.path.join(self.tmp.name, 'report.json'))
+
+    def test_picks_the_fastest_variant_within_budget(self):
+        summary = self.run_selection({'fp32': (3.0, 0.0), 'fp16': (2.0, 0.01), 'int8': (1.0, 0.2)})
+        self.assertEqual(summary['selected'], 'fp16')
+        self.assertEqual(self.calibrated, [10, 10, 10])  # first half calibrates, second half is scored
+        self.assertEqual(summary['variants']['fp32']['relative_error'], 0.0)
+        active = self.registry.active()
+        self.assertEqual((active['quantization'], active['version']), ('fp16', summary['variants']['fp16']['version']))
+        self.assertEqual(len(self.registry.find(architecture='QuantumAlpha')), 3)
+        with open(os.path.join(self.tmp.name, 'report.json')) as f:
+            self.assertEqual(json.load(f)['selected'], 'fp16')
+
+    def test_failed_variant_is_reported_not_selected(self):
+        summary = self.run_selection({'fp32': (3.0, 0.0), 'fp16': RuntimeError("no fp16"), 'int8': (1.0, 0.01)})
+        self.assertEqual(summary['selected'], 'int8')
+        self.assertEqual(summary['variants']['fp16'], {'error': 'no fp16'})
+        self.assertEqual(len(self.registry.find(architecture='QuantumAlpha')), 2)
+
+    def test_fp32_failure_and_empty_budget_raise(self):
+        with self.assertRaisesRegex(RuntimeError, "fp32 conversion failed"):
+            self.run_selection({'fp32': RuntimeError("broken"), 'fp16': (2.0, 0.0), 'int8': (1.0, 0.0)})
+        with self.assertRaisesRegex(RuntimeError, "No variant within the error budget"):
+            self.run_selection({'fp32': (3.0, 0.0), 'fp16': (2.0, 0.01), 'int8': (1.0, 0.2)}, error_budget=-1.0)
+        self.assertIsNone(self.registry.active())
+
+if __name__ == '__main__':
+    unittest.main()
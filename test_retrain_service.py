@@ -0,0 +1,44 @@
+# test_retrain_service.py
+
+import os
+import tempfile
+import unittest
+import importlib.util
+import numpy as np
+from core.bar_buffer import BAR_DTYPE
+from core.bar_store import BarStore
+
+HAS_SKLEARN = importlib.util.find_spec('sklearn') is not None
+
+def make_rates(start, count, seed, step=900):
+    rates = np.zeros(count, dtype=BAR_DTYPE)
+    rates['time'] = start + step * np.arange(count)
+    rates['close'] = 1.1 + np.cumsum(np.random.default_rng(seed).normal(0, 0.001, count))
+    return rates
+
+@unittest.skipUnless(HAS_SKLEARN, "scikit-learn is needed for the forest")
+class TestRetrainService(unittest.TestCase):
+    def test_incremental_rounds_only_fit_new_bars(self):
+        from core.retrain_service import RetrainService, load_published
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store = BarStore(os.path.join(tmp, 'EURUSD_M15.bars'))
+            store.append(make_rates(0, 600, seed=1))
+            service = RetrainService(store.path, os.path.join(tmp, 'forest.pkl'),
+                                     initial_trees=10, trees_per_update=5, max_trees=12, min_samples=100)
+
+            first = service.run_once()
+            self.assertEqual(first['trees'], 10)
+            self.assertEqual(first['last_time'], int(store.bars['time'][-2]))
+            self.assertIs(service.run_once(first), first)  # nothing new yet
+
+            store.append(make_rates(600 * 900, 300, seed=2))
+            second = service.run_once(first)
+            self.assertEqual(second['trees'], 12)  # 15 grown, the 3 oldest retired
+            self.assertEqual(second['samples'], first['samples'] + 300)
+            published = load_published(service.model_path)
+            self.assertEqual(published['last_time'], second['last_time'])
+            self.assertEqual(published['model'].n_jobs, 1)  # the live loop predicts one row at a time
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
 # test_risk_manager.py
 
 import unittest
-from risk_manager import calculate_position_size, check_daily_loss, RISK_PER_TRADE, MAX_DAILY_LOSS
+import numpy as np
+from core.mt5_session import get_session
+from core.sim_mt5 import SimulatedMT5
+from risk_manager import RiskManager, calculate_position_size, check_daily_loss, RISK_PER_TRADE, MAX_DAILY_LOSS
+from test_sim_mt5 import make_history
 
 class TestRiskManager(unittest.TestCase):
     def test_calculate_position_size(self):
@@ -43,5 +47,15 @@ class TestRiskManager(unittest.TestCase):
         with self.assertRaises(ValueError):
             check_daily_loss(-0.01)
 
+    def test_sync_goes_through_the_shared_session(self):
+        sim = SimulatedMT5({'EURUSD': make_history(1.1 + np.zeros(100))}, 'M15', start=50, balance=2500.0)
+        get_session().bind(sim)
+        self.addCleanup(get_session().bind, None)
+        manager = RiskManager()
+        self.assertTrue(manager.can_trade())
+        self.assertEqual(manager.state.balance, 2500.0)
+        tick = sim.symbol_info_tick('EURUSD')
+        self.assertEqual(manager.calculate_position_size('EURUSD'), round(2500.0 * 0.02 / (tick.ask * 100000), 2))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
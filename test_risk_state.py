@@ -0,0 +1,130 @@
+# test_risk_state.py
+
+import unittest
+from collections import namedtuple
+from core.risk_manager import RiskManager
+from core.risk_state import DAY_SECONDS, RiskState
+
+Account = namedtuple('Account', 'balance equity')
+Position = namedtuple('Position', 'ticket symbol type volume price_open profit')
+Deal = namedtuple('Deal', 'time type profit commission swap')
+
+class TestRiskState(unittest.TestCase):
+    def setUp(self):
+        self.now = 3 * DAY_SECONDS + 3600.0
+        self.state = RiskState(max_daily_loss=0.05, sync_interval=60.0, clock=lambda: self.now)
+        self.state.sync_account(Account(10000.0, 10000.0))
+
+    def test_daily_limit_from_day_start_balance(self):
+        self.assertTrue(self.state.can_trade())
+        self.state.book(-300.0)
+        self.assertTrue(self.state.can_trade())
+        self.state.book(-200.0)
+        self.assertFalse(self.state.can_trade())
+        self.assertAlmostEqual(self.state.daily_loss, 0.05)
+        self.assertEqual(self.state.balance, 9500.0)
+
+    def test_utc_rollover_resets_day(self):
+        self.state.book(-600.0)
+        self.assertFalse(self.state.can_trade())
+        self.now = 4 * DAY_SECONDS
+        self.assertTrue(self.state.can_trade())
+        self.assertEqual(self.state.realized_today, 0.0)
+        self.assertEqual(self.state.day_start_balance, 9400.0)
+
+    def test_fill_and_close_move_exposure_and_pnl(self):
+        self.state.on_fill('EURUSD', 1, 0.5, 1.1000, position=7)
+        self.state.on_fill('EURUSD', -1, 0.2, 1.1000, position=8)
+        self.assertAlmostEqual(self.state.exposure['EURUSD'], 0.3)
+        self.assertAlmostEqual(self.state.on_close(7, 1.0990, volume=0.25), -25.0)
+        self.assertAlmostEqual(self.state.on_close(7, 1.1010), 25.0)
+        self.assertAlmostEqual(self.state.on_close(8, 1.0990), 20.0)
+        self.assertAlmostEqual(self.state.exposure['EURUSD'], 0.0)
+        self.assertAlmostEqual(self.state.realized_today, 20.0)
+        self.assertIsNone(self.state.on_close(99, 1.0))
+
+    def test_reconcile_books_broker_closes_once(self):
+        self.state.on_fill('EURUSD', 1, 1.0, 1.1000, position=1)
+        self.state.on_fill('GBPUSD', -1, 1.0, 1.3000, position=2)
+        self.state.reconcile([Position(1, 'EURUSD', 0, 1.0, 1.1000, -40.0),
+                              Position(2, 'GBPUSD', 1, 1.0, 1.3000, 15.0)], Account(10000.0, 9975.0))
+        self.assertAlmostEqual(self.state.equity, 9975.0)
+        # Position 1 stopped out between polls: estimated from its last floating profit...
+        self.state.reconcile([Position(2, 'GBPUSD', 1, 1.0, 1.3000, 10.0)], Account(9948.0, 9958.0))
+        self.assertAlmostEqual(self.state.realized_today, -40.0)
+        self.assertAlmostEqual(self.state.balance, 9948.0)
+        self.assertEqual(self.state.exposure, {'GBPUSD': -1.0})
+        # ...until the deals say -50 plus 2 commission
+        deals = [Deal(self.now - 600, 0, 0.0, -1.0, 0.0), Deal(self.now - 60, 1, -50.0, -1.0, 0.0)]
+        self.state.reconcile([Position(2, 'GBPUSD', 1, 1.0, 1.3000, 10.0)], Account(9948.0, 9958.0), deals=deals)
+        self.assertAlmostEqual(self.state.realized_today, -52.0)
+
+    def test_deposits_and_old_deals_are_not_pnl(self):
+        deals = [Deal(self.now - 100, 2, 5000.0, 0.0, 0.0),  # balance operation
+                 Deal(self.state.day_start - 1, 1, -300.0, 0.0, 0.0),  # yesterday
+                 Deal(self.now - 50, 1, -20.0, 0.0, -0.5)]
+        self.state.sync_account(Account(14979.5, 14979.5), deals)
+        self.assertAlmostEqual(self.state.realized_today, -20.5)
+        self.assertEqual(self.state.balance, 14979.5)
+        # No deals, no guessing: a bare balance change is not counted either
+        self.state.sync_account(Account(13979.5, 13979.5))
+        self.assertAlmostEqual(self.state.realized_today, -20.5)
+
+    def test_growing_deal_history_sums_only_new_deals(self):
+        MagicDeal = namedtuple('MagicDeal', 'time type profit commission swap magic')
+        deals = [MagicDeal(self.now - 300, 1, -10.0, 0.0, 0.0, 7), MagicDeal(self.now - 200, 1, 99.0, 0.0, 0.0, 8)]
+        self.state.sync_account(Account(10000.0, 10000.0), deals, magic=7)
+        self.assertAlmostEqual(self.state.realized_today, -10.0)
+        deals.append(MagicDeal(self.now - 100, 0, -5.0, -1.0, 0.0, 7))
+        self.state.sync_account(Account(10000.0, 10000.0), iter(deals), magic=7)
+        self.assertAlmostEqual(self.state.realized_today, -16.0)
+        self.assertEqual(self.state._deal_sum[2], 3)
+        # A history that does not extend the summed one (another window, or a new day) is summed afresh
+        self.state.sync_account(Account(10000.0, 10000.0), deals[1:], magic=7)
+        self.assertAlmostEqual(self.state.realized_today, -6.0)
+        self.state.sync_account(Account(10000.0, 10000.0), deals)
+        self.assertAlmostEqual(self.state.realized_today, 83.0)
+
+    def test_unsynced_state_can_trade(self):
+        state = RiskState(clock=lambda: self.now)
+        self.assertTrue(state.can_trade())
+        self.assertEqual(state.daily_loss, 0.0)
+        state.sync_account(Account(1000.0, 1000.0))
+        state.book(-60.0)
+        self.assertFalse(state.can_trade())
+
+    def test_needs_sync(self):
+        self.assertFalse(self.state.needs_sync())
+        self.now += 60
+        self.assertTrue(self.state.needs_sync())
+
+class TestCoreRiskManager(unittest.TestCase):
+    def test_default_manager_can_trade(self):
+        self.assertTrue(RiskManager().can_trade())
+
+    def test_daily_loss_is_a_fraction(self):
+        manager = RiskManager(max_daily_loss=0.05)
+        self.assertTrue(manager.update_daily_loss(0.03))
+        self.assertAlmostEqual(manager.daily_loss, 0.03)
+        self.assertFalse(manager.update_daily_loss(0.03))
+        manager.reset_daily_loss()
+        self.assertTrue(manager.can_trade())
+        with self.assertRaises(ValueError):
+            manager.update_daily_loss(-1)
+
+    def test_loss_exactly_at_the_limit_is_within_it(self):
+        manager = RiskManager(max_daily_loss=0.05)
+        self.assertTrue(manager.update_daily_loss(0.05))
+        self.assertFalse(manager.can_trade())  # the live gate stops at the limit
+        self.assertFalse(manager.update_daily_loss(0.0001))
+
+    def test_fractions_against_a_synced_state(self):
+        state = RiskState(max_daily_loss=0.05)
+        state.sync_account(Account(10000.0, 10000.0))
+        manager = RiskManager(max_daily_loss=0.05, state=state)
+        manager.update_daily_loss(0.02)
+        self.assertAlmostEqual(state.realized_today, -200.0)
+        self.assertAlmostEqual(manager.daily_loss, 0.02)
+
+if __name__ == '__main__':
+    unittest.main()
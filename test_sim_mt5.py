@@ -0,0 +1,118 @@
+# test_sim_mt5.py
+
+import sys
+import unittest
+from unittest import mock
+import numpy as np
+from core.bar_buffer import BAR_DTYPE, MT5BarFeed
+from core.mt5_session import get_session
+from core.sim_mt5 import SimulatedMT5, install
+
+def make_history(close, start=1_700_000_000, spread=10):
+    bars = np.zeros(len(close), dtype=BAR_DTYPE)
+    bars['time'] = start + 900 * np.arange(len(close))
+    bars['open'] = bars['close'] = close
+    bars['high'] = np.asarray(close) + 0.0005
+    bars['low'] = np.asarray(close) - 0.0005
+    bars['spread'] = spread
+    return bars
+
+class TestSimulatedMT5(unittest.TestCase):
+    def setUp(self):
+        self.close = 1.1 + 0.0001 * np.arange(100)
+        self.sim = SimulatedMT5({'EURUSD': make_history(self.close)}, 'M15', start=50)
+
+    def test_feed_only_sees_bars_up_to_the_clock(self):
+        feed = MT5BarFeed(self.sim.TIMEFRAME_M15, capacity=20, terminal=self.sim)
+        self.assertEqual(feed.refresh('EURUSD').close[-1], self.close[49])
+        for _ in range(3):
+            self.sim.advance()
+        bars = feed.refresh('EURUSD')
+        self.assertEqual(bars.close[-1], self.close[52])
+        self.assertEqual(bars.last_time, self.sim.now)
+        np.testing.assert_array_equal(bars.close, self.close[33:53])
+
+    def test_open_and_close_books_profit(self):
+        tick = self.sim.symbol_info_tick('EURUSD')
+        self.assertAlmostEqual(tick.ask - tick.bid, 10 * self.sim.point)
+        opened = self.sim.order_send({'action': self.sim.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 1.0,
+                                      'type': self.sim.ORDER_TYPE_BUY, 'price': tick.ask, 'deviation': 3})
+        self.assertEqual(opened.retcode, self.sim.TRADE_RETCODE_DONE)
+        self.assertEqual(opened._asdict()['price'], tick.ask)
+        for _ in range(10):
+            self.sim.advance()
+        position, = self.sim.positions_get(symbol='EURUSD')
+        closed = self.sim.order_send({'position': position.ticket, 'action': self.sim.TRADE_ACTION_DEAL,
+                                      'symbol': 'EURUSD', 'volume': position.volume,
+                                      'type': self.sim.ORDER_TYPE_SELL, 'price': 0.0})
+        self.assertEqual(closed.retcode, self.sim.TRADE_RETCODE_DONE)
+        self.assertEqual(self.sim.positions_get(), ())
+        expected = (self.close[59] - tick.ask) * 100000
+        self.assertAlmostEqual(self.sim.balance - 10000.0, expected, places=6)
+        opening, closing = self.sim.history_deals_get(0, self.sim.now)
+        self.assertEqual((opening.entry, closing.entry), (self.sim.DEAL_ENTRY_IN, self.sim.DEAL_ENTRY_OUT))
+        self.assertEqual(closing.type, self.sim.DEAL_TYPE_SELL)
+        self.assertAlmostEqual(closing.profit, expected, places=6)
+        self.assertEqual(self.sim.history_deals_get(self.sim.now + 1, self.sim.now + 2), ())
+
+    def test_stop_loss_closes_on_revealed_bar(self):
+        tick = self.sim.symbol_info_tick('EURUSD')
+        self.sim.order_send({'action': self.sim.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+                             'type': self.sim.ORDER_TYPE_SELL, 'price': tick.bid, 'tp': 0.0,
+                             'sl': tick.ask + 0.0008})
+        self.sim.advance(5)
+        self.assertEqual(len(self.sim.positions), 0)
+        self.assertAlmostEqual(self.sim.closed[0]['price_close'], tick.ask + 0.0008)
+
+    def test_max_hold_bars_closes_at_market_and_deals_are_found_by_time(self):
+        sim = SimulatedMT5({'EURUSD': make_history(self.close), 'XAUUSD': make_history(self.close + 2000.0)},
+                           'M15', start=50, max_hold_bars=3, contract_size={'XAUUSD': 100.0})
+        base = {'action': sim.TRADE_ACTION_DEAL, 'volume': 0.1}
+        sim.order_send({**base, 'symbol': 'EURUSD', 'type': sim.ORDER_TYPE_BUY})
+        opened_at = sim.now
+        sim.advance()
+        sim.order_send({**base, 'symbol': 'XAUUSD', 'type': sim.ORDER_TYPE_SELL})
+        sim.advance(2)
+        self.assertEqual([p.symbol for p in sim.positions_get()], ['XAUUSD'])
+        bid = sim.symbol_info_tick('EURUSD').bid
+        self.assertAlmostEqual(sim.closed[0]['price_close'], bid)
+        self.assertAlmostEqual(sim.balance - 10000.0, (bid - self.close[49] - 10 * sim.point) * 0.1 * 100000, places=6)
+        sim.advance()
+        self.assertEqual(sim.positions_get(), ())
+        self.assertEqual(sim.symbol_info('XAUUSD').trade_contract_size, 100.0)
+        self.assertEqual(len(sim.history_deals_get(0, sim.now)), 4)
+        self.assertEqual([d.symbol for d in sim.history_deals_get(opened_at + 1, sim.now - 1)], ['XAUUSD', 'EURUSD'])
+
+    def test_rejects_bad_volume_and_unsupported_filling(self):
+        base = {'action': self.sim.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'type': self.sim.ORDER_TYPE_BUY}
+        self.assertEqual(self.sim.order_send({**base, 'volume': 0.001}).retcode, self.sim.TRADE_RETCODE_INVALID_VOLUME)
+        self.assertEqual(self.sim.order_send({**base, 'volume': 0.1, 'type_filling': self.sim.ORDER_FILLING_IOC}).retcode,
+                         self.sim.TRADE_RETCODE_INVALID_FILL)
+
+    def test_account_profit_and_margin_across_positions(self):
+        base = {'action': self.sim.TRADE_ACTION_DEAL, 'symbol': 'EURUSD'}
+        self.sim.order_send({**base, 'volume': 0.5, 'type': self.sim.ORDER_TYPE_BUY})
+        self.sim.order_send({**base, 'volume': 0.2, 'type': self.sim.ORDER_TYPE_SELL})
+        self.sim.advance(3)
+        positions = self.sim.positions_get()
+        account = self.sim.account_info()
+        self.assertAlmostEqual(account.profit, sum(p.profit for p in positions), places=6)
+        self.assertAlmostEqual(account.margin, sum(p.volume * p.price_open for p in positions) * 100000 / 100,
+                               places=6)
+        for position in positions:
+            self.sim._close(position.ticket, position.price_current)
+        self.assertEqual(self.sim.account_info().margin, 0.0)
+
+    def test_install_rebinds_the_shared_session(self):
+        session = get_session()
+        with mock.patch.dict(sys.modules):
+            install(self.sim)
+            self.assertIs(session.terminal, self.sim)
+            other = SimulatedMT5({'EURUSD': make_history(self.close + 1.0)}, 'M15', start=50)
+            install(other)
+            self.assertIs(session.terminal, other)
+            self.assertAlmostEqual(session.symbol_info_tick('EURUSD').bid, self.close[49] + 1.0)
+        session.bind(None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# test_startup_profile.py
+
+import sys
+import builtins
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from utils.startup_profile import ImportProfiler
+
+class TestImportProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        (root / 'profiled_outer.py').write_text(textwrap.dedent("""
+            import time
+            import profiled_inner
+            time.sleep(0.02)
+        """))
+        (root / 'profiled_inner.py').write_text("import time\ntime.sleep(0.05)\n")
+        sys.path.insert(0, self.tmp.name)
+
+    def tearDown(self):
+        sys.path.remove(self.tmp.name)
+        for name in ('profiled_outer', 'profiled_inner'):
+            sys.modules.pop(name, None)
+        self.tmp.cleanup()
+
+    def test_records_cumulative_and_self_time(self):
+        original = builtins.__import__
+        profiler = ImportProfiler().install()
+        try:
+            import profiled_outer  # noqa: F401
+        finally:
+            profiler.uninstall()
+        self.assertIs(builtins.__import__, original)
+
+        records = {name: (own, cumulative, depth) for name, own, cumulative, depth in profiler.records}
+        outer_self, outer_total, outer_depth = records['profiled_outer']
+        inner_self, inner_total, inner_depth = records['profiled_inner']
+        self.assertEqual((outer_depth, inner_depth), (0, 1))
+        self.assertGreaterEqual(inner_total, 0.05)
+        self.assertGreaterEqual(outer_total, inner_total + 0.02)
+        # The nested import's time is not charged to the outer module itself
+        self.assertLess(outer_self, outer_total - 0.04)
+
+    def test_cached_modules_are_not_recorded(self):
+        profiler = ImportProfiler().install()
+        try:
+            import unittest  # noqa: F401
+        finally:
+            profiler.uninstall()
+        self.assertNotIn('unittest', [record[0] for record in profiler.records])
+
+    def test_report_lists_modules_and_milestones(self):
+        profiler = ImportProfiler().install()
+        try:
+            import profiled_outer  # noqa: F401
+        finally:
+            profiler.uninstall()
+        profiler.mark('bot constructed')
+        report = profiler.report()
+        self.assertIn('profiled_outer', report)
+        self.assertIn('bot constructed', report)
+
+if __name__ == '__main__':
+    unittest.main()
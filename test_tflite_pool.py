@@ -0,0 +1,111 @@
+# test_tflite_pool.py
+
+import threading
+import time
+import unittest
+from unittest import mock
+import numpy as np
+from core.ml_models import TFLiteInterpreterPool
+
+class FakeInterpreter:
+    """Stands in for tflite's Interpreter; the output is each window's last close"""
+    created = []
+    lock = threading.Lock()
+
+    def __init__(self, model_path, num_threads=1):
+        self.shape = np.array([1, 60, 5])
+        self.tensor = None
+        self.in_use = False
+        self.invoked = []
+        with self.lock:
+            self.created.append(self)
+
+    def get_input_details(self):
+        return [{'index': 0, 'shape': self.shape}]
+
+    def get_output_details(self):
+        return [{'index': 1}]
+
+    def resize_tensor_input(self, index, shape):
+        if shape[0] == 3:
+            raise ValueError("unsupported batch size")
+        self.shape = np.array(shape)
+
+    def allocate_tensors(self):
+        pass
+
+    def set_tensor(self, index, value):
+        if value.shape != tuple(self.shape):
+            raise ValueError(f"Got {value.shape}, allocated {tuple(self.shape)}")
+        if self.in_use:
+            raise RuntimeError("interpreter shared between threads")
+        self.in_use = True
+        self.tensor = value.copy()
+
+    def invoke(self):
+        self.invoked.append(len(self.tensor))
+        time.sleep(0.001)
+
+    def get_tensor(self, index):
+        self.in_use = False
+        return self.tensor[:, -1, 3:4]
+
+class TestTFLiteInterpreterPool(unittest.TestCase):
+    def setUp(self):
+        FakeInterpreter.created = []
+        patcher = mock.patch('core.ml_models._tflite_interpreter_class', return_value=FakeInterpreter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def windows(self, n):
+        data = np.zeros((n, 60, 5), dtype=np.float32)
+        data[:, -1, 3] = np.arange(1, n + 1)
+        return data
+
+    def test_prepares_each_batch_size_and_skips_unusable_ones(self):
+        pool = TFLiteInterpreterPool('model.tflite', size=2, batch_sizes=(8, 1, 3, 8))
+        self.assertEqual(pool.batch_sizes, [1, 8])
+        self.assertEqual(pool.input_shape, (60, 5))
+        self.assertEqual(len(FakeInterpreter.created), 5)  # 2 per usable size, 1 for the failed size 3
+        self.assertEqual(sorted(int(i.shape[0]) for i in FakeInterpreter.created if i.shape[0] != 1), [8, 8])
+
+    def test_chunks_to_the_largest_size_and_pads_the_tail(self):
+        pool = TFLiteInterpreterPool('model.tflite', batch_sizes=(1, 4))
+        out = pool.predict(self.windows(10))
+        np.testing.assert_array_equal(out[:, 0], np.arange(1, 11))
+        invoked = sorted(n for interpreter in FakeInterpreter.created for n in interpreter.invoked)
+        self.assertEqual(invoked, [4, 4, 4])  # 4 + 4 + 2 padded to 4
+        self.assertEqual(pool.predict(self.windows(1)).shape, (1, 1))
+        self.assertEqual(pool.predict(self.windows(0)).shape, (0, 1))
+        with self.assertRaises(ValueError):
+            pool.predict(np.zeros((2, 30, 5), dtype=np.float32))
+
+    def test_concurrent_calls_check_out_separate_interpreters(self):
+        pool = TFLiteInterpreterPool('model.tflite', size=2, batch_sizes=(1, 4))
+        results, errors = {}, []
+
+        def call(n):
+            try:
+                for _ in range(20):
+                    results[n] = pool.predict(self.windows(n))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call, args=(n,)) for n in (1, 2, 3, 4, 5, 6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        for n, out in results.items():
+            np.testing.assert_array_equal(out[:, 0], np.arange(1, n + 1))
+        self.assertEqual(len(FakeInterpreter.created), 4)  # checked-out interpreters go back to the pool
+
+    def test_get_shares_one_pool_per_model(self):
+        with mock.patch.dict(TFLiteInterpreterPool._pools, clear=True):
+            a = TFLiteInterpreterPool.get('model.tflite', batch_sizes=(4, 1))
+            self.assertIs(TFLiteInterpreterPool.get('model.tflite', batch_sizes=(1, 4)), a)
+            self.assertIsNot(TFLiteInterpreterPool.get('model.tflite', size=2, batch_sizes=(1, 4)), a)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# test_trading_cycle.py
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+
+# Config validates credentials on import; the cycle itself never uses them here
+for name, value in (('MT5_LOGIN', '1'), ('MT5_PASSWORD', 'test'), ('MT5_SERVER', 'test')):
+    os.environ.setdefault(name, value)
+
+from config import Config
+from core.mt5_session import get_session
+from core.sim_mt5 import ReplayModel, SimulatedMT5, install
+from paper_trading import PaperTrade
+from test_sim_mt5 import make_history
+
+class CountingModel(ReplayModel):
+    def __init__(self):
+        super().__init__(input_shape=(20, 5), every_bar=True)
+        self.batches = []
+
+    def predict_latest(self, bar_views):
+        self.batches.append(len(bar_views))
+        return super().predict_latest(bar_views)
+
+class TestMultiSymbolCycle(unittest.TestCase):
+    def setUp(self):
+        close = 1.1 + 0.0001 * np.arange(100)
+        # GBPUSD has fewer bars than the model's window, so its data step fails
+        history = {'EURUSD': make_history(close), 'GBPUSD': make_history(close[:5]),
+                   'XAUUSD': make_history(close + 0.2)}
+        self.modules = mock.patch.dict(sys.modules)
+        self.modules.start()
+        self.sim = install(SimulatedMT5(history, 'M15', start=80, balance=1_000_000.0))
+        from main import TradingBot
+        self.model = CountingModel()
+        self.bot = TradingBot(model=self.model, clock=lambda: self.sim.now)
+        self.reports = []
+        self.telegram = mock.patch('main.send_telegram_report', self.reports.append)
+        self.telegram.start()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.telegram.stop()
+        with mock.patch.object(Config, 'DATA_DIR', Path(self.tmp.name)):
+            self.bot.trader.shutdown()  # dumps order latency into DATA_DIR
+        self.tmp.cleanup()
+        get_session().bind(None)
+        self.modules.stop()
+
+    def test_failing_symbol_only_drops_itself(self):
+        self.bot.execute_multi_symbol_cycle()
+        report, = self.reports
+        self.assertIn("⚠️ GBPUSD: data: only 5 bars available", report)
+        self.assertIn("🔹 EURUSD: BUY", report)
+        self.assertIn("🔹 XAUUSD: BUY", report)
+        self.assertEqual(sorted(p.symbol for p in self.sim.positions_get()), ['EURUSD', 'XAUUSD'])
+
+    def test_uncached_symbols_share_one_predict_call(self):
+        self.bot.execute_multi_symbol_cycle()
+        self.assertEqual(self.model.batches, [2])
+        self.bot.execute_multi_symbol_cycle()  # no new bar: both predictions come from the cache
+        self.assertEqual(self.model.batches, [2])
+        self.sim.advance()
+        self.bot.execute_multi_symbol_cycle()
+        self.assertEqual(self.model.batches, [2, 2])
+
+    def test_tick_on_the_forming_bar_invalidates_its_prediction(self):
+        self.bot.execute_multi_symbol_cycle()
+        forming = self.sim.history['EURUSD'][self.sim._visible['EURUSD'] - 1]
+        forming['close'] += 0.001
+        self.bot.execute_multi_symbol_cycle()
+        self.assertEqual(self.model.batches, [2, 1])  # XAUUSD's bar did not move
+        self.bot.current_symbol = 'EURUSD'
+        self.bot.execute_trading_cycle()
+        self.assertEqual(self.model.batches, [2, 1])
+
+    def test_shutdown_flushes_the_paper_ledger(self):
+        path = os.path.join(self.tmp.name, 'paper.trades')
+        self.bot.trader.paper = PaperTrade(spill_path=path)
+        self.bot.trader.paper.execute_trade('buy', 'EURUSD', 1.1, 0.01, sl=1.0, tp=1.2)
+        with mock.patch.object(Config, 'DATA_DIR', Path(self.tmp.name)):
+            self.bot.trader.shutdown()
+        with PaperTrade(spill_path=path) as resumed:
+            self.assertEqual(len(resumed.positions['EURUSD']), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# test_walk_forward.py
+
+import os
+import tempfile
+import unittest
+import importlib.util
+from unittest import mock
+import numpy as np
+import pandas as pd
+from core.walk_forward import KerasAdapter, SklearnAdapter, cache_features, walk_forward, walk_forward_splits
+
+HAS_SKLEARN = importlib.util.find_spec('sklearn') is not None
+
+def make_frame(n, seed=0):
+    close = 1.1 + np.cumsum(np.random.default_rng(seed).normal(0, 0.001, n))
+    return pd.DataFrame({'time': 900 * np.arange(n), 'open': close, 'high': close + 0.0005,
+                         'low': close - 0.0005, 'close': close, 'tick_volume': np.full(n, 100)})
+
+class TestWalkForwardSplits(unittest.TestCase):
+    def test_rolling_folds_never_train_on_the_future(self):
+        folds = walk_forward_splits(1000, train_size=500, test_size=100, gap=5)
+        self.assertEqual(len(folds), 4)
+        for fold in folds:
+            self.assertEqual(fold.train_end - fold.train_start, 500)
+            self.assertEqual(fold.test_start, fold.train_end + 5)
+            self.assertLessEqual(fold.test_end, 1000)
+        self.assertEqual([f.test_start for f in folds], [505, 605, 705, 805])
+
+    def test_expanding_folds_start_at_zero(self):
+        folds = walk_forward_splits(1000, train_size=400, test_size=200, step=100, expanding=True)
+        self.assertEqual([f.train_start for f in folds], [0] * len(folds))
+        self.assertEqual([f.train_end for f in folds], [400, 500, 600, 700, 800])
+
+class TestFeatureCache(unittest.TestCase):
+    def test_key_covers_every_column_the_adapter_reads(self):
+        frame = make_frame(200)
+        louder = frame.assign(tick_volume=frame['tick_volume'] * 2)
+        with tempfile.TemporaryDirectory() as tmp:
+            adapter = KerasAdapter(window=20)
+            first = cache_features(adapter, frame, tmp)
+            self.assertNotEqual(cache_features(adapter, louder, tmp)['bars'], first['bars'])
+            np.testing.assert_array_equal(np.load(cache_features(adapter, louder, tmp)['bars'])[:, 4], 200)
+            # The forest only reads closes, so volume does not split its cache
+            rf = SklearnAdapter()
+            self.assertEqual(cache_features(rf, frame, tmp), cache_features(rf, louder, tmp))
+
+@unittest.skipUnless(HAS_SKLEARN, "scikit-learn is needed for the forest")
+class TestWalkForward(unittest.TestCase):
+    def test_forest_folds_on_two_workers_reuse_the_cache(self):
+        frame = make_frame(700)
+        with tempfile.TemporaryDirectory() as tmp:
+            report = walk_forward(SklearnAdapter(n_estimators=10), frame, train_size=300, test_size=100,
+                                  workers=2, cache_dir=tmp)
+            self.assertEqual(list(report.index), [0, 1, 2])
+            self.assertEqual(list(report.columns), ['train_rows', 'test_rows', 'accuracy', 'hit_rate', 'trades',
+                                                    'strategy_return', 'wall_time'])
+            self.assertTrue(((report['accuracy'] >= 0) & (report['accuracy'] <= 1)).all())
+            self.assertTrue((report['trades'] == 100).all())
+
+            with mock.patch.object(SklearnAdapter, 'prepare', side_effect=AssertionError("features recomputed")):
+                again = walk_forward(SklearnAdapter(n_estimators=10), frame, train_size=300, test_size=100,
+                                     workers=2, cache_dir=tmp)
+            self.assertEqual(len(again), 3)
+            self.assertEqual(len(os.listdir(tmp)), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# test_windowing.py
+
+import threading
+import unittest
+import numpy as np
+from core.windowing import WindowBatcher, normalize_windows, sliding_windows
+
+class TestSlidingWindows(unittest.TestCase):
+    def setUp(self):
+        self.bars = np.arange(100 * 5, dtype=np.float64).reshape(100, 5)
+
+    def test_shapes_and_contents(self):
+        windows = sliding_windows(self.bars, 60)
+        self.assertEqual(windows.shape, (41, 60, 5))
+        np.testing.assert_array_equal(windows[7], self.bars[7:67])
+        stacked = sliding_windows(np.stack([self.bars, -self.bars]), 60)
+        self.assertEqual(stacked.shape, (2, 41, 60, 5))
+        np.testing.assert_array_equal(stacked[1, 40], -self.bars[40:])
+
+    def test_shares_memory_with_the_bars(self):
+        windows = sliding_windows(self.bars, 60)
+        self.assertTrue(np.shares_memory(windows, self.bars))
+        self.bars[10, 2] = -1.0
+        self.assertEqual(windows[0, 10, 2], -1.0)
+        self.assertEqual(windows[10, 0, 2], -1.0)
+
+    def test_too_few_bars(self):
+        with self.assertRaises(ValueError):
+            sliding_windows(self.bars[:59], 60)
+
+class TestNormalizeWindows(unittest.TestCase):
+    def test_zscores_each_window_and_feature_in_place(self):
+        batch = np.random.default_rng(0).normal(5.0, 3.0, (4, 60, 5))
+        expected = (batch - batch.mean(axis=1, keepdims=True)) / (batch.std(axis=1, keepdims=True) + 1e-8)
+        result = normalize_windows(batch)
+        self.assertIs(result, batch)
+        np.testing.assert_allclose(batch, expected, rtol=1e-10)
+
+    def test_flat_window_stays_finite(self):
+        batch = np.ones((1, 60, 5))
+        np.testing.assert_array_equal(normalize_windows(batch), np.zeros((1, 60, 5)))
+
+class TestWindowBatcher(unittest.TestCase):
+    def test_predict_chunks_over_symbols(self):
+        bars = np.random.default_rng(1).normal(size=(3, 100, 5))
+        batcher = WindowBatcher(window=60, chunk_size=16, normalize=False)
+        scores = batcher.predict(lambda batch: batch[:, -1, 3].copy(), sliding_windows(bars, 60))
+        self.assertEqual(scores.shape, (3, 41))
+        np.testing.assert_allclose(scores, bars[:, 59:, 3].astype(np.float32))
+
+    def test_concurrent_stacks_do_not_overwrite_each_other(self):
+        batcher = WindowBatcher(window=60, normalize=False)
+        barrier = threading.Barrier(2)
+        batches = {}
+
+        def stack(value):
+            batch = batcher.stack([np.full((80, 5), value)])
+            barrier.wait()
+            batches[value] = batch.copy()
+
+        threads = [threading.Thread(target=stack, args=(value,)) for value in (1.0, 2.0)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue((batches[1.0] == 1.0).all())
+        self.assertTrue((batches[2.0] == 2.0).all())
+
+if __name__ == '__main__':
+    unittest.main()
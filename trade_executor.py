@@ -1,16 +1,23 @@
-import MetaTrader5 as mt5
 import logging
-from config import TRADE_MODE, RISK_PER_TRADE, MAX_DAILY_LOSS
+from config import Config
+from core.mt5_session import get_session
 from risk_manager import RiskManager
 from paper_trading import PaperTrade
 
+mt5 = get_session()
 risk_manager = RiskManager()
-paper_trader = PaperTrade() if TRADE_MODE == "PAPER" else None
+paper_trader = PaperTrade(spill_path=Config.DATA_DIR / "paper_ledger.trades") if Config.TRADE_MODE == "PAPER" else None
+
+def stop_levels(action, price):
+    """SL/TP prices for a market order at ``price``, from Config's percentages"""
+    if action == "buy":
+        return price * (1 - Config.STOP_LOSS_PCT), price * (1 + Config.TAKE_PROFIT_PCT)
+    return price * (1 + Config.STOP_LOSS_PCT), price * (1 - Config.TAKE_PROFIT_PCT)
 
 def execute_trade(action, symbol):
     try:
-        if TRADE_MODE == "REAL":
-            if not mt5.initialize():
+        if Config.TRADE_MODE == "REAL":
+            if not mt5.ensure_connected():
                 raise ConnectionError("MT5 connection failed")
                 
             if not risk_manager.can_trade():
@@ -19,8 +26,7 @@ def execute_trade(action, symbol):
             volume = risk_manager.calculate_position_size(symbol)
             tick = mt5.symbol_info_tick(symbol)
             price = tick.ask if action == "buy" else tick.bid
-            sl = price * 0.99 if action == "buy" else price * 1.01
-            tp = price * 1.02 if action == "buy" else price * 0.98
+            sl, tp = stop_levels(action, price)
 
             result = mt5.order_send({
                 "action": mt5.TRADE_ACTION_DEAL,
@@ -34,19 +40,17 @@ def execute_trade(action, symbol):
             })
             
             if result.retcode == mt5.TRADE_RETCODE_DONE:
-                risk_manager.update_pnl(result.profit)
+                # An opening deal carries no profit; realized PnL arrives through the periodic sync
+                risk_manager.on_fill(symbol, 1 if action == "buy" else -1, result.volume, result.price, result.order)
+                risk_manager.sync()
                 return f"{action} {volume} {symbol} @ {price:.5f}"
             return f"Failed: {result.comment}"
             
-        elif TRADE_MODE == "PAPER":
+        elif Config.TRADE_MODE == "PAPER":
             price = 60000  # Simulated price
             volume = 0.01
-            sl = price * 0.99 if action == "buy" else price * 1.01
-            tp = price * 1.02 if action == "buy" else price * 0.98
+            sl, tp = stop_levels(action, price)
             return paper_trader.execute_trade(action, symbol, price, volume, sl, tp)
             
     except Exception as e:
-        return f"Error: {str(e)}"
-    finally:
-        if TRADE_MODE == "REAL":
-            mt5.shutdown()
\ No newline at end of file
+        return f"Error: {str(e)}"
\ No newline at end of file
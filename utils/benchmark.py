@@ -0,0 +1,105 @@
+# utils/benchmark.py
+
+import sys
+import time
+import numpy as np
+from typing import Callable, Dict
+
+
+def latency_profile(fn: Callable[[], object], repeats: int = 200, warmup: int = 10) -> Dict[str, float]:
+    """Call ``fn`` repeatedly and report latency percentiles in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    samples *= 1000.0
+    return {
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p90_ms': float(np.percentile(samples, 90)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'mean_ms': float(samples.mean()),
+        'calls_per_sec': float(1000.0 / samples.mean()),
+    }
+
+
+def format_profile(name: str, profile: Dict[str, float]) -> str:
+    return (f"{name:<28} p50 {profile['p50_ms']:8.3f} ms | p90 {profile['p90_ms']:8.3f} ms | "
+            f"p99 {profile['p99_ms']:8.3f} ms | {profile['calls_per_sec']:9.1f} calls/s")
+
+
+def compare_tflite(model_path: str, batch_size: int = 1, pool_size: int = 2, repeats: int = 200):
+    """p50/p99 of a fresh interpreter per call (the old path) versus the warm pool"""
+    from core.ml_models import TFLiteInterpreterPool, _tflite_interpreter_class
+
+    Interpreter = _tflite_interpreter_class()
+    pool = TFLiteInterpreterPool.get(model_path, size=pool_size, batch_sizes=(1, batch_size))
+    data = np.random.randn(batch_size, *pool.input_shape).astype(np.float32)
+
+    def cold():
+        interpreter = Interpreter(model_path=model_path)
+        input_details = interpreter.get_input_details()[0]
+        if input_details['shape'][0] != batch_size:
+            interpreter.resize_tensor_input(input_details['index'], [batch_size, *pool.input_shape])
+        interpreter.allocate_tensors()
+        interpreter.set_tensor(input_details['index'], data)
+        interpreter.invoke()
+        return interpreter.get_tensor(interpreter.get_output_details()[0]['index'])
+
+    print(format_profile("per-call interpreter", latency_profile(cold, repeats)))
+    print(format_profile("pooled interpreter", latency_profile(lambda: pool.predict(data), repeats)))
+
+
+
+def synthetic_store(root: str, symbols=('EURUSD', 'GBPUSD', 'XAUUSD'), bars: int = 30000,
+                    timeframe: str = 'M15', seed: int = 0) -> str:
+    """Write random-walk M15 histories into a bar store directory for replay benchmarks"""
+    from core.bar_buffer import BAR_DTYPE, timeframe_seconds
+    from core.bar_store import BarStore
+
+    rng = np.random.default_rng(seed)
+    levels = {'EURUSD': 1.1, 'GBPUSD': 1.3, 'XAUUSD': 2000.0}
+    for symbol in symbols:
+        close = levels.get(symbol, 1.0) * np.exp(np.cumsum(rng.normal(0.0, 0.0005, bars)))
+        records = np.zeros(bars, dtype=BAR_DTYPE)
+        records['time'] = 1_700_000_000 + timeframe_seconds(timeframe) * np.arange(bars)
+        records['open'] = np.concatenate([close[:1], close[:-1]])
+        records['close'] = close
+        records['high'] = np.maximum(records['open'], close) * 1.0005
+        records['low'] = np.minimum(records['open'], close) * 0.9995
+        records['tick_volume'] = 100
+        records['spread'] = 10
+        BarStore.open(symbol, timeframe, root).append(records)
+    return root
+
+
+def replay_throughput(cycles: int = 10000, mode: str = 'rotate', every_bar: bool = False,
+                      repeats: int = 3) -> Dict[str, float]:
+    """Best of ``repeats`` full TradingBot replays over a synthetic store"""
+    import tempfile
+    from core.sim_mt5 import ReplayModel, replay
+
+    with tempfile.TemporaryDirectory() as root:
+        synthetic_store(root, bars=cycles + 1000)
+        runs = [replay(root, cycles, mode=mode, model=ReplayModel(every_bar=every_bar)) for _ in range(repeats)]
+    return max(runs, key=lambda run: run['cycles_per_sec'])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python -m utils.benchmark <model.tflite> [batch_size]")
+        print("       python -m utils.benchmark replay [cycles]")
+        sys.exit(1)
+    if sys.argv[1] == 'replay':
+        import logging
+        logging.basicConfig(level=logging.WARNING)  # before main.py configures INFO for every fill
+        cycles = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+        for every_bar in (False, True):
+            run = replay_throughput(cycles, every_bar=every_bar)
+            print(f"{'every-bar' if every_bar else 'signal-change':<14} model: {run['cycles_per_sec']:9.1f} cycles/s "
+                  f"over {run['cycles']} cycles, {run['closed_trades']} trades closed, "
+                  f"{run['open_positions']} open")
+    else:
+        compare_tflite(sys.argv[1], batch_size=int(sys.argv[2]) if len(sys.argv) > 2 else 1)
@@ -1,14 +1,23 @@
+import os
+import shutil
 import platform
 import psutil
-import tensorflow as tf
-import torch
 from typing import Literal
 
+
+def detect_gpu() -> bool:
+    """Look for a CUDA/ROCm device without importing TensorFlow or PyTorch"""
+    if os.environ.get('CUDA_VISIBLE_DEVICES') in ('', '-1'):
+        return False
+    if shutil.which('nvidia-smi') or os.path.exists('/proc/driver/nvidia/version'):
+        return True
+    return os.path.exists('/dev/kfd')  # ROCm kernel driver
+
 class DeviceOptimizer:
     def __init__(self):
         self.os_type = platform.system()
         self.cpu_cores = psutil.cpu_count(logical=False)
-        self.gpu_available = tf.config.list_physical_devices('GPU') or torch.cuda.is_available()
+        self.gpu_available = detect_gpu()
         self.ram = psutil.virtual_memory().total // (1024 ** 3)  # In GB
 
     def get_optimal_config(self) -> dict:
@@ -18,7 +27,8 @@ class DeviceOptimizer:
             'batch_size': 64,
             'inference_threads': 2,
             'use_gpu': False,
-            'quantization': 'fp32'
+            'quantization': 'fp32',
+            'inference_backend': 'numpy'  # CPU-only hosts skip the TF runtime
         }
 
         # Mobile/Low-end device logic
@@ -32,6 +42,7 @@ class DeviceOptimizer:
         # High-end GPU logic
         elif self.gpu_available:
             config['use_gpu'] = True
+            config['inference_backend'] = 'keras'
             if self.ram >= 32:
                 config['batch_size'] = 256
                 config['inference_threads'] = 8
@@ -40,11 +51,13 @@ class DeviceOptimizer:
         if 'arm' in platform.machine().lower():
             config['model_type'] = 'arm-tflite'
             config['quantization'] = 'fp16'
+            config['inference_backend'] = 'tflite'
 
         return config
 
     def configure_runtime(self):
         """Applies hardware-specific TensorFlow/PyTorch settings."""
+        import tensorflow as tf
         if self.os_type == 'Darwin' and not self.gpu_available:
             # Metal Performance Shaders for Apple Silicon
             tf.config.set_visible_devices([], 'GPU')  # Disable GPU to force MPS
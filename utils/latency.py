@@ -0,0 +1,264 @@
+# utils/latency.py
+
+import json
+import math
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ORDER_STAGES = ('tick', 'lot_size', 'build', 'queue', 'reprice', 'order_send', 'result', 'total')
+
+
+class Histogram:
+    """Fixed-memory log-linear histogram of non-negative integers (HDR style).
+
+    Values below ``2 ** (sub_bits + 1)`` are counted exactly; above that
+    every power of two is split into ``2 ** sub_bits`` equal buckets, so
+    the relative error stays under ``2 ** -sub_bits`` (0.8% at the
+    default) up to ``highest``. Larger values are clamped to ``highest``.
+    Memory is one int64 array sized at construction, whatever the count.
+    ``record`` only appends to a short list; values are bucketed in bulk
+    when ``pending`` of them have piled up or the counts are read.
+    """
+
+    def __init__(self, highest: int = 60_000_000, sub_bits: int = 7, pending: int = 256):
+        self.highest = int(highest)
+        self.sub_bits = sub_bits
+        self.pending = pending
+        self._counts = np.zeros(self._index(self.highest) + 1, dtype=np.int64)
+        self._pending = []
+        self._percentiles = (None, None, None)  # (count, qs, result) of the last percentiles() call
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _index(self, value: int) -> int:
+        shift = max(value.bit_length() - self.sub_bits - 1, 0)
+        return (shift << self.sub_bits) + (value >> shift)
+
+    def _lowest(self, index: int) -> int:
+        shift = max((index >> self.sub_bits) - 1, 0)
+        return (index - (shift << self.sub_bits)) << shift
+
+    @property
+    def counts(self) -> np.ndarray:
+        if self._pending:
+            self._fold()
+        return self._counts
+
+    def _fold(self):
+        if len(self._pending) < 16:
+            for value in self._pending:
+                self._counts[self._index(value)] += 1
+        else:
+            values = np.array(self._pending, dtype=np.int64)
+            # frexp's exponent is the bit length (exact below 2 ** 53, far above any latency in us)
+            shift = np.maximum(np.frexp(values)[1] - self.sub_bits - 1, 0)
+            np.add.at(self._counts, (shift << self.sub_bits) + (values >> shift), 1)
+        self._pending.clear()
+
+    def record(self, value: int):
+        value = int(value)
+        if value < 0:
+            value = 0
+        elif value > self.highest:
+            value = self.highest
+        self._pending.append(value)
+        if len(self._pending) >= self.pending:
+            self._fold()
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentiles(self, qs=(50, 90, 99, 99.9)) -> Dict[float, int]:
+        """Lowest value of the bucket holding each percentile, clamped to the exact min/max"""
+        if not self.count:
+            return {q: 0 for q in qs}
+        count, asked, result = self._percentiles
+        if count == self.count and asked == qs:  # every change to the counts changes the count too
+            return dict(result)
+        # Only the buckets up to the largest value can hold a rank; the arithmetic per percentile is
+        # cheaper on Python ints than on arrays
+        ranks = [min(max(math.ceil(q / 100.0 * self.count), 1), self.count) for q in qs]
+        indices = self.counts[:self._index(self.max) + 1].cumsum().searchsorted(ranks).tolist()
+        result = {q: min(max(self._lowest(index), self.min), self.max) for q, index in zip(qs, indices)}
+        self._percentiles = (self.count, qs, result)
+        return dict(result)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: 'Histogram'):
+        if (other.highest, other.sub_bits) != (self.highest, self.sub_bits):
+            raise ValueError("Can only merge histograms with the same layout")
+        self._counts += other.counts  # our own pending values stay pending
+        self.count += other.count
+        self.total += other.total
+        for bound, pick in (('min', min), ('max', max)):
+            theirs = getattr(other, bound)
+            if theirs is not None:
+                ours = getattr(self, bound)
+                setattr(self, bound, theirs if ours is None else pick(ours, theirs))
+
+    def reset(self):
+        self._pending.clear()
+        self._counts[:] = 0
+        self.count = self.total = 0
+        self.min = self.max = None
+
+
+class Stopwatch:
+    """Lap timer for one order; each ``lap`` records the time since the previous one"""
+    __slots__ = ('recorder', 'symbol', 'started', 'last')
+
+    def __init__(self, recorder: 'LatencyRecorder', symbol: str):
+        self.recorder = recorder
+        self.symbol = symbol
+        self.started = self.last = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.recorder.record(self.symbol, stage, (now - self.last) * 1000)
+        self.last = now
+
+    def stop(self):
+        self.last = time.perf_counter()
+        self.recorder.record(self.symbol, 'total', (self.last - self.started) * 1000)
+
+
+class LatencyRecorder:
+    """Per-symbol, per-stage order latency and fill slippage histograms.
+
+    Latencies are recorded in milliseconds and stored in microseconds;
+    slippage in points (price difference over the symbol's point size),
+    positive when the fill is worse than the quote, with adverse and
+    improved fills kept in separate histograms. ``cost`` accumulates
+    the signed slippage in account currency. Every value also goes into
+    an all-symbols histogram, so the merged summaries a status report
+    asks for each cycle cost no merging. Thread-safe.
+    """
+
+    def __init__(self, highest_ms: float = 60_000.0, highest_points: int = 100_000, sub_bits: int = 7):
+        self.highest_us = int(highest_ms * 1000)
+        self.highest_points = highest_points
+        self.sub_bits = sub_bits
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._slippage: Dict[Tuple[str, str], Histogram] = {}
+        self._totals: Dict[Tuple[str, str], Histogram] = {}  # ('latency', stage) / ('slippage', kind)
+        self.cost: Dict[str, float] = {}
+
+    def stopwatch(self, symbol: str) -> Stopwatch:
+        return Stopwatch(self, symbol)
+
+    def _histogram(self, histograms: dict, key: Tuple[str, str], highest: int) -> Histogram:
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram(highest, self.sub_bits)
+        return histogram
+
+    def record(self, symbol: str, stage: str, ms: float):
+        us = round(ms * 1000)
+        with self._lock:
+            self._histogram(self._latency, (symbol, stage), self.highest_us).record(us)
+            self._histogram(self._totals, ('latency', stage), self.highest_us).record(us)
+
+    def record_slippage(self, symbol: str, buy: bool, quoted: float, filled: float, point: float,
+                        volume: float = 0.0, contract_size: float = 1.0) -> float:
+        """Record one fill against its quote; returns the slippage in points (positive = adverse)"""
+        adverse = (filled - quoted) if buy else (quoted - filled)
+        points = adverse / point if point else 0.0
+        kind = 'adverse' if points > 0 else 'improved'
+        with self._lock:
+            self._histogram(self._slippage, (symbol, kind), self.highest_points).record(round(abs(points)))
+            self._histogram(self._totals, ('slippage', kind), self.highest_points).record(round(abs(points)))
+            self.cost[symbol] = self.cost.get(symbol, 0.0) + adverse * volume * contract_size
+        return points
+
+    def symbols(self):
+        with self._lock:
+            return sorted({symbol for symbol, _ in self._latency} | {symbol for symbol, _ in self._slippage})
+
+    def latency(self, symbol: Optional[str] = None, stage: str = 'total') -> Dict[str, float]:
+        """count/mean/min/max/p50/p90/p99/p99.9 in ms for one symbol, or merged over all symbols"""
+        with self._lock:
+            histogram = self._select(self._latency, 'latency', symbol, stage)
+            summary = _summary(histogram)
+        return {key: value / 1000 if key != 'count' else value for key, value in summary.items()}
+
+    def slippage(self, symbol: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """Adverse and improved slippage in points plus the accumulated cost"""
+        with self._lock:
+            report = {kind: _summary(self._select(self._slippage, 'slippage', symbol, kind))
+                      for kind in ('adverse', 'improved')}
+            report['cost'] = self.cost.get(symbol, 0.0) if symbol else sum(self.cost.values())
+        return report
+
+    def slippage_cost(self, symbol: Optional[str] = None) -> float:
+        """Accumulated slippage cost in account currency, without the histogram summaries"""
+        with self._lock:
+            return self.cost.get(symbol, 0.0) if symbol else sum(self.cost.values())
+
+    def _select(self, histograms: dict, kind: str, symbol: Optional[str], key: str) -> Optional[Histogram]:
+        return histograms.get((symbol, key)) if symbol is not None else self._totals.get((kind, key))
+
+    def report(self) -> Dict[str, dict]:
+        """Every symbol's stage latencies and slippage"""
+        report = {}
+        for symbol in self.symbols():
+            with self._lock:
+                stages = [stage for stage in ORDER_STAGES if (symbol, stage) in self._latency]
+                stages += sorted(stage for name, stage in self._latency if name == symbol and stage not in stages)
+            report[symbol] = {
+                'latency_ms': {stage: self.latency(symbol, stage) for stage in stages},
+                'slippage_points': self.slippage(symbol),
+            }
+        return report
+
+    def format(self) -> str:
+        lines = []
+        for symbol, entry in self.report().items():
+            for stage, summary in entry['latency_ms'].items():
+                lines.append(f"{symbol:<10} {stage:<11} n {summary['count']:6d} | p50 {summary['p50']:9.3f} ms | "
+                             f"p99 {summary['p99']:9.3f} ms | max {summary['max']:9.3f} ms")
+            slippage = entry['slippage_points']
+            if slippage['adverse']['count'] or slippage['improved']['count']:
+                lines.append(f"{symbol:<10} slippage    adverse n {slippage['adverse']['count']} "
+                             f"p50 {slippage['adverse']['p50']:.0f} p99 {slippage['adverse']['p99']:.0f} pts | "
+                             f"improved n {slippage['improved']['count']} | cost {slippage['cost']:.2f}")
+        return "\n".join(lines)
+
+    def dump(self, path: Union[str, Path]):
+        """Write the report as JSON and log the summary table"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        if self.symbols():
+            logger.info("Order latency:\n" + self.format())
+
+    def reset(self):
+        with self._lock:
+            self._latency.clear()
+            self._slippage.clear()
+            self._totals.clear()
+            self.cost.clear()
+
+
+def _summary(histogram: Optional[Histogram]) -> Dict[str, float]:
+    if histogram is None:
+        return {'count': 0, 'mean': 0.0, 'min': 0, 'max': 0, 'p50': 0, 'p90': 0, 'p99': 0, 'p99.9': 0}
+    p = histogram.percentiles((50, 90, 99, 99.9))
+    return {'count': histogram.count, 'mean': histogram.mean(), 'min': histogram.min or 0,
+            'max': histogram.max or 0, 'p50': p[50], 'p90': p[90], 'p99': p[99], 'p99.9': p[99.9]}
+
@@ -1,8 +1,8 @@
+import sys
 import time
 import psutil
 import warnings
 from threading import Thread
-import torch  # Added import
 
 class ResourceGuardian(Thread):
     def __init__(self, max_cpu=80, max_ram=90):
@@ -30,11 +30,11 @@ class ResourceGuardian(Thread):
             UniversalTrader.executor._max_workers = max(1, UniversalTrader.executor._max_workers - 1)
 
     def _clear_memory(self):
-        import tensorflow as tf
-        tf.keras.backend.clear_session()
-        
-        try:
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-        except NameError:
-            pass  # Torch not installed
\ No newline at end of file
+        # Only frameworks that are already loaded can hold caches worth clearing
+        tf = sys.modules.get('tensorflow')
+        if tf is not None:
+            tf.keras.backend.clear_session()
+
+        torch = sys.modules.get('torch')
+        if torch is not None and torch.cuda.is_available():
+            torch.cuda.empty_cache()
\ No newline at end of file
@@ -0,0 +1,81 @@
+# utils/startup_profile.py
+
+import sys
+import time
+import builtins
+import threading
+import importlib.util
+from typing import List, Tuple
+
+
+class ImportProfiler:
+    """Per-module import-time breakdown for ``main.py --startup-profile``.
+
+    Wraps ``builtins.__import__`` so every first-time import records its
+    cumulative time and its self time (cumulative minus nested imports).
+    Install it before the heavy imports it should see.
+    """
+
+    def __init__(self):
+        self.records: List[Tuple[str, float, float, int]] = []  # name, self, cumulative, depth
+        self.marks: List[Tuple[str, float]] = []
+        self.started = time.perf_counter()
+        self._local = threading.local()
+        self._original = None
+
+    def install(self) -> 'ImportProfiler':
+        self._original = builtins.__import__
+        builtins.__import__ = self._import
+        return self
+
+    def uninstall(self):
+        if self._original is not None:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def mark(self, label: str):
+        """Record a named startup milestone, e.g. model loaded"""
+        self.marks.append((label, time.perf_counter() - self.started))
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level == 0 and name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+
+        stack = self._local.__dict__.setdefault('stack', [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.records.append((self._absolute(name, globals, level), elapsed - children, elapsed, len(stack)))
+
+    @staticmethod
+    def _absolute(name: str, globals, level: int) -> str:
+        if not level:
+            return name
+        package = (globals or {}).get('__package__') or ''
+        try:
+            return importlib.util.resolve_name('.' * level + name, package)
+        except (ImportError, ValueError):
+            return '.' * level + name
+
+    def report(self, top: int = 25) -> str:
+        total = time.perf_counter() - self.started
+        lines = [f"Startup profile ({total:.2f}s since profiler install)",
+                 f"{'module':<40} {'cumulative':>12} {'self':>10}"]
+        roots = sorted((r for r in self.records if r[3] == 0), key=lambda r: -r[2])
+        for name, own, cumulative, _ in roots[:top]:
+            lines.append(f"{name:<40} {cumulative * 1000:>10.1f}ms {own * 1000:>8.1f}ms")
+
+        lines.append("\nSlowest modules by self time")
+        for name, own, _, _ in sorted(self.records, key=lambda r: -r[1])[:top]:
+            lines.append(f"{name:<40} {own * 1000:>10.1f}ms")
+
+        if self.marks:
+            lines.append("\nMilestones")
+            lines.extend(f"{label:<40} {at:>10.2f}s" for label, at in self.marks)
+        return "\n".join(lines)